@@ -7,7 +7,6 @@ import re
 
 # Template for refactored test file header
 TEMPLATE_HEADER = '''import asyncio
-from playwright.async_api import expect
 
 # Import stub functions for common operations
 from test_stubs import (
@@ -111,6 +110,23 @@ def refactor_test_file(filepath):
         new_run_test
     )
 
+    # Import Playwright inside run_test and only run when executed as a script
+    new_run_test = new_run_test.replace(
+        f'''    {tc_num}: {description}
+    """''',
+        f'''    {tc_num}: {description}
+    """
+    from playwright.async_api import expect
+''',
+        1
+    )
+    new_run_test = re.sub(
+        r'^asyncio\.run\(run_test\(\)\)\s*$',
+        'if __name__ == "__main__":\n    asyncio.run(run_test())\n',
+        new_run_test,
+        flags=re.MULTILINE
+    )
+
     # Combine header and function
     new_content = TEMPLATE_HEADER + '\n' + new_run_test
 
@@ -1,5 +1,4 @@
 import asyncio
-from playwright.async_api import expect
 
 # Import stub functions for common operations
 from test_stubs import (
@@ -16,6 +15,8 @@ async def run_test():
     TC004: User Login with Incorrect Credentials
     Tests authentication failure with invalid credentials
     """
+    from playwright.async_api import expect
+
     pw = None
     browser = None
     context = None
@@ -51,5 +52,5 @@ async def run_test():
         # Use stub for cleanup
         await stub_cleanup(context, browser, pw)
 
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,5 +1,4 @@
 import asyncio
-from playwright.async_api import expect
 
 # Import stub functions for common operations
 from test_stubs import (
@@ -17,6 +16,8 @@ async def run_test():
     TC009: Product Detail Page Display and Add to Cart
     Tests product detail page information display and add to cart functionality
     """
+    from playwright.async_api import expect
+
     pw = None
     browser = None
     context = None
@@ -64,5 +65,5 @@ async def run_test():
         # Use stub for cleanup
         await stub_cleanup(context, browser, pw)
 
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,5 +1,4 @@
 import asyncio
-from playwright.async_api import expect
 
 # Import stub functions for common operations
 from test_stubs import (
@@ -16,6 +15,8 @@ async def run_test():
     TC010: Shopping Cart Management with Multi-Vendor Items
     Tests cart management with items from multiple vendors
     """
+    from playwright.async_api import expect
+
     pw = None
     browser = None
     context = None
@@ -54,5 +55,5 @@ async def run_test():
         # Use stub for cleanup
         await stub_cleanup(context, browser, pw)
 
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,5 +1,4 @@
 import asyncio
-from playwright.async_api import expect
 
 # Import stub functions for common operations
 from test_stubs import (
@@ -23,6 +22,8 @@ async def run_test():
     """
     TC013: Payment Processing with Commission Deduction and Payout Tracking
     """
+    from playwright.async_api import expect
+
     pw = None
     browser = None
     context = None
@@ -54,5 +55,5 @@ async def run_test():
         # Use stub for cleanup
         await stub_cleanup(context, browser, pw)
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
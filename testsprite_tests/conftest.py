@@ -5,15 +5,229 @@ Makes fixtures automatically available to all test files
 import sys
 import os
 
+import pytest
+from pytest_asyncio import is_async_test
+
 # Add the test directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import all fixtures to make them available
 from test_fixtures import *
 
+def pytest_addoption(parser):
+    """Register command line options for artifact capture"""
+    group = parser.getgroup("artifacts", "failure artifact capture")
+    group.addoption(
+        "--artifacts-dir",
+        action="store",
+        default=None,
+        help="Directory for failure screenshots and traces (default: tmp/artifacts)"
+    )
+    group.addoption(
+        "--trace-on-failure",
+        action="store_true",
+        default=False,
+        help="Record a Playwright trace for each test and keep it only on failure"
+    )
+    group.addoption(
+        "--update-baselines",
+        action="store_true",
+        default=False,
+        help="Store new visual baselines instead of comparing against them"
+    )
+    group.addoption(
+        "--visual-baselines-dir",
+        action="store",
+        default=None,
+        help="Directory of visual baselines (default: visual_baselines)"
+    )
+    parser.addoption(
+        "--context-scope",
+        action="store",
+        choices=("function", "module"),
+        default="function",
+        help="Create a context per test, or share one per module and reset it between tests"
+    )
+    parser.addoption(
+        "--no-context-recycling",
+        action="store_true",
+        default=False,
+        help="Close and recreate contexts instead of resetting them in place"
+    )
+    parser.addoption(
+        "--network-profile",
+        action="store",
+        default=None,
+        help="Network emulation profile for every page: 3g, slow-4g, high-latency, lossy"
+    )
+    parser.addoption(
+        "--launch-profile",
+        action="store",
+        default=None,
+        help="Chromium launch profile: default, fast-headless, debug, low-memory"
+    )
+    parser.addoption(
+        "--smart-waits",
+        action="store_true",
+        default=False,
+        help="Use timeouts learned from previous runs (p99 x 3) for stub waits"
+    )
+    parser.addoption(
+        "--db-dsn",
+        action="store",
+        default=None,
+        help="Postgres connection string for database snapshots (default: SHOPHUB_DATABASE_URL)"
+    )
+    parser.addoption(
+        "--memory-profile",
+        action="store_true",
+        default=False,
+        help="Sample browser RSS, JS heap and Python memory during each test"
+    )
+    parser.addoption(
+        "--js-coverage",
+        action="store_true",
+        default=False,
+        help="Collect V8 JS coverage of every page, mapped to the app sources"
+    )
+
+
+def item_results(terminalreporter, key):
+    """
+    Collect the values fixtures attached to tests as ``user_properties``
+
+    Reports travel from xdist workers to the controller, so this sees every
+    test wherever it ran.
+
+    Args:
+        terminalreporter: Terminal reporter of the (controller) session
+        key: User property name
+
+    Returns: Dictionary of node id to value
+    """
+    results = {}
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            for name, value in getattr(report, "user_properties", ()):
+                if name == key:
+                    results[report.nodeid] = value
+    return results
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Report memory profiling, visual diff, backend check, wait, JS coverage and context recycling results"""
+    results = item_results(terminalreporter, "memory_profile")
+    if results:
+        from test_memory import build_report, write_report
+        report = build_report(results)
+        path = write_report(report)
+        terminalreporter.write_sep("-", "memory profile")
+        ranked = sorted(results.items(), key=lambda item: item[1]["browser_rss_peak_mb"],
+                        reverse=True)
+        for nodeid, summary in ranked[:10]:
+            terminalreporter.write_line(
+                f"{nodeid}: browser peak {summary['browser_rss_peak_mb']} MB "
+                f"(+{summary['browser_rss_growth_mb']}), JS heap peak "
+                f"{summary['js_heap_peak_mb']} MB (+{summary['js_heap_growth_mb']}), "
+                f"python peak {summary['python_peak_mb']} MB (+{summary['python_growth_mb']})"
+            )
+        terminalreporter.write_line(
+            f"recommended workers: {report['recommended_workers']} "
+            f"(worst peak {report['worst_peak_mb']} MB; report: {path})"
+        )
+
+    visual = [result for results in item_results(terminalreporter, "visual_diff").values()
+              for result in results]
+    if visual:
+        mismatched = [result for result in visual if not result["match"]]
+        skipped = sum(result.get("tiles_skipped", 0) for result in visual)
+        tiles = sum(result.get("tiles", 0) for result in visual)
+        terminalreporter.write_sep("-", "visual diff")
+        terminalreporter.write_line(
+            f"snapshots={len(visual)} mismatches={len(mismatched)} "
+            f"tiles skipped by hash={skipped}/{tiles}"
+        )
+        for result in mismatched:
+            detail = result.get("diff_path") or result.get("reason") or result.get("error")
+            terminalreporter.write_line(f"{result.get('name')}: {detail}")
+
+    checks = item_results(terminalreporter, "backend_checks")
+    if checks:
+        results = [result for test_results in checks.values() for result in test_results]
+        failed = [(nodeid, result) for nodeid, test_results in checks.items()
+                  for result in test_results if not result["passed"]]
+        terminalreporter.write_sep("-", "backend checks")
+        terminalreporter.write_line(
+            f"tests={len(checks)} checks={len(results)} failed={len(failed)} "
+            f"polls={sum(result['attempts'] for result in results)}"
+        )
+        for nodeid, result in failed:
+            terminalreporter.write_line(f"{nodeid}: {result['name']}")
+
+    regressions = item_results(terminalreporter, "wait_regressions")
+    if regressions:
+        terminalreporter.write_sep("-", "wait regressions")
+        for nodeid, test_regressions in regressions.items():
+            for regression in test_regressions:
+                terminalreporter.write_line(
+                    f"{nodeid}: {regression['key']}: exceeded {regression['budget_ms']} ms "
+                    f"(p99 {regression['p99_ms']} ms, default {regression['default_ms']} ms)"
+                )
+
+    if config.getoption("--js-coverage", default=False) and not os.environ.get("PYTEST_XDIST_WORKER"):
+        from test_coverage import merge_shards, summary_files
+        coverage = merge_shards()
+        terminalreporter.write_sep("-", "js coverage")
+        for row in coverage.summary(summary_files()):
+            percent = "not loaded" if row["percent"] is None else f"{row['percent']}%"
+            terminalreporter.write_line(f"{row['file']}: {percent} ({row['covered']}/{row['lines']} lines)")
+        terminalreporter.write_line(
+            f"tests={coverage.tests} collection time={round(coverage.collect_seconds, 2)}s "
+            f"({coverage.collect_percent()}% of test time)"
+        )
+
+    recycling = {}
+    for test_stats in item_results(terminalreporter, "context_recycling").values():
+        totals = recycling.setdefault(test_stats["worker"], {})
+        for key, value in test_stats.items():
+            if key != "worker":
+                totals[key] = max(totals.get(key, 0), value)  # running totals per worker
+    if recycling:
+        stats = {key: sum(totals.get(key, 0) for totals in recycling.values())
+                 for key in ("created", "reused", "reset_failures", "retired", "touched",
+                             "creations_saved")}
+        terminalreporter.write_sep("-", "context recycling")
+        terminalreporter.write_line(
+            f"created={stats['created']} reused={stats['reused']} "
+            f"reset_failures={stats['reset_failures']} retired={stats['retired']} "
+            f"touched={stats['touched']} "
+            f"creations_saved={stats['creations_saved']}"
+        )
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session event loop shared with the browser fixtures"""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Expose setup/call/teardown reports as item.rep_<when> for fixtures"""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+
 # Configure pytest
 def pytest_configure(config):
     """Configure pytest with custom markers and settings"""
+    if config.getoption("--js-coverage", default=False) and not os.environ.get("PYTEST_XDIST_WORKER"):
+        import shutil
+        from test_coverage import DEFAULT_COVERAGE_DIR
+        shutil.rmtree(DEFAULT_COVERAGE_DIR, ignore_errors=True)  # drop shards of earlier runs
     config.addinivalue_line(
         "markers", "slow: marks tests as slow (deselect with '-m \"not slow\"')"
     )
@@ -26,3 +240,6 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "smoke: marks tests as smoke tests"
     )
+    config.addinivalue_line(
+        "markers", "network(profile): run the test's page under a network emulation profile"
+    )
@@ -0,0 +1,67 @@
+"""
+Page Objects Package
+Page objects for the Shop Hub pages with precompiled, cached locators
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pages.base import BasePage
+from pages.auth import SignInPage, SignUpPage
+from pages.marketplace import MarketplacePage
+from pages.product_detail import ProductDetailPage
+from pages.cart import CartPage
+from pages.checkout import CheckoutPage
+from pages.orders import OrdersPage
+from pages.admin import AdminPage
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+
+class ShopHubPages:
+    """Lazily created page objects sharing one Playwright page
+
+    Each page object is built on first access and kept, so its locator
+    cache survives across navigations within the same test.
+    """
+
+    _classes = {
+        "sign_in": SignInPage,
+        "sign_up": SignUpPage,
+        "marketplace": MarketplacePage,
+        "product_detail": ProductDetailPage,
+        "cart": CartPage,
+        "checkout": CheckoutPage,
+        "orders": OrdersPage,
+        "admin": AdminPage,
+    }
+
+    def __init__(self, page: Page, base_url: str = "http://localhost:3000"):
+        self.page = page
+        self.base_url = base_url
+        self._instances = {}
+
+    def __getattr__(self, name: str) -> BasePage:
+        cls = self._classes.get(name)
+        if cls is None:
+            raise AttributeError(name)
+        instance = self._instances.get(name)
+        if instance is None:
+            instance = cls(self.page, self.base_url)
+            self._instances[name] = instance
+        return instance
+
+
+__all__ = [
+    "BasePage",
+    "SignInPage",
+    "SignUpPage",
+    "MarketplacePage",
+    "ProductDetailPage",
+    "CartPage",
+    "CheckoutPage",
+    "OrdersPage",
+    "AdminPage",
+    "ShopHubPages",
+]
@@ -0,0 +1,61 @@
+"""
+Admin Page Object
+Vendor management, commission configuration and analytics (app/admin)
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pages.base import BasePage
+
+if TYPE_CHECKING:
+    from playwright.async_api import Locator
+
+
+class AdminPage(BasePage):
+    """Admin dashboard page"""
+
+    path = "/admin"
+    SELECTORS = {
+        "vendors": "tr, [data-testid='vendor']",
+        "stats": "[data-testid='stat'], .stat",
+        "access_denied": "text=/access denied|unauthorized/i",
+    }
+
+    def vendor(self, business_name: str) -> Locator:
+        """
+        Get the row for a vendor
+
+        Args:
+            business_name: Vendor business name
+
+        Returns: Cached Locator
+        """
+        return self.cached("vendor", business_name, factory=lambda: self.locator(
+            "vendors").filter(has_text=business_name).first)
+
+    async def set_vendor_status(self, business_name: str, action: str, timeout: int = 5000) -> None:
+        """
+        Approve or suspend a vendor
+
+        Args:
+            business_name: Vendor business name
+            action: Button label, e.g. "Approve" or "Suspend"
+            timeout: Wait timeout in milliseconds
+        """
+        row = self.vendor(business_name)
+        await row.get_by_role("button", name=action).click(timeout=timeout)
+        await row.get_by_role("button", name=action).wait_for(state="hidden", timeout=timeout)
+
+    async def set_commission(self, business_name: str, rate: float, timeout: int = 5000) -> None:
+        """
+        Configure a vendor's commission rate
+
+        Args:
+            business_name: Vendor business name
+            rate: Commission rate in percent
+            timeout: Wait timeout in milliseconds
+        """
+        row = self.vendor(business_name)
+        await row.locator("input[type='number']").fill(str(rate), timeout=timeout)
+        await row.get_by_role("button", name="Save").click(timeout=timeout)
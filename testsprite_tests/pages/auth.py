@@ -0,0 +1,70 @@
+"""
+Auth Page Objects
+Sign in and sign up pages (app/auth/signin, app/auth/signup)
+"""
+from pages.base import BasePage
+
+
+class SignInPage(BasePage):
+    """Sign in page"""
+
+    path = "/auth/signin"
+    ready_selector = "email"
+    SELECTORS = {
+        "email": "input[type='email'], input[name='email']",
+        "password": "input[type='password'], input[name='password']",
+        "submit": "button[type='submit']",
+        "error": "[role='alert'], .text-red-500, .text-red-600",
+    }
+
+    async def sign_in(self, email: str, password: str, timeout: int = 5000) -> None:
+        """
+        Fill the credentials and submit the form
+
+        Args:
+            email: Account email
+            password: Account password
+            timeout: Wait timeout in milliseconds
+        """
+        await self.fill_fields({"email": email, "password": password}, timeout=timeout)
+        await self.locator("submit").click(timeout=timeout)
+
+
+class SignUpPage(BasePage):
+    """Sign up page"""
+
+    path = "/auth/signup"
+    ready_selector = "email"
+    SELECTORS = {
+        "full_name": "input[name='fullName'], input[name='full_name']",
+        "email": "input[type='email'], input[name='email']",
+        "password": "input[type='password'], input[name='password']",
+        "role": "select[name='role']",
+        "submit": "button[type='submit']",
+        "error": "[role='alert'], .text-red-500, .text-red-600",
+    }
+
+    async def sign_up(
+        self,
+        email: str,
+        password: str,
+        role: str = "customer",
+        full_name: str = "Test User",
+        timeout: int = 5000
+    ) -> None:
+        """
+        Fill the registration form and submit it
+
+        Args:
+            email: Account email
+            password: Account password
+            role: Role to register (customer or vendor)
+            full_name: Display name
+            timeout: Wait timeout in milliseconds
+        """
+        await self.fill_fields(
+            {"full_name": full_name, "email": email, "password": password},
+            timeout=timeout
+        )
+        await self.locator("role").select_option(role, timeout=timeout)
+        await self.locator("submit").click(timeout=timeout)
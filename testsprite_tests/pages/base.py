@@ -0,0 +1,131 @@
+"""
+Base Page Object
+Contains the shared locator cache and wait helpers for Shop Hub page objects
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from playwright.async_api import Locator, Page
+
+
+class BasePage:
+    """Page object base class
+
+    Locators declared in ``SELECTORS`` are compiled once when the page object
+    is created and reused for every interaction, and dynamic locators (text
+    messages, per-product rows) are cached on first use. Page objects should
+    be reused for the lifetime of the underlying Playwright page.
+    """
+
+    path: str = "/"
+    ready_selector: Optional[str] = None
+    SELECTORS: Dict[str, str] = {}
+
+    def __init__(self, page: Page, base_url: str = "http://localhost:3000"):
+        self.page = page
+        self.base_url = base_url.rstrip("/")
+        self._locators: Dict[Tuple[str, ...], Locator] = {
+            (key,): page.locator(selector) for key, selector in self.SELECTORS.items()
+        }
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}{self.path}"
+
+    def locator(self, key: str) -> Locator:
+        """
+        Get a precompiled locator declared in ``SELECTORS``
+
+        Args:
+            key: Selector key
+
+        Returns: Cached Locator
+        """
+        return self._locators[(key,)]
+
+    def cached(self, *key: str, factory=None) -> Locator:
+        """
+        Get or build a dynamic locator cached under ``key``
+
+        Args:
+            key: Cache key parts
+            factory: Zero-argument callable building the Locator on a miss
+
+        Returns: Cached Locator
+        """
+        locator = self._locators.get(key)
+        if locator is None:
+            locator = factory()
+            self._locators[key] = locator
+        return locator
+
+    def text(self, message: str) -> Locator:
+        """
+        Get the first element containing ``message``
+
+        Args:
+            message: Visible text
+
+        Returns: Cached Locator
+        """
+        return self.cached("text", message,
+                           factory=lambda: self.page.get_by_text(message).first)
+
+    async def open(self, wait_until: str = "domcontentloaded", timeout: int = 10000) -> "BasePage":
+        """
+        Navigate to this page and wait until it is ready
+
+        Args:
+            wait_until: Navigation wait condition
+            timeout: Navigation timeout in milliseconds
+
+        Returns: The page object, for chaining
+        """
+        await self.page.goto(self.url, wait_until=wait_until, timeout=timeout)
+        if self.ready_selector:
+            await self.locator(self.ready_selector).first.wait_for(timeout=timeout)
+        return self
+
+    async def wait_all(
+        self,
+        locators: Iterable[Locator],
+        state: str = "visible",
+        timeout: int = 5000
+    ) -> None:
+        """
+        Wait for several locators concurrently instead of one after another
+
+        Args:
+            locators: Locators to wait for
+            state: State to wait for (visible, hidden, attached, detached)
+            timeout: Shared timeout in milliseconds
+        """
+        await asyncio.gather(*(loc.wait_for(state=state, timeout=timeout) for loc in locators))
+
+    async def fill_fields(self, values: Dict[str, str], timeout: int = 5000) -> None:
+        """
+        Fill several ``SELECTORS`` fields after a single batched wait
+
+        Args:
+            values: Mapping of selector key to value
+            timeout: Wait timeout in milliseconds
+        """
+        fields = [self.locator(key) for key in values]
+        await self.wait_all(fields, timeout=timeout)
+        for field, value in zip(fields, values.values()):
+            await field.fill(str(value), timeout=timeout)
+
+    async def expect_text(self, message: str, timeout: int = 30000) -> None:
+        """
+        Assert that ``message`` becomes visible
+
+        Args:
+            message: Visible text
+            timeout: Assertion timeout in milliseconds
+        """
+        from playwright.async_api import expect
+
+        await expect(self.text(message)).to_be_visible(timeout=timeout)
@@ -0,0 +1,100 @@
+"""
+Cart Page Object
+Cart management with vendor grouping (app/cart)
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pages.base import BasePage
+
+if TYPE_CHECKING:
+    from playwright.async_api import Locator
+
+
+class CartPage(BasePage):
+    """Shopping cart page"""
+
+    path = "/cart"
+    SELECTORS = {
+        "items": "[data-testid='cart-item'], li:has(button:has-text('Remove'))",
+        "empty": "text=Cart is empty",
+        "total": "text=/Total/i",
+        "checkout": "button:has-text('Checkout'), a:has-text('Checkout')",
+    }
+
+    def item(self, product_name: str) -> Locator:
+        """
+        Get the cart row for a product
+
+        Args:
+            product_name: Product name
+
+        Returns: Cached Locator
+        """
+        return self.cached("item", product_name, factory=lambda: self.locator(
+            "items").filter(has_text=product_name).first)
+
+    async def is_empty(self, timeout: int = 1000) -> bool:
+        """
+        Check whether the empty-cart message is shown
+
+        Args:
+            timeout: Wait timeout in milliseconds
+
+        Returns: True if the cart is empty
+        """
+        try:
+            await self.locator("empty").first.wait_for(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def set_quantity(self, product_name: str, quantity: int, timeout: int = 5000) -> None:
+        """
+        Update the quantity of a cart row
+
+        Args:
+            product_name: Product name
+            quantity: New quantity
+            timeout: Wait timeout in milliseconds
+        """
+        await self.item(product_name).locator("input[type='number']").fill(
+            str(quantity), timeout=timeout)
+
+    async def remove(self, product_name: str, timeout: int = 5000) -> None:
+        """
+        Remove a product from the cart and wait for its row to disappear
+
+        Args:
+            product_name: Product name
+            timeout: Wait timeout in milliseconds
+        """
+        row = self.item(product_name)
+        await row.get_by_role("button", name="Remove").click(timeout=timeout)
+        await row.wait_for(state="detached", timeout=timeout)
+
+    async def clear(self, timeout: int = 5000) -> None:
+        """
+        Remove every product from the cart, one row at a time
+
+        Args:
+            timeout: Wait timeout per row in milliseconds
+        """
+        rows = self.locator("items")
+        await rows.first.or_(self.locator("empty").first).wait_for(timeout=timeout)
+        count = await rows.count()
+        while count:
+            await rows.first.get_by_role("button", name="Remove").click(timeout=timeout)
+            await rows.nth(count - 1).wait_for(state="detached", timeout=timeout)
+            count = await rows.count()
+
+    async def proceed_to_checkout(self, timeout: int = 5000) -> None:
+        """
+        Go from the cart to the checkout page
+
+        Args:
+            timeout: Wait timeout in milliseconds
+        """
+        await self.locator("checkout").first.click(timeout=timeout)
+        await self.page.wait_for_url("**/checkout", timeout=timeout)
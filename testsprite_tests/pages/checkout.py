@@ -0,0 +1,50 @@
+"""
+Checkout Page Object
+Shipping details, order creation and sub-order splitting (app/checkout)
+"""
+from typing import Dict
+
+from pages.base import BasePage
+
+
+class CheckoutPage(BasePage):
+    """Checkout page"""
+
+    path = "/checkout"
+    ready_selector = "address"
+    SELECTORS = {
+        "full_name": "input[name='fullName'], input[name='full_name']",
+        "address": "input[name='address'], textarea[name='address']",
+        "city": "input[name='city']",
+        "postal_code": "input[name='postalCode'], input[name='postal_code']",
+        "country": "input[name='country']",
+        "phone": "input[name='phone']",
+        "place_order": "button[type='submit']",
+        "error": "[role='alert'], .text-red-500, .text-red-600",
+    }
+    SUCCESS_MESSAGE = "Order Completed Successfully"
+
+    async def submit_shipping(
+        self,
+        address: Dict[str, str],
+        timeout: int = 5000,
+        wait_for_success: bool = True
+    ) -> None:
+        """
+        Fill the shipping form and place the order in one step
+
+        All fields present in ``address`` are waited for together, filled,
+        and the order is submitted; the confirmation wait is optional so
+        stock-failure flows can assert on the error instead.
+
+        Args:
+            address: Mapping of field key (see ``SELECTORS``) to value;
+                keys are also accepted in ``mock_user_data()['profile']`` form
+            timeout: Wait timeout in milliseconds
+            wait_for_success: Wait for the order confirmation message
+        """
+        values = {key: value for key, value in address.items() if key in self.SELECTORS}
+        await self.fill_fields(values, timeout=timeout)
+        await self.locator("place_order").click(timeout=timeout)
+        if wait_for_success:
+            await self.expect_text(self.SUCCESS_MESSAGE, timeout=timeout * 6)
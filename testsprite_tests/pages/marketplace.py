@@ -0,0 +1,76 @@
+"""
+Marketplace Page Object
+Product browsing, search and category filtering (app/marketplace)
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pages.base import BasePage
+
+if TYPE_CHECKING:
+    from playwright.async_api import Locator
+
+
+class MarketplacePage(BasePage):
+    """Marketplace listing page"""
+
+    path = "/marketplace"
+    ready_selector = "search"
+    SELECTORS = {
+        "search": "input[type='search'], input[placeholder*='Search' i]",
+        "category": "select",
+        "product_cards": "a[href^='/products/']",
+        "empty": "text=No products found",
+    }
+
+    def product_card(self, name: str) -> Locator:
+        """
+        Get the product card for a product name
+
+        Args:
+            name: Product name
+
+        Returns: Cached Locator
+        """
+        return self.cached("product", name, factory=lambda: self.locator(
+            "product_cards").filter(has_text=name).first)
+
+    async def search(self, term: str, timeout: int = 5000) -> int:
+        """
+        Search for products and wait for the result list to settle
+
+        Args:
+            term: Search term (matched with ``ilike('name', '%term%')``)
+            timeout: Wait timeout in milliseconds
+
+        Returns: Number of product cards shown
+        """
+        await self.locator("search").fill(term, timeout=timeout)
+        await self.page.wait_for_load_state("networkidle", timeout=timeout)
+        return await self.locator("product_cards").count()
+
+    async def filter_category(self, category: str, timeout: int = 5000) -> int:
+        """
+        Filter the listing by category
+
+        Args:
+            category: Category name (matched with ``eq('category', ...)``)
+            timeout: Wait timeout in milliseconds
+
+        Returns: Number of product cards shown
+        """
+        await self.locator("category").select_option(category, timeout=timeout)
+        await self.page.wait_for_load_state("networkidle", timeout=timeout)
+        return await self.locator("product_cards").count()
+
+    async def open_product(self, name: str, timeout: int = 5000) -> None:
+        """
+        Open the detail page of a product
+
+        Args:
+            name: Product name
+            timeout: Wait timeout in milliseconds
+        """
+        await self.product_card(name).click(timeout=timeout)
+        await self.page.wait_for_url("**/products/**", timeout=timeout)
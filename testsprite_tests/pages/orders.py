@@ -0,0 +1,49 @@
+"""
+Orders Page Object
+Order history with per-vendor sub-orders (app/orders)
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List
+
+from pages.base import BasePage
+
+if TYPE_CHECKING:
+    from playwright.async_api import Locator
+
+
+class OrdersPage(BasePage):
+    """Customer order history page"""
+
+    path = "/orders"
+    SELECTORS = {
+        "orders": "[data-testid='order'], article, li:has-text('Order')",
+        "sub_orders": "[data-testid='sub-order']",
+        "empty": "text=No orders",
+    }
+
+    def order(self, order_id: str) -> Locator:
+        """
+        Get the entry for an order
+
+        Args:
+            order_id: Order ID as displayed
+
+        Returns: Cached Locator
+        """
+        return self.cached("order", order_id, factory=lambda: self.locator(
+            "orders").filter(has_text=order_id).first)
+
+    async def sub_order_statuses(self, order_id: str, timeout: int = 5000) -> List[str]:
+        """
+        Read the status text of every sub-order of an order
+
+        Args:
+            order_id: Order ID as displayed
+            timeout: Wait timeout in milliseconds
+
+        Returns: List of sub-order texts, one per vendor
+        """
+        entry = self.order(order_id)
+        await entry.wait_for(timeout=timeout)
+        return await entry.locator(self.SELECTORS["sub_orders"]).all_inner_texts()
@@ -0,0 +1,64 @@
+"""
+Product Detail Page Object
+Product information, reviews and add to cart (app/products/[id])
+"""
+from pages.base import BasePage
+
+
+class ProductDetailPage(BasePage):
+    """Product detail page"""
+
+    path = "/products"
+    ready_selector = "add_to_cart"
+    SELECTORS = {
+        "name": "h1",
+        "price": "text=/\\$\\d/",
+        "quantity": "input[type='number']",
+        "add_to_cart": "button:has-text('Add to Cart')",
+        "reviews": "[data-testid='review'], .review",
+        "review_rating": "select[name='rating']",
+        "review_comment": "textarea",
+        "submit_review": "button:has-text('Submit Review')",
+    }
+
+    async def open_product(self, product_id: str, timeout: int = 10000) -> "ProductDetailPage":
+        """
+        Navigate to a product by id
+
+        Args:
+            product_id: Product ID
+            timeout: Navigation timeout in milliseconds
+
+        Returns: The page object, for chaining
+        """
+        await self.page.goto(f"{self.url}/{product_id}", wait_until="domcontentloaded",
+                             timeout=timeout)
+        await self.locator("add_to_cart").wait_for(timeout=timeout)
+        return self
+
+    async def add_to_cart(self, quantity: int = 1, timeout: int = 5000) -> None:
+        """
+        Set the quantity and add the product to the cart
+
+        Args:
+            quantity: Quantity to add
+            timeout: Wait timeout in milliseconds
+        """
+        if quantity != 1:
+            await self.locator("quantity").fill(str(quantity), timeout=timeout)
+        await self.locator("add_to_cart").click(timeout=timeout)
+
+    async def submit_review(self, rating: int, comment: str, timeout: int = 5000) -> None:
+        """
+        Submit a product review
+
+        Args:
+            rating: Rating from 1 to 5
+            comment: Review text
+            timeout: Wait timeout in milliseconds
+        """
+        await self.wait_all([self.locator("review_rating"), self.locator("review_comment")],
+                            timeout=timeout)
+        await self.locator("review_rating").select_option(str(rating), timeout=timeout)
+        await self.locator("review_comment").fill(comment, timeout=timeout)
+        await self.locator("submit_review").click(timeout=timeout)
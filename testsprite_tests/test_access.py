@@ -0,0 +1,400 @@
+"""
+Test Access Module
+Contains the access-control scanner checking every route as every role
+
+TC018 checks unauthorized access on one page in one browser test. The
+scanner takes every route from tmp/code_summary.json, signs in once per role
+with the seeded test accounts, and requests all route x role pairs
+concurrently over one pooled HTTP client with each role's session cookies
+and access token. Redirects, 401/403, 404, 5xx and "access denied" pages
+are decided from the HTTP response alone when the request really carried
+the role's session (always for anonymous); ambiguous 200 responses
+(client-side guards) and roles whose session lives only in localStorage are
+opened in the browser. The result is an allow/deny matrix compared against
+the expected access policy:
+
+    python test_access.py
+    python test_access.py --roles customer vendor --param id=42
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from test_crawler import ROLES, app_routes, role_storage_state
+from test_runner import TESTS_DIR
+from test_stubs import stub_cleanup, stub_full_page_setup
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext
+
+
+DEFAULT_MATRIX_PATH = os.path.join(TESTS_DIR, "tmp", "access_matrix.json")
+
+SIGNED_IN = ("customer", "vendor", "admin")
+
+# Expected access by route prefix, first match wins; unlisted routes are public
+ACCESS_POLICY: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("/admin", ("admin",)),
+    ("/vendor", ("vendor",)),
+    ("/checkout", SIGNED_IN),
+    ("/orders", SIGNED_IN),
+    ("/notifications", SIGNED_IN),
+)
+
+_DENIED_TEXT = re.compile(r"access denied|unauthori[sz]ed|forbidden|not authori[sz]ed|"
+                          r"permission denied|please (sign|log) ?in|must be (signed|logged) in",
+                          re.IGNORECASE)
+_PRODUCT_LINK = re.compile(r"""href=["']/products/([^"'/?#]+)["']""")
+_AUTH_KEY = re.compile(r"^sb-.+-auth-token")
+
+
+def allowed_roles(route: str, policy: Sequence[Tuple[str, Sequence[str]]] = ACCESS_POLICY,
+                  roles: Sequence[str] = ROLES) -> Tuple[str, ...]:
+    """
+    Roles expected to reach a route
+
+    Args:
+        route: Route such as "/vendor/dashboard"
+        policy: (prefix, roles) pairs, first match wins
+        roles: Every role (returned for public routes)
+
+    Returns: Allowed roles
+    """
+    for prefix, allowed in policy:
+        if route == prefix or route.startswith(prefix.rstrip("/") + "/"):
+            return tuple(allowed)
+    return tuple(roles)
+
+
+def classify_response(route_path: str, status: int, location: str, body: str) -> Optional[str]:
+    """
+    Decide access from an HTTP response when it is unambiguous
+
+    Args:
+        route_path: Requested path
+        status: Response status
+        location: Location header of a redirect
+        body: Response text
+
+    Returns: "deny", "not_found" or "error", or None when only the browser
+        can tell (a 200 whose guard may run client-side)
+    """
+    if 300 <= status < 400:
+        target = urlsplit(location).path.rstrip("/") or "/"
+        return None if target == route_path.rstrip("/") else "deny"
+    if status in (401, 403):
+        return "deny"
+    if status == 404:
+        return "not_found"
+    if status >= 400:
+        return "error"
+    if _DENIED_TEXT.search(body):
+        return "deny"
+    return None
+
+
+def cookie_header(storage_state: Dict[str, Any], host: str) -> str:
+    """
+    Build a Cookie header from a storage state
+
+    Args:
+        storage_state: Playwright storage state
+        host: Host name of the app
+
+    Returns: Header value (empty without cookies for the host)
+    """
+    return "; ".join(f"{cookie['name']}={cookie['value']}"
+                     for cookie in storage_state.get("cookies", ())
+                     if host.endswith(cookie["domain"].lstrip(".")))
+
+
+def has_auth_cookie(storage_state: Dict[str, Any], host: str) -> bool:
+    """
+    Check whether a storage state holds a Supabase auth cookie for the host
+
+    Args:
+        storage_state: Playwright storage state
+        host: Host name of the app
+
+    Returns: True if requests with ``cookie_header`` carry the session
+    """
+    return any(_AUTH_KEY.match(cookie["name"]) and host.endswith(cookie["domain"].lstrip("."))
+               for cookie in storage_state.get("cookies", ()))
+
+
+def access_token(storage_state: Dict[str, Any], origin: str) -> Optional[str]:
+    """
+    Read the Supabase access token the browser client keeps in localStorage
+
+    Args:
+        storage_state: Playwright storage state
+        origin: Origin of the app, e.g. "http://localhost:3000"
+
+    Returns: Access token, or None when the role has no stored session
+    """
+    for entry in storage_state.get("origins", ()):
+        if entry.get("origin", "").rstrip("/") != origin:
+            continue
+        for item in entry.get("localStorage", ()):
+            if not _AUTH_KEY.match(item["name"]):
+                continue
+            try:
+                session = json.loads(item["value"])
+            except ValueError:
+                continue
+            if isinstance(session, dict) and session.get("access_token"):
+                return session["access_token"]
+            if isinstance(session, list) and session and isinstance(session[0], str):
+                return session[0]  # older supabase-js: [access_token, refresh_token, ...]
+    return None
+
+
+class AccessScanner:
+    """Route x role access matrix from pooled HTTP requests plus browser checks
+
+    Every role signs in once in the browser; its storage state provides the
+    cookies and access token for HTTP requests and the session for browser
+    checks, which run ``workers`` at a time in one context per role. The
+    page guards read the session from cookies, so an HTTP verdict only
+    counts for anonymous or when an auth cookie was sent; otherwise the
+    server saw a signed-out request and the pair goes to the browser.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        base_url: str = "http://localhost:3000",
+        roles: Sequence[str] = ROLES,
+        params: Optional[Dict[str, str]] = None,
+        workers: int = 4,
+        max_connections: int = 20,
+        policy: Sequence[Tuple[str, Sequence[str]]] = ACCESS_POLICY
+    ):
+        self.browser = browser
+        self.base_url = base_url.rstrip("/")
+        self.host = urlsplit(self.base_url).hostname or ""
+        self.roles = list(roles)
+        self.params = dict(params or {})
+        self.workers = max(1, workers)
+        self.max_connections = max_connections
+        self.policy = policy
+        self.stats = {"http_requests": 0, "browser_checks": 0, "http_without_session": 0}
+        self._storage: Dict[str, Dict[str, Any]] = {}
+        self._contexts: Dict[str, BrowserContext] = {}
+        self._context_lock = asyncio.Lock()
+        self._browser_slots = asyncio.Semaphore(self.workers)
+
+    async def _resolve(self, client: Any, routes: Sequence[str]) -> Tuple[Dict[str, str], List[str]]:
+        # Fill dynamic segments from --param, else from a product link on the marketplace
+        if "id" not in self.params and any("[id]" in route for route in routes):
+            try:
+                response = await client.get(self.base_url + "/marketplace")
+                match = _PRODUCT_LINK.search(response.text)
+                if match:
+                    self.params["id"] = match.group(1)
+            except Exception:
+                pass
+        resolved, unresolved = {}, []
+        for route in routes:
+            path = re.sub(r"\[(\w+)\]", lambda m: self.params.get(m.group(1), m.group(0)), route)
+            if "[" in path:
+                unresolved.append(route)
+            else:
+                resolved[route] = path
+        return resolved, unresolved
+
+    async def _fetch(self, client: Any, role: str, path: str) -> Dict[str, Any]:
+        storage_state = self._storage[role]
+        if role != "anonymous" and not has_auth_cookie(storage_state, self.host):
+            self.stats["http_without_session"] += 1
+            return {"access": None, "via": "http"}  # the server would see a signed-out request
+        headers = {}
+        cookies = cookie_header(storage_state, self.host)
+        if cookies:
+            headers["Cookie"] = cookies
+        token = access_token(storage_state, self.base_url)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        self.stats["http_requests"] += 1
+        try:
+            response = await client.get(self.base_url + path, headers=headers)
+        except Exception as exc:
+            return {"access": "error", "via": "http", "error": f"{type(exc).__name__}: {exc}"[:200]}
+        access = classify_response(path, response.status_code,
+                                   response.headers.get("location", ""), response.text)
+        return {"access": access, "via": "http", "status": response.status_code}
+
+    async def _context(self, role: str) -> BrowserContext:
+        async with self._context_lock:
+            if role not in self._contexts:
+                self._contexts[role] = await self.browser.new_context(
+                    storage_state=self._storage[role])
+            return self._contexts[role]
+
+    async def _verify(self, role: str, path: str, result: Dict[str, Any]) -> None:
+        async with self._browser_slots:
+            self.stats["browser_checks"] += 1
+            page = await (await self._context(role)).new_page()
+            try:
+                response = await page.goto(self.base_url + path, wait_until="domcontentloaded",
+                                           timeout=15000)
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=5000)
+                except Exception:
+                    pass  # polling pages never go idle; the guard has run by now
+                final_path = urlsplit(page.url).path.rstrip("/") or "/"
+                status = response.status if response else 200
+                if final_path != (path.rstrip("/") or "/"):
+                    result.update(access="deny", redirected_to=final_path)
+                else:
+                    text = await page.inner_text("body")
+                    result["access"] = classify_response(path, status, "", text) or "allow"
+                result["via"] = "browser"
+            except Exception as exc:
+                result.update(access="error", via="browser",
+                              error=f"{type(exc).__name__}: {exc}"[:200])
+            finally:
+                await page.close()
+
+    async def scan(self, routes: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Build the access matrix
+
+        Args:
+            routes: Routes to check (default: app routes from code_summary.json)
+
+        Returns: Dictionary with the matrix (route -> role -> result), leaks
+            (allowed where the policy denies), blocked (denied where the
+            policy allows), unresolved dynamic routes and request counts
+        """
+        try:
+            import httpx
+        except ImportError as exc:
+            raise ImportError("The access scanner needs httpx: pip install httpx") from exc
+        routes = list(routes if routes is not None else app_routes())
+        states = await asyncio.gather(*(role_storage_state(self.browser, self.base_url, role)
+                                        for role in self.roles))
+        self._storage = dict(zip(self.roles, states))
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_connections)
+        try:
+            async with httpx.AsyncClient(limits=limits, timeout=15.0,
+                                         follow_redirects=False) as client:
+                resolved, unresolved = await self._resolve(client, routes)
+                pairs = [(route, role) for route in resolved for role in self.roles]
+                results = await asyncio.gather(*(self._fetch(client, role, resolved[route])
+                                                 for route, role in pairs))
+            await asyncio.gather(*(self._verify(role, resolved[route], result)
+                                   for (route, role), result in zip(pairs, results)
+                                   if result["access"] is None))
+        finally:
+            for context in self._contexts.values():
+                await stub_cleanup(context)
+            self._contexts = {}
+
+        matrix: Dict[str, Dict[str, Any]] = {}
+        leaks, blocked = [], []
+        for (route, role), result in zip(pairs, results):
+            matrix.setdefault(route, {})[role] = result
+            expected = role in allowed_roles(route, self.policy, ROLES)
+            if result["access"] == "allow" and not expected:
+                leaks.append({"route": route, "role": role})
+            elif result["access"] == "deny" and expected:
+                blocked.append({"route": route, "role": role})
+        return {"matrix": matrix, "leaks": leaks, "blocked": blocked,
+                "unresolved": unresolved, **self.stats}
+
+
+async def run_scan(
+    base_url: str = "http://localhost:3000",
+    roles: Sequence[str] = ROLES,
+    params: Optional[Dict[str, str]] = None,
+    workers: int = 4,
+    headless: bool = True
+) -> Dict[str, Any]:
+    """
+    Launch a browser through ``stub_full_page_setup`` and scan every route
+
+    Args:
+        base_url: Base URL of the app
+        roles: Roles to check ("anonymous" for signed out)
+        params: Values of dynamic route segments, e.g. {"id": "42"}
+        workers: Concurrent browser checks
+        headless: Run browser in headless mode
+
+    Returns: ``AccessScanner.scan`` result with the elapsed seconds
+    """
+    pw, browser, context, page = await stub_full_page_setup(base_url, headless=headless)
+    await stub_cleanup(context)
+    try:
+        scanner = AccessScanner(browser, base_url=base_url, roles=roles, params=params,
+                                workers=workers)
+        start = time.perf_counter()
+        result = await scanner.scan()
+        result["seconds"] = round(time.perf_counter() - start, 2)
+        return result
+    finally:
+        await stub_cleanup(browser=browser, pw=pw)
+
+
+def format_matrix(result: Dict[str, Any], roles: Sequence[str]) -> str:
+    """
+    Render the matrix as a text table ("*" marks browser-verified cells)
+
+    Args:
+        result: ``AccessScanner.scan`` result
+        roles: Column order
+
+    Returns: Table text
+    """
+    width = max([len(route) for route in result["matrix"]] + [5])
+    lines = ["route".ljust(width) + "".join(f"  {role:<11}" for role in roles)]
+    for route, cells in result["matrix"].items():
+        row = route.ljust(width)
+        for role in roles:
+            cell = cells.get(role, {})
+            label = (cell.get("access") or "?") + ("*" if cell.get("via") == "browser" else "")
+            row += f"  {label:<11}"
+        lines.append(row)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Scan every route as every role and report access leaks"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--roles", nargs="+", default=list(ROLES), choices=ROLES)
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Value of a dynamic route segment, e.g. id=42")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent browser checks")
+    parser.add_argument("--output", default=DEFAULT_MATRIX_PATH)
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+
+    params = dict(item.split("=", 1) for item in args.param)
+    result = asyncio.run(run_scan(args.base_url, args.roles, params, args.workers,
+                                  headless=not args.headed))
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(format_matrix(result, args.roles))
+    print(json.dumps({"leaks": result["leaks"], "blocked": result["blocked"],
+                      "unresolved": result["unresolved"],
+                      "http_requests": result["http_requests"],
+                      "http_without_session": result["http_without_session"],
+                      "browser_checks": result["browser_checks"],
+                      "seconds": result["seconds"], "report": args.output}))
+    return 1 if result["leaks"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
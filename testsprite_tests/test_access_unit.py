@@ -0,0 +1,80 @@
+"""
+Unit tests for test_access.py
+HTTP verdicts, the access policy and session headers, without a browser
+"""
+import json
+
+import pytest
+
+from test_access import (
+    access_token,
+    allowed_roles,
+    classify_response,
+    cookie_header,
+    has_auth_cookie,
+)
+
+STORAGE_STATE = {
+    "cookies": [
+        {"name": "sb-abc-auth-token", "value": "session", "domain": "localhost"},
+        {"name": "theme", "value": "dark", "domain": ".localhost"},
+        {"name": "other", "value": "x", "domain": "example.com"},
+    ],
+    "origins": [
+        {"origin": "http://localhost:3000/", "localStorage": [
+            {"name": "cart", "value": "[]"},
+            {"name": "sb-abc-auth-token", "value": json.dumps({"access_token": "jwt"})},
+        ]},
+    ],
+}
+
+
+@pytest.mark.parametrize("route, expected", [
+    ("/admin", ("admin",)),
+    ("/admin/users", ("admin",)),
+    ("/administrator", ("anonymous", "customer", "vendor", "admin")),
+    ("/vendor/dashboard", ("vendor",)),
+    ("/orders/42", ("customer", "vendor", "admin")),
+    ("/marketplace", ("anonymous", "customer", "vendor", "admin")),
+])
+def test_allowed_roles_matches_whole_path_segments(route, expected):
+    roles = ("anonymous", "customer", "vendor", "admin")
+    assert allowed_roles(route, roles=roles) == expected
+
+
+@pytest.mark.parametrize("status, location, body, expected", [
+    (302, "/auth/signin?next=/orders", "", "deny"),
+    (307, "http://localhost:3000/orders/", "", None),
+    (308, "/orders", "", None),
+    (401, "", "", "deny"),
+    (403, "", "", "deny"),
+    (404, "", "", "not_found"),
+    (500, "", "", "error"),
+    (200, "", "<h1>Access Denied</h1>", "deny"),
+    (200, "", "<p>Please sign in to continue</p>", "deny"),
+    (200, "", "<h1>Your orders</h1>", None),
+])
+def test_classify_response(status, location, body, expected):
+    assert classify_response("/orders", status, location, body) == expected
+
+
+def test_cookie_header_keeps_cookies_for_the_host():
+    assert cookie_header(STORAGE_STATE, "localhost") == "sb-abc-auth-token=session; theme=dark"
+    assert cookie_header({}, "localhost") == ""
+
+
+def test_has_auth_cookie():
+    assert has_auth_cookie(STORAGE_STATE, "localhost")
+    assert not has_auth_cookie(STORAGE_STATE, "example.com")
+    assert not has_auth_cookie({"cookies": []}, "localhost")
+
+
+def test_access_token_reads_local_storage():
+    assert access_token(STORAGE_STATE, "http://localhost:3000") == "jwt"
+    assert access_token(STORAGE_STATE, "http://localhost:4000") is None
+
+
+def test_access_token_reads_legacy_list_session():
+    state = {"origins": [{"origin": "http://localhost:3000", "localStorage": [
+        {"name": "sb-abc-auth-token", "value": json.dumps(["jwt", "refresh"])}]}]}
+    assert access_token(state, "http://localhost:3000") == "jwt"
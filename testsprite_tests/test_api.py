@@ -0,0 +1,415 @@
+"""
+Test API Module
+Contains the pooled async client for the Shop Hub Supabase REST API
+
+Backend assertions and data setup go straight to PostgREST (``/rest/v1``)
+and GoTrue (``/auth/v1``) instead of through a page. One client keeps a pool
+of keep-alive connections (HTTP/2 multiplexing when the ``h2`` package is
+installed), so many concurrent requests share a few sockets, and access
+tokens are cached per account until shortly before they expire:
+
+    async with ShopHubApiClient() as api:
+        await api.sign_in_as("customer")
+        orders = await api.select("orders", {"user_id": user_id}, order="created_at.desc")
+
+Run as a script to compare sequential and concurrent request throughput:
+
+    python test_api.py --table products --requests 200 --concurrency 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Sequence, Tuple
+
+from test_mocks import TEST_CREDENTIALS
+
+
+# Defaults of `supabase start`; the anon key is printed by `supabase status`
+DEFAULT_SUPABASE_URL = os.environ.get("SHOPHUB_SUPABASE_URL", "http://localhost:54321")
+DEFAULT_ANON_KEY = os.environ.get("SHOPHUB_SUPABASE_ANON_KEY", "")
+
+# Access tokens shared by every client: (base URL, email) -> (token, expires at)
+_TOKEN_CACHE: Dict[Tuple[str, str], Tuple[str, float]] = {}
+_TOKEN_MARGIN = 60.0
+
+
+def _httpx():
+    try:
+        import httpx
+    except ImportError as exc:
+        raise ImportError("The API client needs httpx: pip install httpx") from exc
+    return httpx
+
+
+class ApiError(RuntimeError):
+    """A REST call answered with an error status"""
+
+    def __init__(self, method: str, path: str, status: int, body: Any):
+        super().__init__(f"{method} {path} -> {status}: {str(body)[:300]}")
+        self.status = status
+        self.body = body
+
+
+def _response_body(response: Any) -> Any:
+    # Gateways answer errors with HTML or plain text (502 pages, Kong 404s)
+    if not response.content:
+        return None
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+def _filter_params(filters: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    # PostgREST filters: scalar -> eq, list -> in, "op.value" strings pass through
+    params = {}
+    for column, value in (filters or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            params[column] = "in.(" + ",".join(str(item) for item in value) + ")"
+        elif isinstance(value, str) and value.split(".", 1)[0] in (
+                "eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is", "in", "not"):
+            params[column] = value
+        elif value is None:
+            params[column] = "is.null"
+        else:
+            params[column] = f"eq.{str(value).lower() if isinstance(value, bool) else value}"
+    return params
+
+
+class ShopHubApiClient:
+    """Async Supabase REST client with a shared connection pool
+
+    Requests without an explicit token use the token set by ``sign_in``,
+    ``sign_in_as`` or ``use_token`` (or the anon key when none is set).
+    ``stats`` counts requests and their cumulative latency.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_SUPABASE_URL,
+        anon_key: str = DEFAULT_ANON_KEY,
+        max_connections: int = 20,
+        http2: Optional[bool] = None,
+        timeout: float = 10.0
+    ):
+        httpx = _httpx()
+        if http2 is None:
+            try:
+                import h2  # noqa: F401
+                http2 = True
+            except ImportError:
+                http2 = False
+        self.base_url = base_url.rstrip("/")
+        self.anon_key = anon_key
+        self.token: Optional[str] = None
+        self.stats = {"requests": 0, "errors": 0, "seconds": 0.0, "token_reuses": 0}
+        self._sign_in_locks: Dict[str, asyncio.Lock] = {}
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections,
+                                keepalive_expiry=30.0),
+            headers={"apikey": anon_key, "Content-Type": "application/json"},
+        )
+
+    async def __aenter__(self) -> "ShopHubApiClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close every pooled connection"""
+        await self._client.aclose()
+
+    # --- Auth -------------------------------------------------------------
+
+    def use_token(self, auth: Dict[str, Any]) -> str:
+        """
+        Use a token from an auth response for later requests
+
+        Args:
+            auth: Supabase token response (``access_token``) or
+                ``mock_authentication_success()`` (``token``)
+
+        Returns: The token
+        """
+        self.token = auth.get("access_token") or auth["token"]
+        return self.token
+
+    async def sign_in(self, email: str, password: str) -> str:
+        """
+        Sign in with a password, reusing a cached token when still valid
+
+        Concurrent sign ins for one account wait for a single request.
+
+        Args:
+            email: Account email
+            password: Account password
+
+        Returns: Access token (also used for later requests)
+        """
+        key = (self.base_url, email)
+        lock = self._sign_in_locks.setdefault(email, asyncio.Lock())
+        async with lock:
+            cached = _TOKEN_CACHE.get(key)
+            if cached and cached[1] > time.time():
+                self.stats["token_reuses"] += 1
+                self.token = cached[0]
+                return self.token
+            auth = await self.request("POST", "/auth/v1/token", params={"grant_type": "password"},
+                                      json={"email": email, "password": password}, token="")
+            _TOKEN_CACHE[key] = (auth["access_token"],
+                                 time.time() + float(auth.get("expires_in", 3600)) - _TOKEN_MARGIN)
+            return self.use_token(auth)
+
+    async def sign_in_as(self, role: str) -> str:
+        """
+        Sign in with the seeded test account of a role
+
+        Args:
+            role: "customer", "vendor" or "admin"
+
+        Returns: Access token
+        """
+        credentials = TEST_CREDENTIALS[role]
+        return await self.sign_in(credentials["email"], credentials["password"])
+
+    # --- Requests ---------------------------------------------------------
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        token: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Send a request over the pool
+
+        Args:
+            method: HTTP method
+            path: Path below the Supabase URL
+            token: Bearer token ("" for none; default: the client token)
+            headers: Extra headers
+            **kwargs: Passed to ``httpx.AsyncClient.request`` (params, json, ...)
+
+        Returns: Decoded JSON body, the text of a non-JSON body, or None
+            when empty
+
+        Raises:
+            ApiError: Status 400 or above
+        """
+        token = self.token if token is None else token
+        request_headers = dict(headers or {})
+        if token or self.anon_key:
+            request_headers["Authorization"] = f"Bearer {token or self.anon_key}"
+        start = time.perf_counter()
+        response = await self._client.request(method, path, headers=request_headers, **kwargs)
+        self.stats["requests"] += 1
+        self.stats["seconds"] += time.perf_counter() - start
+        if response.status_code >= 400:
+            self.stats["errors"] += 1
+            raise ApiError(method, path, response.status_code, _response_body(response))
+        return _response_body(response)
+
+    async def select(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: str = "*",
+        order: Optional[str] = None,
+        limit: Optional[int] = None,
+        token: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read rows from a table
+
+        Args:
+            table: Table name
+            filters: Column to value (eq), list (in), None (is null) or a
+                raw PostgREST filter such as "gte.5"
+            columns: PostgREST select list, embedded resources included
+            order: PostgREST order, e.g. "created_at.desc"
+            limit: Maximum number of rows
+            token: Bearer token override
+
+        Returns: List of rows
+        """
+        params = dict(_filter_params(filters), select=columns)
+        if order:
+            params["order"] = order
+        if limit is not None:
+            params["limit"] = str(limit)
+        return await self.request("GET", f"/rest/v1/{table}", params=params, token=token)
+
+    async def count(self, table: str, filters: Optional[Dict[str, Any]] = None,
+                    token: Optional[str] = None) -> int:
+        """
+        Count rows matching filters without transferring them
+
+        Args:
+            table: Table name
+            filters: Filters as for ``select``
+            token: Bearer token override
+
+        Returns: Row count
+        """
+        token = self.token if token is None else token
+        start = time.perf_counter()
+        response = await self._client.head(
+            f"/rest/v1/{table}", params=dict(_filter_params(filters), select="*"),
+            headers={"Prefer": "count=exact",
+                     "Authorization": f"Bearer {token or self.anon_key}"},
+        )
+        self.stats["requests"] += 1
+        self.stats["seconds"] += time.perf_counter() - start
+        if response.status_code >= 400:
+            self.stats["errors"] += 1
+            raise ApiError("HEAD", f"/rest/v1/{table}", response.status_code, None)
+        return int(response.headers.get("content-range", "*/0").rsplit("/", 1)[1])
+
+    async def insert(self, table: str, rows: Any, token: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Insert one row or a list of rows
+
+        Args:
+            table: Table name
+            rows: Row dictionary or list of them
+            token: Bearer token override
+
+        Returns: Inserted rows
+        """
+        return await self.request("POST", f"/rest/v1/{table}", json=rows, token=token,
+                                  headers={"Prefer": "return=representation"})
+
+    async def update(self, table: str, values: Dict[str, Any], filters: Dict[str, Any],
+                     token: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Update matching rows
+
+        Args:
+            table: Table name
+            values: Columns to set
+            filters: Filters as for ``select`` (required, to avoid full-table updates)
+            token: Bearer token override
+
+        Returns: Updated rows
+        """
+        return await self.request("PATCH", f"/rest/v1/{table}", params=_filter_params(filters),
+                                  json=values, token=token,
+                                  headers={"Prefer": "return=representation"})
+
+    async def delete(self, table: str, filters: Dict[str, Any],
+                     token: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Delete matching rows
+
+        Args:
+            table: Table name
+            filters: Filters as for ``select`` (required)
+            token: Bearer token override
+
+        Returns: Deleted rows
+        """
+        return await self.request("DELETE", f"/rest/v1/{table}", params=_filter_params(filters),
+                                  token=token, headers={"Prefer": "return=representation"})
+
+    async def rpc(self, function: str, args: Optional[Dict[str, Any]] = None,
+                  token: Optional[str] = None) -> Any:
+        """
+        Call a Postgres function exposed by PostgREST
+
+        Args:
+            function: Function name
+            args: Function arguments
+            token: Bearer token override
+
+        Returns: Function result
+        """
+        return await self.request("POST", f"/rest/v1/rpc/{function}", json=args or {}, token=token)
+
+    async def batch(self, calls: Sequence[Awaitable[Any]],
+                    return_exceptions: bool = True) -> List[Any]:
+        """
+        Run several calls concurrently over the pool
+
+        Args:
+            calls: Coroutines from this client (``select``, ``count``, ...)
+            return_exceptions: Return errors in place instead of raising
+
+        Returns: Results in call order
+        """
+        return list(await asyncio.gather(*calls, return_exceptions=return_exceptions))
+
+
+async def benchmark_throughput(
+    table: str = "products",
+    requests: int = 200,
+    concurrency: int = 20,
+    base_url: str = DEFAULT_SUPABASE_URL,
+    anon_key: str = DEFAULT_ANON_KEY
+) -> Dict[str, Any]:
+    """
+    Time the same reads sequentially and concurrently over one pool
+
+    Args:
+        table: Table to read
+        requests: Number of requests per mode
+        concurrency: Pool size and concurrent requests
+        base_url: Supabase URL
+        anon_key: Supabase anon key
+
+    Returns: Dictionary with requests per second for both modes
+    """
+    async with ShopHubApiClient(base_url, anon_key, max_connections=concurrency) as api:
+        await api.select(table, limit=1)  # open the first connection
+        start = time.perf_counter()
+        for _ in range(requests):
+            await api.select(table, limit=10)
+        sequential = time.perf_counter() - start
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one() -> None:
+            async with semaphore:
+                await api.select(table, limit=10)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        concurrent = time.perf_counter() - start
+        return {
+            "requests": requests,
+            "concurrency": concurrency,
+            "sequential_rps": round(requests / sequential, 1),
+            "concurrent_rps": round(requests / concurrent, 1),
+            "errors": api.stats["errors"],
+        }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Benchmark API throughput over the pooled client"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--table", default="products")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--url", default=DEFAULT_SUPABASE_URL, help="Supabase URL")
+    parser.add_argument("--anon-key", default=DEFAULT_ANON_KEY)
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(benchmark_throughput(args.table, args.requests, args.concurrency,
+                                              args.url, args.anon_key))
+    print(json.dumps(result))
+    return 0 if not result["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Test Artifacts Module
+Contains a background pipeline for failure screenshots and Playwright traces
+"""
+import hashlib
+import io
+import json
+import os
+import queue
+import shutil
+import threading
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_ARTIFACTS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "tmp", "artifacts"
+)
+
+
+def perceptual_hash(image: bytes, hash_size: int = 8) -> int:
+    """
+    Compute a difference hash (dHash) of an encoded image
+
+    Falls back to an exact content hash when Pillow is not installed, so
+    deduplication degrades to byte-identical images only.
+
+    Args:
+        image: Encoded image bytes (PNG or JPEG)
+        hash_size: Width/height of the hash grid
+
+    Returns: Integer hash
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return int.from_bytes(hashlib.sha1(image).digest()[:8], "big")
+
+    with Image.open(io.BytesIO(image)) as img:
+        gray = img.convert("L").resize((hash_size + 1, hash_size))
+        pixels = list(gray.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    Count differing bits between two hashes
+
+    Args:
+        a: First hash
+        b: Second hash
+
+    Returns: Number of differing bits
+    """
+    return bin(a ^ b).count("1")
+
+
+def compress_image(image: bytes, jpeg_quality: Optional[int] = None) -> bytes:
+    """
+    Re-encode an image to reduce its size on disk
+
+    Args:
+        image: Encoded image bytes
+        jpeg_quality: Encode as JPEG with this quality instead of optimized PNG
+
+    Returns: Compressed image bytes (unchanged if Pillow is not installed)
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return image
+
+    out = io.BytesIO()
+    with Image.open(io.BytesIO(image)) as img:
+        if jpeg_quality:
+            img.convert("RGB").save(out, format="JPEG", quality=jpeg_quality, optimize=True)
+        else:
+            img.save(out, format="PNG", optimize=True)
+    compressed = out.getvalue()
+    return compressed if len(compressed) < len(image) else image
+
+
+class ArtifactPipeline:
+    """Writes test artifacts on a background thread
+
+    Screenshots are compressed and deduplicated: byte-identical captures are
+    aliased across tests, near duplicates (by perceptual hash) only within
+    the same test, so two different failures on the same page keep their own
+    evidence. Aliases are recorded in the manifest instead of being written
+    again. Submitting never blocks the test.
+
+    Each process writes its own manifest (``manifest_<shard>.json``, one per
+    xdist worker), so workers sharing the output directory do not overwrite
+    each other's entries.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = DEFAULT_ARTIFACTS_DIR,
+        hash_threshold: int = 4,
+        jpeg_quality: Optional[int] = None,
+        max_queue: int = 256,
+        shard: Optional[str] = None
+    ):
+        self.output_dir = output_dir
+        self.shard = shard or os.environ.get("PYTEST_XDIST_WORKER", "main")
+        self.hash_threshold = hash_threshold
+        self.jpeg_quality = jpeg_quality
+        self.manifest: List[Dict[str, Any]] = []
+        self.stats = {"screenshots": 0, "duplicates": 0, "traces": 0, "dropped": 0,
+                      "bytes_in": 0, "bytes_out": 0}
+        self._hashes: Dict[str, List[tuple]] = {}
+        self._digests: Dict[str, str] = {}
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="artifact-pipeline", daemon=True
+        )
+        self._closed = False
+        os.makedirs(output_dir, exist_ok=True)
+        self._thread.start()
+
+    @property
+    def manifest_path(self) -> str:
+        """Manifest file this process writes"""
+        return os.path.join(self.output_dir, f"manifest_{self.shard}.json")
+
+    def path_for(self, name: str, suffix: str) -> str:
+        """
+        Build an artifact path inside the output directory
+
+        Args:
+            name: Artifact name (usually the pytest node id)
+            suffix: File suffix including the dot
+
+        Returns: Absolute artifact path
+        """
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        return os.path.join(self.output_dir, f"{safe}{suffix}")
+
+    def submit_screenshot(self, name: str, image: bytes, test: Optional[str] = None) -> None:
+        """
+        Queue a screenshot for compression, deduplication and writing
+
+        Args:
+            name: Artifact name
+            image: Encoded screenshot bytes from ``page.screenshot()``
+            test: Test the capture belongs to (e.g. the pytest node id); near
+                duplicates are only aliased within one test (default: ``name``)
+        """
+        self._submit(("screenshot", name, (test or name, image)))
+
+    def submit_file(self, name: str, path: str, kind: str = "trace") -> None:
+        """
+        Queue an already written file (e.g. a trace zip) for the manifest
+
+        Files outside the output directory are moved into it.
+
+        Args:
+            name: Artifact name
+            path: Path of the file on disk
+            kind: Artifact kind recorded in the manifest
+        """
+        self._submit((kind, name, path))
+
+    def _submit(self, item: tuple) -> None:
+        if self._closed:
+            raise RuntimeError("ArtifactPipeline is closed")
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                kind, name, payload = item
+                if kind == "screenshot":
+                    self._write_screenshot(name, payload)
+                else:
+                    self._record_file(kind, name, payload)
+            except Exception as exc:  # never let one artifact kill the writer
+                self.manifest.append({"name": item[1], "kind": item[0], "error": str(exc)})
+            finally:
+                self._queue.task_done()
+
+    def _write_screenshot(self, name: str, payload: tuple) -> None:
+        test, image = payload
+        self.stats["screenshots"] += 1
+        self.stats["bytes_in"] += len(image)
+        digest = hashlib.sha1(image).hexdigest()
+        phash = perceptual_hash(image)
+
+        known_path = self._digests.get(digest)
+        if known_path is None:
+            for known_hash, path in self._hashes.get(test, ()):
+                if hamming_distance(phash, known_hash) <= self.hash_threshold:
+                    known_path = path
+                    break
+        if known_path is not None:
+            self.stats["duplicates"] += 1
+            self.manifest.append({"name": name, "kind": "screenshot",
+                                  "path": known_path, "duplicate": True})
+            return
+
+        data = compress_image(image, self.jpeg_quality)
+        path = self.path_for(name, ".jpg" if self.jpeg_quality else ".png")
+        with open(path, "wb") as f:
+            f.write(data)
+        self.stats["bytes_out"] += len(data)
+        self._hashes.setdefault(test, []).append((phash, path))
+        self._digests[digest] = path
+        self.manifest.append({"name": name, "kind": "screenshot", "path": path,
+                              "phash": f"{phash:016x}", "duplicate": False})
+
+    def _record_file(self, kind: str, name: str, path: str) -> None:
+        if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.output_dir):
+            target = os.path.join(self.output_dir, os.path.basename(path))
+            shutil.move(path, target)
+            path = target
+        if kind == "trace":
+            self.stats["traces"] += 1
+        self.manifest.append({"name": name, "kind": kind, "path": path})
+
+    def flush(self) -> None:
+        """Block until every queued artifact has been written"""
+        self._queue.join()
+
+    def close(self, timeout: Optional[float] = 30.0) -> Dict[str, Any]:
+        """
+        Drain the queue, stop the writer thread and write the manifest
+
+        Args:
+            timeout: Seconds to wait for the writer thread
+
+        Returns: Pipeline statistics
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join(timeout)
+            if self.manifest:
+                with open(self.manifest_path, "w") as f:
+                    json.dump({"stats": self.stats, "artifacts": self.manifest}, f, indent=2)
+        return self.stats
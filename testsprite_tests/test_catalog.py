@@ -0,0 +1,415 @@
+"""
+Test Catalog Module
+Contains the synthetic catalog seeding engine for search-at-scale tests
+
+Run as a script to seed catalogs of increasing size into a local Postgres
+and record the latency-vs-size curve of the marketplace search. Seeded rows
+carry the ``seed_`` id prefix and only those are replaced, so the database
+must be named explicitly:
+
+    python test_catalog.py --dsn postgresql://... --sizes 10000 100000 --output curve.csv
+"""
+import argparse
+import asyncio
+import bisect
+import csv
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from test_mocks import mock_product_data, mock_user_data
+from test_postgres import apply_schema, connect, copy_rows, explicit_dsn
+
+
+CATALOG_SIZES = (10_000, 100_000, 1_000_000)
+
+# Id prefix of every seeded vendor and product
+SEED_PREFIX = "seed_"
+
+CATEGORY_NOUNS = {
+    "Electronics": ["Mouse", "Keyboard", "Headphones", "Charger", "Monitor", "Speaker",
+                    "Webcam", "Router", "Smartwatch", "Tablet"],
+    "Clothing": ["T-Shirt", "Jacket", "Hoodie", "Jeans", "Dress", "Scarf", "Sweater",
+                 "Cap", "Socks", "Blazer"],
+    "Home": ["Coffee Maker", "Lamp", "Blender", "Cushion", "Kettle", "Vase", "Rug",
+             "Toaster", "Candle", "Shelf"],
+    "Books": ["Novel", "Cookbook", "Notebook", "Atlas", "Biography", "Guide",
+              "Anthology", "Workbook", "Journal", "Comic"],
+    "Sports": ["Running Shoes", "Yoga Mat", "Dumbbell", "Water Bottle", "Tennis Racket",
+               "Backpack", "Bike Helmet", "Jump Rope", "Gym Bag", "Football"],
+}
+ADJECTIVES = ["Wireless", "Portable", "Premium", "Classic", "Compact", "Ergonomic",
+              "Vintage", "Smart", "Eco", "Deluxe", "Lightweight", "Pro", "Mini",
+              "Organic", "Limited Edition"]
+BRANDS = ["Acme", "Nova", "Zenith", "Orbit", "Summit", "Pioneer", "Aurora", "Vertex",
+          "Harbor", "Lumen", "Cobalt", "Maple"]
+
+# Search terms mirroring what shoppers type (head, torso and tail terms)
+SEARCH_TERMS = ["mouse", "wireless", "shoes", "coffee", "edition", "acme", "xyzzy"]
+
+MARKETPLACE_QUERY = """
+    SELECT p.id, p.name, p.category, p.price, p.stock, p.rating, v.business_name
+    FROM products p
+    JOIN vendors v ON v.id = p.vendor_id
+    WHERE p.status = 'active' AND p.name ILIKE %s
+    ORDER BY p.created_at DESC
+"""
+
+PRODUCT_COLUMNS = ("id", "vendor_id", "name", "description", "category", "price",
+                   "stock", "status", "rating", "reviews_count", "created_at")
+VENDOR_COLUMNS = ("id", "user_id", "business_name", "payout_email", "status",
+                  "commission_rate", "total_sales", "rating")
+
+
+def zipf_cum_weights(n: int, s: float = 1.1) -> List[float]:
+    """
+    Build cumulative Zipf weights for ranks 1..n
+
+    Args:
+        n: Number of ranks
+        s: Zipf exponent (larger is more skewed)
+
+    Returns: Cumulative weights usable with ``random.choices(cum_weights=...)``
+    """
+    return list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def _zipf_pick(rng: random.Random, items: Sequence[Any], cum_weights: List[float]) -> Any:
+    return items[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+
+def generate_vendors(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Mock: Generate vendor rows
+
+    Args:
+        count: Number of vendors
+        seed: Random seed
+
+    Returns: List of vendor dictionaries
+    """
+    rng = random.Random(seed)
+    vendors = []
+    for i in range(count):
+        user = mock_user_data(user_id=f"vendor_user_{i:05d}", role="vendor")
+        vendors.append({
+            "id": f"{SEED_PREFIX}vendor_{i:05d}",
+            "user_id": user["id"],
+            "business_name": f"{rng.choice(BRANDS)} {rng.choice(['Store', 'Goods', 'Outlet', 'Co', 'Market'])} {i}",
+            "payout_email": user["email"],
+            "status": "active" if rng.random() > 0.05 else "pending",
+            "commission_rate": rng.choice([5, 8, 10, 12, 15]),
+            "total_sales": 0,
+            "rating": round(rng.uniform(3.0, 5.0), 2),
+        })
+    return vendors
+
+
+def generate_catalog(
+    size: int,
+    vendors: Sequence[Dict[str, Any]],
+    seed: int = 0,
+    zipf_s: float = 1.1
+) -> Iterator[Dict[str, Any]]:
+    """
+    Mock: Stream realistic product rows built on ``mock_product_data``
+
+    Vendor assignment and category mix follow Zipf distributions (a few
+    large vendors and categories dominate), and popularity — review count
+    and rating — decays with a Zipf law over the product's popularity rank.
+
+    Args:
+        size: Number of products
+        vendors: Vendor rows from ``generate_vendors``
+        seed: Random seed
+        zipf_s: Zipf exponent for popularity
+
+    Yields: Product dictionaries
+    """
+    rng = random.Random(seed)
+    vendor_ids = [vendor["id"] for vendor in vendors]
+    vendor_weights = zipf_cum_weights(len(vendor_ids), 1.0)
+    categories = list(CATEGORY_NOUNS)
+    category_weights = zipf_cum_weights(len(categories), 0.8)
+    max_reviews = 5000
+    now = datetime.now()
+
+    for i in range(size):
+        category = _zipf_pick(rng, categories, category_weights)
+        product = mock_product_data(
+            product_id=f"{SEED_PREFIX}prod_{i:07d}",
+            vendor_id=_zipf_pick(rng, vendor_ids, vendor_weights),
+            stock=rng.choice([0, 1, 2, 5]) if rng.random() < 0.05 else rng.randint(10, 500)
+        )
+        rank = rng.randint(1, size)
+        reviews = int(max_reviews / (rank ** zipf_s))
+        product.update({
+            "name": f"{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} "
+                    f"{rng.choice(CATEGORY_NOUNS[category])} {i}",
+            "category": category,
+            # mock_product_data draws the price from the global generator
+            "price": round(rng.uniform(10.0, 500.0), 2),
+            "reviews_count": reviews,
+            "rating": round(3.5 + rng.random() * 1.5, 1) if reviews else 0.0,
+            "created_at": (now - timedelta(seconds=rng.randint(0, 365 * 86400))).isoformat(),
+            "status": "active" if rng.random() > 0.02 else "inactive",
+        })
+        yield product
+
+
+def seed_catalog(
+    conn: Any,
+    size: int,
+    vendor_count: int = 1000,
+    seed: int = 0,
+    batch_size: int = 50000,
+    trigram_index: bool = False
+) -> Dict[str, Any]:
+    """
+    Replace the seeded catalog with ``size`` synthetic products using COPY batches
+
+    Only rows with the ``seed_`` id prefix (and rows referencing them) are
+    deleted first; the rest of the database is left alone.
+
+    Args:
+        conn: psycopg Connection
+        size: Number of products
+        vendor_count: Number of vendors
+        seed: Random seed
+        batch_size: Rows per COPY batch
+        trigram_index: Also build a pg_trgm GIN index on products.name
+
+    Returns: Dictionary with row counts and load timings
+    """
+    apply_schema(conn)
+    clear_seeded(conn)
+    with conn.cursor() as cur:
+        cur.execute("DROP INDEX IF EXISTS products_name_trgm_idx")
+    conn.commit()
+
+    start = time.perf_counter()
+    vendors = generate_vendors(vendor_count, seed=seed)
+    copy_rows(conn, "vendors", VENDOR_COLUMNS,
+              (tuple(v[c] for c in VENDOR_COLUMNS) for v in vendors), batch_size)
+    loaded = copy_rows(
+        conn, "products", PRODUCT_COLUMNS,
+        (tuple(p[c] for c in PRODUCT_COLUMNS)
+         for p in generate_catalog(size, vendors, seed=seed)),
+        batch_size
+    )
+    load_seconds = time.perf_counter() - start
+
+    with conn.cursor() as cur:
+        if trigram_index:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cur.execute("CREATE INDEX products_name_trgm_idx ON products "
+                        "USING gin (name gin_trgm_ops)")
+        cur.execute("ANALYZE products")
+        cur.execute("ANALYZE vendors")
+    conn.commit()
+
+    return {
+        "products": loaded,
+        "vendors": len(vendors),
+        "load_seconds": round(load_seconds, 3),
+        "rows_per_second": round(loaded / load_seconds) if load_seconds else None,
+        "index_seconds": round(time.perf_counter() - start - load_seconds, 3),
+    }
+
+
+def clear_seeded(conn: Any) -> None:
+    """
+    Delete the seeded catalog and the rows that reference it
+
+    Args:
+        conn: psycopg Connection
+    """
+    pattern = f"{SEED_PREFIX}%"
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM cart_items WHERE product_id LIKE %s", (pattern,))
+        cur.execute("DELETE FROM reviews WHERE product_id LIKE %s", (pattern,))
+        cur.execute("DELETE FROM sub_orders WHERE vendor_id LIKE %s", (pattern,))
+        cur.execute("DELETE FROM products WHERE id LIKE %s OR vendor_id LIKE %s",
+                    (pattern, pattern))
+        cur.execute("DELETE FROM vendors WHERE id LIKE %s", (pattern,))
+    conn.commit()
+
+
+def measure_search_latency(
+    conn: Any,
+    terms: Sequence[str] = SEARCH_TERMS,
+    repeats: int = 5
+) -> Dict[str, Any]:
+    """
+    Time the marketplace ``ilike('name', '%term%')`` query
+
+    Args:
+        conn: psycopg Connection
+        terms: Search terms
+        repeats: Executions per term (the first one warms the cache)
+
+    Returns: Dictionary with p50/p95/max latency in milliseconds and row counts
+    """
+    samples = []
+    rows = {}
+    with conn.cursor() as cur:
+        for term in terms:
+            for attempt in range(repeats + 1):
+                start = time.perf_counter()
+                cur.execute(MARKETPLACE_QUERY, (f"%{term}%",))
+                rows[term] = len(cur.fetchall())
+                if attempt:
+                    samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "search_p50_ms": round(statistics.median(samples), 2),
+        "search_p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 2),
+        "search_max_ms": round(samples[-1], 2),
+        "rows_per_term": rows,
+    }
+
+
+async def measure_page_search(
+    marketplace: Any,
+    terms: Sequence[str] = SEARCH_TERMS,
+    repeats: int = 3,
+    timeout: int = 30000
+) -> Dict[str, Any]:
+    """
+    Time the marketplace search in an open page
+
+    Each sample runs from filling the search box to the end of the products
+    query it triggers, so browser start-up and page loads are not counted.
+    Terms are searched round-robin (the same term twice in a row would not
+    trigger a query); the first round warms the page up.
+
+    Args:
+        marketplace: ``MarketplacePage`` of an open browser page
+        terms: Search terms (at least two)
+        repeats: Measured rounds over the terms
+        timeout: Wait timeout in milliseconds
+
+    Returns: Dictionary with p50/p95/max page search latency in milliseconds
+    """
+    page = marketplace.page
+    await marketplace.open(timeout=timeout)
+    samples = []
+    for attempt in range(repeats + 1):
+        for term in terms:
+            start = time.perf_counter()
+            async with page.expect_response(lambda response: "/rest/v1/products" in response.url,
+                                            timeout=timeout) as info:
+                await marketplace.locator("search").fill(term, timeout=timeout)
+            await (await info.value).finished()
+            if attempt:
+                samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "page_search_p50_ms": round(statistics.median(samples), 2),
+        "page_search_p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 2),
+        "page_search_max_ms": round(samples[-1], 2),
+    }
+
+
+async def _scale_curve(
+    sizes: Sequence[int],
+    dsn: str,
+    vendor_count: int,
+    trigram_index: bool,
+    repeats: int,
+    base_url: Optional[str],
+    headless: bool
+) -> List[Dict[str, Any]]:
+    from pages import ShopHubPages
+    from test_stubs import stub_cleanup, stub_full_page_setup
+
+    pw = browser = context = marketplace = None
+    if base_url:
+        pw, browser, context, page = await stub_full_page_setup(base_url, headless=headless)
+        marketplace = ShopHubPages(page, base_url).marketplace
+    curve = []
+    try:
+        with connect(dsn) as conn:
+            for size in sizes:
+                row: Dict[str, Any] = {"size": size}
+                row.update(seed_catalog(conn, size, vendor_count=vendor_count,
+                                        trigram_index=trigram_index))
+                row.update(measure_search_latency(conn, repeats=repeats))
+                if marketplace is not None:
+                    row.update(await measure_page_search(marketplace, repeats=repeats))
+                curve.append(row)
+                print(json.dumps({k: v for k, v in row.items() if k != "rows_per_term"}))
+    finally:
+        if pw is not None:
+            await stub_cleanup(context, browser, pw)
+    return curve
+
+
+def run_scale_curve(
+    sizes: Sequence[int] = CATALOG_SIZES,
+    dsn: Optional[str] = None,
+    vendor_count: int = 1000,
+    trigram_index: bool = False,
+    repeats: int = 5,
+    base_url: Optional[str] = "http://localhost:3000",
+    headless: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Seed each catalog size and time the search query and the marketplace page
+
+    One browser page stays open on the marketplace for every size. The app
+    must read from the database given by ``dsn`` for the page column to
+    reflect the seeded catalog.
+
+    Args:
+        sizes: Catalog sizes to test
+        dsn: Postgres connection string (required, or ``SHOPHUB_DATABASE_URL``)
+        vendor_count: Number of vendors
+        trigram_index: Build a pg_trgm index before measuring
+        repeats: Query executions per search term
+        base_url: App URL for the page measurement (None skips the browser)
+        headless: Run browser in headless mode
+
+    Returns: One result row per catalog size
+    """
+    return asyncio.run(_scale_curve(sizes, explicit_dsn(dsn), vendor_count, trigram_index,
+                                    repeats, base_url, headless))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Seed catalogs of increasing size and write the latency-vs-size curve"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(CATALOG_SIZES))
+    parser.add_argument("--dsn", default=None,
+                        help="Postgres connection string (or set SHOPHUB_DATABASE_URL)")
+    parser.add_argument("--vendors", type=int, default=1000)
+    parser.add_argument("--trigram", action="store_true",
+                        help="Build a pg_trgm GIN index on products.name")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--no-browser", action="store_true",
+                        help="Only time the query, not the marketplace page")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--output", default=None, help="Write the curve as CSV")
+    args = parser.parse_args(argv)
+
+    curve = run_scale_curve(args.sizes, dsn=args.dsn, vendor_count=args.vendors,
+                            trigram_index=args.trigram, repeats=args.repeats,
+                            base_url=None if args.no_browser else args.base_url,
+                            headless=not args.headed)
+    if args.output:
+        fields = [key for key in curve[0] if key != "rows_per_term"]
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(curve)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
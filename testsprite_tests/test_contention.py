@@ -0,0 +1,328 @@
+"""
+Test Contention Module
+Contains the checkout concurrency and stock-contention stress harness
+
+Many shoppers check out the same low-stock products at the same moment
+against the local Postgres, following the Checkout page's table writes
+(orders, sub_orders per vendor, stock decrement, cart_items cleanup).
+The harness measures throughput and latency and checks the invariants that
+TC011/TC020 check for a single shopper:
+
+    python test_contention.py --shoppers 50 --products 3 --stock 5
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+from test_mocks import mock_product_data
+from test_postgres import apply_schema, connect, explicit_dsn
+
+
+# "client" mirrors the app: read stock with the cart, check it, then write
+# the computed value back. "atomic" decrements with a conditional UPDATE.
+CHECKOUT_STRATEGIES = ("client", "atomic")
+
+CART_QUERY = """
+SELECT c.product_id, c.quantity, p.price, p.stock, p.vendor_id, v.commission_rate
+FROM cart_items c
+JOIN products p ON p.id = c.product_id
+JOIN vendors v ON v.id = p.vendor_id
+WHERE c.user_id = %s
+ORDER BY c.product_id
+"""
+
+
+def seed_contention(
+    conn: Any,
+    run_id: str,
+    shoppers: int,
+    products: int = 3,
+    stock: int = 5,
+    vendors: int = 2,
+    quantity: int = 1
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Create low-stock products and a cart holding all of them per shopper
+
+    Products are spread over several vendors so every checkout is split
+    into sub-orders, as in TC011.
+
+    Args:
+        conn: psycopg Connection
+        run_id: Prefix for every row of this run
+        shoppers: Number of shoppers (one cart each)
+        products: Number of contended products
+        stock: Initial stock of each product
+        vendors: Number of vendors owning the products
+        quantity: Units of each product in every cart
+
+    Returns: Dictionary of product id to product row
+    """
+    apply_schema(conn)
+    catalog = {}
+    with conn.cursor() as cur:
+        for v in range(vendors):
+            cur.execute(
+                "INSERT INTO vendors (id, user_id, business_name, commission_rate) "
+                "VALUES (%s, %s, %s, %s)",
+                (f"{run_id}_vendor_{v}", f"{run_id}_vendor_user_{v}", f"Vendor {v}", 10 + v),
+            )
+        for p in range(products):
+            product = mock_product_data(f"{run_id}_prod_{p}", f"{run_id}_vendor_{p % vendors}",
+                                        stock=stock)
+            cur.execute(
+                "INSERT INTO products (id, vendor_id, name, category, price, stock) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                (product["id"], product["vendor_id"], product["name"], product["category"],
+                 product["price"], product["stock"]),
+            )
+            catalog[product["id"]] = product
+        for s in range(shoppers):
+            for product_id in catalog:
+                cur.execute(
+                    "INSERT INTO cart_items (id, user_id, product_id, quantity) "
+                    "VALUES (%s, %s, %s, %s)",
+                    (f"{product_id}_cart_{s}", f"{run_id}_shopper_{s}", product_id, quantity),
+                )
+    conn.commit()
+    return catalog
+
+
+def checkout(conn: Any, user_id: str, order_id: str, strategy: str = "client") -> Dict[str, Any]:
+    """
+    Check out one shopper's cart in a single transaction
+
+    Args:
+        conn: psycopg Connection (not shared with other threads)
+        user_id: Shopper id
+        order_id: Id for the new order
+        strategy: One of ``CHECKOUT_STRATEGIES``
+
+    Returns: Dictionary with outcome ("ordered", "insufficient_stock" or
+        "error"), latency in milliseconds and units bought per product
+    """
+    start = time.perf_counter()
+    units: Dict[str, int] = {}
+    try:
+        with conn.cursor() as cur:
+            cur.execute(CART_QUERY, (user_id,))
+            items = cur.fetchall()
+            if strategy == "client" and any(qty > stock for _, qty, _, stock, _, _ in items):
+                conn.rollback()
+                return _outcome("insufficient_stock", start, units)
+
+            by_vendor: Dict[str, List[Decimal]] = {}
+            for _, qty, price, _, vendor_id, rate in items:
+                subtotal = price * qty
+                totals = by_vendor.setdefault(vendor_id, [Decimal(0), Decimal(0)])
+                totals[0] += subtotal
+                totals[1] += subtotal * rate / 100
+            cur.execute(
+                "INSERT INTO orders (id, user_id, total_amount) VALUES (%s, %s, %s)",
+                (order_id, user_id, sum(t[0] for t in by_vendor.values())),
+            )
+            for index, (vendor_id, (subtotal, commission)) in enumerate(by_vendor.items()):
+                cur.execute(
+                    "INSERT INTO sub_orders (id, order_id, vendor_id, subtotal, commission) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    (f"{order_id}_sub_{index}", order_id, vendor_id, subtotal,
+                     commission.quantize(Decimal("0.01"))),
+                )
+
+            for product_id, qty, _, stock, _, _ in items:
+                if strategy == "client":
+                    cur.execute("UPDATE products SET stock = %s WHERE id = %s",
+                                (stock - qty, product_id))
+                else:
+                    cur.execute("UPDATE products SET stock = stock - %s "
+                                "WHERE id = %s AND stock >= %s", (qty, product_id, qty))
+                    if cur.rowcount == 0:
+                        conn.rollback()
+                        return _outcome("insufficient_stock", start, {})
+                units[product_id] = qty
+            cur.execute("DELETE FROM cart_items WHERE user_id = %s", (user_id,))
+        conn.commit()
+    except Exception as exc:
+        conn.rollback()
+        return dict(_outcome("error", start, {}), error=str(exc).splitlines()[0])
+    return _outcome("ordered", start, units)
+
+
+def _outcome(outcome: str, start: float, units: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "outcome": outcome,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        "units": units,
+    }
+
+
+def verify_stock(
+    conn: Any,
+    run_id: str,
+    catalog: Dict[str, Dict[str, Any]],
+    results: Sequence[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Check the stock invariants after a stress run
+
+    An oversell is a unit sold beyond the initial stock. A lost update is a
+    committed sale whose stock decrement was overwritten by another
+    checkout (initial minus final stock is less than the units sold).
+    Orphan orders are committed orders the harness did not count as
+    successful, or the reverse.
+
+    Args:
+        conn: psycopg Connection
+        run_id: Prefix of the run's rows
+        catalog: Products from ``seed_contention``
+        results: Results from ``checkout``
+
+    Returns: Dictionary with oversold units, lost updates and order counts
+    """
+    sold = {product_id: 0 for product_id in catalog}
+    for result in results:
+        for product_id, qty in result["units"].items():
+            sold[product_id] += qty
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, stock FROM products WHERE id = ANY(%s)", (list(catalog),))
+        final = dict(cur.fetchall())
+        cur.execute("SELECT count(*) FROM orders WHERE id LIKE %s", (f"{run_id}_order_%",))
+        orders_in_db = cur.fetchone()[0]
+    conn.commit()
+
+    oversold = lost = 0
+    for product_id, product in catalog.items():
+        initial = product["stock"]
+        oversold += max(0, sold[product_id] - initial)
+        lost += max(0, sold[product_id] - (initial - final[product_id]))
+    ordered = sum(1 for result in results if result["outcome"] == "ordered")
+    return {
+        "units_sold": sum(sold.values()),
+        "units_available": sum(product["stock"] for product in catalog.values()),
+        "oversold_units": oversold,
+        "lost_updates": lost,
+        "orders": ordered,
+        "orphan_orders": abs(orders_in_db - ordered),
+    }
+
+
+def cleanup_contention(conn: Any, run_id: str) -> None:
+    """
+    Delete every row created for a run
+
+    Args:
+        conn: psycopg Connection
+        run_id: Prefix of the run's rows
+    """
+    pattern = f"{run_id}_%"
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM cart_items WHERE id LIKE %s", (pattern,))
+        cur.execute("DELETE FROM sub_orders WHERE id LIKE %s", (pattern,))
+        cur.execute("DELETE FROM orders WHERE id LIKE %s", (pattern,))
+        cur.execute("DELETE FROM products WHERE id LIKE %s", (pattern,))
+        cur.execute("DELETE FROM vendors WHERE id LIKE %s", (pattern,))
+    conn.commit()
+
+
+def run_stress(
+    shoppers: int = 50,
+    strategy: str = "client",
+    products: int = 3,
+    stock: int = 5,
+    vendors: int = 2,
+    quantity: int = 1,
+    dsn: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run ``shoppers`` concurrent checkouts of the same low-stock products
+
+    Every shopper has its own connection and thread; all of them start
+    their checkout at the same instant (behind a barrier).
+
+    Args:
+        shoppers: Number of concurrent shoppers
+        strategy: One of ``CHECKOUT_STRATEGIES``
+        products: Number of contended products
+        stock: Initial stock of each product
+        vendors: Number of vendors owning the products
+        quantity: Units of each product in every cart
+        dsn: Postgres connection string (required, or ``SHOPHUB_DATABASE_URL``)
+
+    Returns: Summary with throughput, latency percentiles, outcome counts
+        and the invariant checks from ``verify_stock``
+    """
+    if strategy not in CHECKOUT_STRATEGIES:
+        raise KeyError(f"Unknown strategy {strategy!r}; available: {', '.join(CHECKOUT_STRATEGIES)}")
+    dsn = explicit_dsn(dsn)
+    run_id = f"stress_{uuid.uuid4().hex[:8]}"
+    barrier = threading.Barrier(shoppers, timeout=60)
+
+    def shopper(index: int) -> Dict[str, Any]:
+        with connect(dsn) as conn:
+            barrier.wait()
+            return checkout(conn, f"{run_id}_shopper_{index}", f"{run_id}_order_{index}",
+                            strategy)
+
+    with connect(dsn) as conn:
+        catalog = seed_contention(conn, run_id, shoppers, products=products, stock=stock,
+                                  vendors=vendors, quantity=quantity)
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=shoppers) as pool:
+                results = list(pool.map(shopper, range(shoppers)))
+            elapsed = time.perf_counter() - start
+            checks = verify_stock(conn, run_id, catalog, results)
+        finally:
+            cleanup_contention(conn, run_id)
+
+    latencies = sorted(result["latency_ms"] for result in results)
+    outcomes: Dict[str, int] = {}
+    for result in results:
+        outcomes[result["outcome"]] = outcomes.get(result["outcome"], 0) + 1
+    summary = {
+        "strategy": strategy,
+        "shoppers": shoppers,
+        "seconds": round(elapsed, 3),
+        "checkouts_per_second": round(len(results) / elapsed, 1) if elapsed else None,
+        "latency_p50_ms": latencies[len(latencies) // 2],
+        "latency_p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+        "latency_max_ms": latencies[-1],
+        "outcomes": outcomes,
+        "errors": sorted({result["error"] for result in results if "error" in result}),
+    }
+    summary.update(checks)
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Stress checkout and fail if any strategy oversells or loses updates"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--shoppers", type=int, default=50)
+    parser.add_argument("--products", type=int, default=3)
+    parser.add_argument("--stock", type=int, default=5)
+    parser.add_argument("--vendors", type=int, default=2)
+    parser.add_argument("--quantity", type=int, default=1)
+    parser.add_argument("--strategies", nargs="+", default=list(CHECKOUT_STRATEGIES),
+                        choices=CHECKOUT_STRATEGIES)
+    parser.add_argument("--dsn", default=None,
+                        help="Postgres connection string (or set SHOPHUB_DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    broken = False
+    for strategy in args.strategies:
+        summary = run_stress(args.shoppers, strategy, products=args.products, stock=args.stock,
+                             vendors=args.vendors, quantity=args.quantity, dsn=args.dsn)
+        print(json.dumps(summary))
+        broken |= bool(summary["oversold_units"] or summary["lost_updates"]
+                       or summary["orphan_orders"])
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Test Context Pool Module
+Contains a recycler that resets browser contexts in place instead of
+closing and reopening them
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+from test_stubs import stub_create_context, stub_reset_context
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext
+
+
+# Context methods whose effect outlives the test's pages and that the reset
+# cannot undo (init scripts, headers, permissions, listeners, ...). Routes
+# are only tracked when the context has no ``unroute_all`` to remove them.
+CONTEXT_MUTATORS = (
+    "add_init_script", "expose_binding", "expose_function", "grant_permissions",
+    "set_extra_http_headers", "set_geolocation", "set_offline", "set_http_credentials",
+    "set_default_navigation_timeout", "route_web_socket", "on", "once", "add_listener",
+)
+ROUTE_METHODS = ("route", "route_from_har")
+
+
+def track_mutations(context: BrowserContext) -> Set[str]:
+    """
+    Record calls to context-level mutators on a context
+
+    The mutators are wrapped on the instance, so every caller (tests, page
+    objects, stubs) is seen.
+
+    Args:
+        context: BrowserContext instance
+
+    Returns: Set that receives the name of every mutator called
+    """
+    touched: Set[str] = set()
+    names = CONTEXT_MUTATORS
+    if not hasattr(context, "unroute_all"):
+        names += ROUTE_METHODS
+    for name in names:
+        method = getattr(context, name, None)
+        if method is None:
+            continue
+
+        def wrapper(*args: Any, _method: Any = method, _name: str = name, **kwargs: Any) -> Any:
+            touched.add(_name)
+            return _method(*args, **kwargs)
+
+        setattr(context, name, wrapper)
+    return touched
+
+
+class ContextRecycler:
+    """Hands out browser contexts and recycles them between tests
+
+    ``release`` resets a context (cookies, storage, routes, pages), validates
+    that no state survived and parks it for the next ``acquire``. Contexts on
+    which a test called a context-level mutator (``CONTEXT_MUTATORS``) are
+    never recycled, since the reset cannot undo those. If the reset fails,
+    state leaks or the context was touched, it is closed and the next
+    ``acquire`` creates a fresh one, so isolation is never traded for speed.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        default_timeout: int = 5000,
+        origins: Optional[List[str]] = None,
+        max_idle: int = 4,
+        max_uses: int = 50
+    ):
+        self.browser = browser
+        self.default_timeout = default_timeout
+        self.origins = origins or ["http://localhost:3000"]
+        self.max_idle = max_idle
+        self.max_uses = max_uses
+        self.stats = {"created": 0, "reused": 0, "reset_failures": 0, "retired": 0,
+                      "touched": 0}
+        self._idle: List[BrowserContext] = []
+        self._uses: Dict[int, int] = {}
+        self._touched: Dict[int, Set[str]] = {}
+
+    @property
+    def creations_saved(self) -> int:
+        """Number of context creations avoided by recycling"""
+        return self.stats["reused"]
+
+    async def acquire(self) -> BrowserContext:
+        """
+        Get a clean context, reusing a recycled one when available
+
+        Returns: BrowserContext instance
+        """
+        if self._idle:
+            self.stats["reused"] += 1
+            return self._idle.pop()
+        context = await stub_create_context(self.browser, default_timeout=self.default_timeout)
+        self.stats["created"] += 1
+        self._uses[id(context)] = 0
+        self._touched[id(context)] = track_mutations(context)
+        return context
+
+    async def release(self, context: BrowserContext) -> bool:
+        """
+        Reset a context and keep it for reuse if the reset is verified
+
+        Args:
+            context: Context previously returned by ``acquire``
+
+        Returns: True if the context was recycled, False if it was closed
+        """
+        uses = self._uses.get(id(context), 0) + 1
+        self._uses[id(context)] = uses
+        if uses >= self.max_uses or len(self._idle) >= self.max_idle:
+            self.stats["retired"] += 1
+            await self._close(context)
+            return False
+        if self._touched.get(id(context), {"untracked"}):
+            self.stats["touched"] += 1
+            await self._close(context)
+            return False
+
+        try:
+            await stub_reset_context(context, origins=self.origins)
+            clean = await self.is_clean(context)
+        except Exception:
+            clean = False
+        if not clean:
+            self.stats["reset_failures"] += 1
+            await self._close(context)
+            return False
+
+        context.set_default_timeout(self.default_timeout)
+        self._idle.append(context)
+        return True
+
+    async def is_clean(self, context: BrowserContext) -> bool:
+        """
+        Verify that a reset context carries no state from the previous test
+
+        Args:
+            context: BrowserContext instance
+
+        Returns: True if there are no pages, cookies or origin storage left
+        """
+        if context.pages:
+            return False
+        state = await context.storage_state()
+        if state.get("cookies"):
+            return False
+        return not any(origin.get("localStorage") for origin in state.get("origins", []))
+
+    async def _close(self, context: BrowserContext) -> None:
+        self._uses.pop(id(context), None)
+        self._touched.pop(id(context), None)
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def close(self) -> Dict[str, Any]:
+        """
+        Close every parked context
+
+        Returns: Recycler statistics including ``creations_saved``
+        """
+        while self._idle:
+            await self._close(self._idle.pop())
+        return dict(self.stats, creations_saved=self.creations_saved)
@@ -0,0 +1,467 @@
+"""
+Test Coverage Module
+Contains opt-in V8 JS coverage collection mapped back to the app sources
+
+``JSCoverageCollector`` starts precise block coverage on a page through CDP,
+and on stop converts the covered byte ranges of every script with a source
+map into covered lines of the original files (app/checkout/page.tsx, ...).
+Lines are stored as compact [first, last] ranges, so results from many
+tests and xdist workers merge by range union: each worker writes one shard
+to tmp/coverage/ and the shards are merged for the report. Time spent
+starting, collecting and mapping coverage is reported as collection time.
+The slower execution of instrumented page scripts is part of the tests' own
+time and is not measured here (compare with a run without --js-coverage):
+
+    pytest testsprite_tests/ --js-coverage
+    python test_coverage.py --report
+"""
+import argparse
+import base64
+import bisect
+import functools
+import glob
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from test_runner import TESTS_DIR
+
+
+DEFAULT_COVERAGE_DIR = os.path.join(TESTS_DIR, "tmp", "coverage")
+
+Ranges = List[List[int]]
+
+_B64 = {char: index for index, char in
+        enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+
+# Parsed source maps by script URL, shared by every collector of the process
+_SOURCE_MAP_CACHE: Dict[str, Optional[Dict[str, Any]]] = {}
+
+
+# --- Line ranges -----------------------------------------------------------
+
+def to_ranges(lines: Sequence[int]) -> Ranges:
+    """
+    Compress line numbers into sorted [first, last] ranges
+
+    Args:
+        lines: Line numbers in any order
+
+    Returns: Inclusive ranges
+    """
+    ranges: Ranges = []
+    for line in sorted(set(lines)):
+        if ranges and line == ranges[-1][1] + 1:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return ranges
+
+
+def union(a: Ranges, b: Ranges) -> Ranges:
+    """
+    Merge two range lists
+
+    Args:
+        a: Inclusive ranges
+        b: Inclusive ranges
+
+    Returns: Inclusive ranges covering both
+    """
+    merged: Ranges = []
+    for first, last in sorted(a + b):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return merged
+
+
+def range_size(ranges: Ranges) -> int:
+    """Number of lines in a range list"""
+    return sum(last - first + 1 for first, last in ranges)
+
+
+def covered_offsets(functions: Sequence[Dict[str, Any]]) -> List[Tuple[int, int]]:
+    """
+    Turn V8 block coverage into covered [start, end) character ranges
+
+    V8 reports nested ranges where the innermost range wins (an uncovered
+    branch inside a covered function has count 0).
+
+    Args:
+        functions: ``functions`` of one script from ``Profiler.takePreciseCoverage``
+
+    Returns: Sorted, non-overlapping covered ranges
+    """
+    blocks = sorted(((r["startOffset"], r["endOffset"], r["count"])
+                     for function in functions for r in function["ranges"]),
+                    key=lambda block: (block[0], -block[1]))
+    covered: List[Tuple[int, int]] = []
+
+    def emit(start: int, end: int, count: int) -> None:
+        if end <= start or count <= 0:
+            return
+        if covered and covered[-1][1] >= start:
+            covered[-1] = (covered[-1][0], max(covered[-1][1], end))
+        else:
+            covered.append((start, end))
+
+    stack: List[Tuple[int, int]] = []
+    position = 0
+    for start, end, count in blocks:
+        while stack and stack[-1][0] <= start:
+            top_end, top_count = stack.pop()
+            emit(position, top_end, top_count)
+            position = max(position, top_end)
+        if stack:
+            emit(position, start, stack[-1][1])
+        position = start
+        stack.append((end, count))
+    while stack:
+        top_end, top_count = stack.pop()
+        emit(position, top_end, top_count)
+        position = max(position, top_end)
+    return covered
+
+
+# --- Source maps -----------------------------------------------------------
+
+def _decode_vlq(segment: str) -> List[int]:
+    values, shift, value = [], 0, 0
+    for char in segment:
+        digit = _B64[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+        else:
+            values.append(-(value >> 1) if value & 1 else value >> 1)
+            shift = value = 0
+    return values
+
+
+def parse_source_map(source_map: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decode the mappings of a (non-indexed) source map
+
+    Args:
+        source_map: Source map JSON
+
+    Returns: Dictionary with ``sources`` and ``segments``, a list of
+        (generated line, generated column, source index, original line),
+        0-based, in generated order
+    """
+    segments = []
+    source = original_line = 0
+    for generated_line, line in enumerate(source_map.get("mappings", "").split(";")):
+        column = 0
+        for segment in line.split(","):
+            if not segment:
+                continue
+            values = _decode_vlq(segment)
+            column += values[0]
+            if len(values) >= 4:
+                source += values[1]
+                original_line += values[2]
+                segments.append((generated_line, column, source, original_line))
+    return {"sources": source_map.get("sources", []), "segments": segments}
+
+
+def normalize_source(source: str, files: Sequence[str] = ()) -> str:
+    """
+    Reduce a source map path to a repository path
+
+    "webpack://_N_E/./app/checkout/page.tsx" and
+    "webpack-internal:///(app-pages-browser)/./app/checkout/page.tsx" both
+    become "app/checkout/page.tsx"; when ``files`` is given the path is
+    matched against it by suffix.
+
+    Args:
+        source: Source entry of a source map
+        files: Known repository paths (from code_summary.json)
+
+    Returns: Repository path
+    """
+    path = re.sub(r"^[a-z-]+:/+(?:\([^)]*\)/|_N_E/)?", "", source).split("?", 1)[0]
+    path = path[2:] if path.startswith("./") else path
+    for known in files:
+        if path == known or path.endswith("/" + known):
+            return known
+    return path
+
+
+def map_coverage(
+    source: str,
+    functions: Sequence[Dict[str, Any]],
+    parsed_map: Dict[str, Any]
+) -> Dict[str, Dict[str, set]]:
+    """
+    Map the covered ranges of one script to original source lines
+
+    A line counts as executable when any mapping points at it and as covered
+    when any of those mappings lies in a covered range.
+
+    Args:
+        source: Generated script source
+        functions: V8 function coverage of the script
+        parsed_map: Result of ``parse_source_map``
+
+    Returns: Dictionary of original source to {"lines", "covered"} sets of
+        1-based line numbers
+    """
+    line_starts = [0]
+    for match in re.finditer("\n", source):
+        line_starts.append(match.end())
+    covered = covered_offsets(functions)
+    starts = [start for start, _ in covered]
+    files: Dict[str, Dict[str, set]] = {}
+    sources = parsed_map["sources"]
+    for generated_line, column, index, original_line in parsed_map["segments"]:
+        if generated_line >= len(line_starts) or index >= len(sources):
+            continue
+        offset = line_starts[generated_line] + column
+        entry = files.setdefault(sources[index], {"lines": set(), "covered": set()})
+        entry["lines"].add(original_line + 1)
+        at = bisect.bisect_right(starts, offset) - 1
+        if at >= 0 and offset < covered[at][1]:
+            entry["covered"].add(original_line + 1)
+    return files
+
+
+# --- Collection ------------------------------------------------------------
+
+class CoverageMap:
+    """Covered and executable line ranges per source file
+
+    ``add`` and ``merge`` take the union of ranges, so results can be merged
+    in any order and as often as needed.
+    """
+
+    def __init__(self, files: Optional[Dict[str, Dict[str, Ranges]]] = None):
+        self.files: Dict[str, Dict[str, Ranges]] = files or {}
+        self.collect_seconds = 0.0
+        self.test_seconds = 0.0
+        self.tests = 0
+
+    def add(self, path: str, lines: Ranges, covered: Ranges) -> None:
+        """
+        Merge the coverage of one file
+
+        Args:
+            path: Repository path
+            lines: Executable line ranges
+            covered: Covered line ranges
+        """
+        entry = self.files.setdefault(path, {"lines": [], "covered": []})
+        entry["lines"] = union(entry["lines"], lines)
+        entry["covered"] = union(entry["covered"], covered)
+
+    def merge(self, other: "CoverageMap") -> None:
+        """Merge another map (e.g. another worker's shard) into this one"""
+        for path, entry in other.files.items():
+            self.add(path, entry["lines"], entry["covered"])
+        self.collect_seconds += other.collect_seconds
+        self.test_seconds += other.test_seconds
+        self.tests += other.tests
+
+    def save(self, path: str) -> None:
+        """Write the map as JSON"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"files": self.files, "collect_seconds": round(self.collect_seconds, 3),
+                       "test_seconds": round(self.test_seconds, 3), "tests": self.tests}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "CoverageMap":
+        """Read a map written by ``save``"""
+        with open(path) as f:
+            data = json.load(f)
+        coverage = cls(data["files"])
+        coverage.collect_seconds = data.get("collect_seconds", 0.0)
+        coverage.test_seconds = data.get("test_seconds", 0.0)
+        coverage.tests = data.get("tests", 0)
+        return coverage
+
+    def collect_percent(self) -> Optional[float]:
+        """Collection and mapping time as a percentage of the tests' own time"""
+        if not self.test_seconds:
+            return None
+        return round(100 * self.collect_seconds / self.test_seconds, 1)
+
+    def summary(self, files: Sequence[str] = ()) -> List[Dict[str, Any]]:
+        """
+        Line coverage per file
+
+        Args:
+            files: Files to report, in order (default: every mapped file);
+                files never loaded in the browser are reported with 0 lines
+
+        Returns: List of dictionaries with file, lines, covered and percent
+        """
+        rows = []
+        for path in files or sorted(self.files):
+            entry = self.files.get(path, {"lines": [], "covered": []})
+            lines, covered = range_size(entry["lines"]), range_size(entry["covered"])
+            rows.append({"file": path, "lines": lines, "covered": covered,
+                         "percent": round(100 * covered / lines, 1) if lines else None})
+        return rows
+
+
+class JSCoverageCollector:
+    """Precise V8 coverage of one page through CDP
+
+    ``start`` enables the Debugger (for script sources and source map URLs)
+    and Profiler domains; ``stop`` takes the coverage, maps it through the
+    source maps and merges it into a ``CoverageMap``. Scripts without a
+    source map (third party, browser internals) are skipped. Time spent in
+    start and stop is added to the map's collection time.
+    """
+
+    def __init__(self, page: Any, files: Sequence[str] = ()):
+        self.page = page
+        self.files = list(files)
+        self._cdp = None
+        self._scripts: Dict[str, Tuple[str, str]] = {}
+        self.collect_seconds = 0.0
+
+    def _on_script(self, event: Dict[str, Any]) -> None:
+        if event.get("sourceMapURL"):
+            self._scripts[event["scriptId"]] = (event.get("url", ""), event["sourceMapURL"])
+
+    async def start(self) -> None:
+        """Start collecting; call before the page loads the app"""
+        began = time.perf_counter()
+        self._cdp = await self.page.context.new_cdp_session(self.page)
+        self._cdp.on("Debugger.scriptParsed", self._on_script)
+        await self._cdp.send("Debugger.enable")
+        await self._cdp.send("Profiler.enable")
+        await self._cdp.send("Profiler.startPreciseCoverage",
+                             {"callCount": False, "detailed": True})
+        self.collect_seconds += time.perf_counter() - began
+
+    async def _source_map(self, script_url: str, map_url: str) -> Optional[Dict[str, Any]]:
+        key = f"{script_url}|{map_url[:200]}"
+        if key in _SOURCE_MAP_CACHE:
+            return _SOURCE_MAP_CACHE[key]
+        parsed = None
+        try:
+            if map_url.startswith("data:"):
+                payload = map_url.split(",", 1)[1]
+                raw = base64.b64decode(payload) if ";base64" in map_url.split(",", 1)[0] else payload
+                parsed = parse_source_map(json.loads(raw))
+            else:
+                from urllib.parse import urljoin
+                response = await self.page.context.request.get(urljoin(script_url, map_url))
+                if response.ok:
+                    parsed = parse_source_map(await response.json())
+        except Exception:
+            parsed = None
+        _SOURCE_MAP_CACHE[key] = parsed
+        return parsed
+
+    async def stop(self, coverage: CoverageMap) -> None:
+        """
+        Stop collecting and merge the mapped coverage
+
+        Args:
+            coverage: Map receiving the results
+        """
+        if self._cdp is None:
+            return
+        began = time.perf_counter()
+        try:
+            result = await self._cdp.send("Profiler.takePreciseCoverage")
+            await self._cdp.send("Profiler.stopPreciseCoverage")
+            for script in result["result"]:
+                if script["scriptId"] not in self._scripts:
+                    continue
+                script_url, map_url = self._scripts[script["scriptId"]]
+                parsed = await self._source_map(script_url, map_url)
+                if not parsed:
+                    continue
+                source = await self._cdp.send("Debugger.getScriptSource",
+                                              {"scriptId": script["scriptId"]})
+                mapped = map_coverage(source["scriptSource"], script["functions"], parsed)
+                for original, lines in mapped.items():
+                    path = normalize_source(original, self.files)
+                    if "node_modules/" in path:
+                        continue
+                    coverage.add(path, to_ranges(lines["lines"]), to_ranges(lines["covered"]))
+            await self._cdp.detach()
+        finally:
+            self._cdp = None
+            self.collect_seconds += time.perf_counter() - began
+            coverage.collect_seconds += self.collect_seconds
+            coverage.tests += 1
+
+
+def shard_path(worker: Optional[str] = None, directory: str = DEFAULT_COVERAGE_DIR) -> str:
+    """
+    Coverage shard path of an xdist worker
+
+    Args:
+        worker: Worker id (default: ``PYTEST_XDIST_WORKER`` or "main")
+        directory: Shard directory
+
+    Returns: JSON path
+    """
+    worker = worker or os.environ.get("PYTEST_XDIST_WORKER", "main")
+    return os.path.join(directory, f"js_coverage_{worker}.json")
+
+
+def merge_shards(directory: str = DEFAULT_COVERAGE_DIR) -> CoverageMap:
+    """
+    Merge every worker shard in a directory
+
+    Args:
+        directory: Shard directory
+
+    Returns: Merged CoverageMap
+    """
+    merged = CoverageMap()
+    for path in sorted(glob.glob(os.path.join(directory, "js_coverage_*.json"))):
+        merged.merge(CoverageMap.load(path))
+    return merged
+
+
+@functools.lru_cache(maxsize=None)
+def summary_files() -> Tuple[str, ...]:
+    """
+    Script files listed in tmp/code_summary.json (the files reported)
+
+    Returns: Repository paths, empty when the summary does not exist
+    """
+    from test_crawler import DEFAULT_CODE_SUMMARY_PATH, load_code_summary
+
+    if not os.path.exists(DEFAULT_CODE_SUMMARY_PATH):
+        return ()
+    files: List[str] = []
+    for feature in load_code_summary().get("features", ()):
+        for path in feature.get("files", ()):
+            if path.endswith((".ts", ".tsx", ".js", ".jsx")) and path not in files:
+                files.append(path)
+    return tuple(files)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Merge worker shards and print JS coverage per file"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--report", action="store_true", help="Print the report (default)")
+    parser.add_argument("--dir", default=DEFAULT_COVERAGE_DIR, help="Shard directory")
+    parser.add_argument("--all", action="store_true",
+                        help="Report every mapped file, not only code_summary.json files")
+    args = parser.parse_args(argv)
+
+    merged = merge_shards(args.dir)
+    for row in merged.summary([] if args.all else summary_files()):
+        print(json.dumps(row))
+    print(json.dumps({"tests": merged.tests, "collect_seconds": round(merged.collect_seconds, 3),
+                      "collect_percent": merged.collect_percent()}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
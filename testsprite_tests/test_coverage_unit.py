@@ -0,0 +1,59 @@
+"""
+Unit tests for test_coverage.py
+V8 block ranges to covered offsets, and line range algebra
+"""
+import pytest
+
+from test_coverage import covered_offsets, range_size, to_ranges, union
+
+
+def _function(*ranges):
+    return {"ranges": [{"startOffset": start, "endOffset": end, "count": count}
+                       for start, end, count in ranges]}
+
+
+def test_uncovered_branch_is_cut_out_of_its_function():
+    assert covered_offsets([_function((0, 100, 1), (20, 40, 0))]) == [(0, 20), (40, 100)]
+
+
+def test_innermost_range_wins_at_every_depth():
+    functions = [_function((0, 100, 1), (10, 90, 0), (20, 30, 2))]
+    assert covered_offsets(functions) == [(0, 10), (20, 30), (90, 100)]
+
+
+def test_never_called_function_is_not_covered():
+    functions = [_function((0, 200, 1)), _function((50, 80, 0))]
+    assert covered_offsets(functions) == [(0, 50), (80, 200)]
+
+
+def test_adjacent_covered_functions_merge():
+    assert covered_offsets([_function((0, 10, 1)), _function((10, 25, 3))]) == [(0, 25)]
+
+
+def test_nothing_covered():
+    assert covered_offsets([_function((0, 50, 0))]) == []
+    assert covered_offsets([]) == []
+
+
+def test_to_ranges_compresses_unsorted_duplicates():
+    assert to_ranges([5, 3, 4, 9, 1, 4]) == [[1, 1], [3, 5], [9, 9]]
+    assert to_ranges([]) == []
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ([[1, 3]], [[4, 6]], [[1, 6]]),
+    ([[1, 3]], [[5, 6]], [[1, 3], [5, 6]]),
+    ([[1, 10]], [[2, 3], [12, 12]], [[1, 10], [12, 12]]),
+    ([[5, 8], [1, 2]], [[2, 5]], [[1, 8]]),
+    ([], [[7, 9]], [[7, 9]]),
+])
+def test_union(a, b, expected):
+    assert union(a, b) == expected
+    assert union(b, a) == expected
+
+
+def test_union_matches_set_union():
+    a, b = [1, 2, 3, 7, 8, 20], [3, 4, 9, 10, 19, 30]
+    merged = union(to_ranges(a), to_ranges(b))
+    assert merged == to_ranges(a + b)
+    assert range_size(merged) == len(set(a) | set(b))
@@ -0,0 +1,453 @@
+"""
+Test Crawler Module
+Contains the breadth-first crawler that explores the app as every role
+
+Starting from the app routes listed in tmp/code_summary.json, workers pull
+(role, url, clicks) states from a shared frontier queue, each with its own
+browser context per role (signed in once per role, then cloned through the
+storage state). A state is identified by a hash of its DOM structure (tags,
+ids, roles and classes, no text), so product pages that only differ by data
+are expanded once. Each visit records the route load time, HTTP status and
+console errors:
+
+    python test_crawler.py --roles anonymous customer vendor admin --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from pages import ShopHubPages
+from test_mocks import TEST_CREDENTIALS
+from test_runner import TESTS_DIR
+from test_stubs import (
+    stub_cleanup,
+    stub_click_element,
+    stub_full_page_setup,
+)
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page
+
+
+DEFAULT_CODE_SUMMARY_PATH = os.path.join(TESTS_DIR, "tmp", "code_summary.json")
+DEFAULT_REPORT_PATH = os.path.join(TESTS_DIR, "tmp", "crawl_report.json")
+
+ROLES = ("anonymous", "customer", "vendor", "admin")
+
+# Links are followed unless their path looks like it signs out or changes data
+_UNSAFE_PATH = re.compile(r"sign ?out|log ?out|delete|remove|place order|pay|approve|"
+                          r"suspend|reject|cancel|save|submit|update", re.IGNORECASE)
+# Only controls that just reveal content are clicked: tabs, disclosures and
+# <details> summaries. Other buttons (Add to Cart, Clear, Confirm, Ship, ...)
+# may change data whatever their label says, so they are never clicked.
+_SAFE_CONTROLS = ("[role=tab]:not([disabled]), [aria-expanded]:not([disabled]):not([type=submit]), "
+                  "details > summary")
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8}-[0-9a-f-]{27}|[0-9a-f]{16,}|[a-z]+_[A-Za-z0-9]{6,})$")
+
+_DOM_SIGNATURE_SCRIPT = """
+() => {
+  const parts = [];
+  const walk = (el, depth) => {
+    if (depth > 25 || ['SCRIPT', 'STYLE', 'SVG', 'NOSCRIPT'].includes(el.tagName.toUpperCase())) return;
+    parts.push(depth + el.tagName + (el.id ? '#' + el.id : '') +
+               (el.getAttribute('role') ? '@' + el.getAttribute('role') : '') +
+               '.' + [...el.classList].sort().join('.'));
+    for (const child of el.children) walk(child, depth + 1);
+  };
+  if (document.body) walk(document.body, 0);
+  return parts.join('|');
+}
+"""
+
+_EXPLORE_SCRIPT = """
+(controls) => {
+  const links = [...document.querySelectorAll('a[href]')].map(a => a.getAttribute('href'));
+  const buttons = [...document.querySelectorAll(controls)]
+    .filter(el => el.offsetParent !== null)
+    .map(el => (el.innerText || '').trim())
+    .filter(text => text && text.length <= 40);
+  return {links, buttons};
+}
+"""
+
+
+def load_code_summary(path: str = DEFAULT_CODE_SUMMARY_PATH) -> Dict[str, Any]:
+    """
+    Load the code summary (tech stack and features with their files)
+
+    Args:
+        path: code_summary.json path
+
+    Returns: Parsed dictionary
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def app_routes(summary: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    List the Next.js routes of the app from its ``app/**/page.tsx`` files
+
+    Args:
+        summary: Code summary (default: loaded from tmp/code_summary.json)
+
+    Returns: Routes in file order, e.g. "/marketplace", "/products/[id]"
+    """
+    summary = summary if summary is not None else load_code_summary()
+    routes = []
+    for feature in summary.get("features", ()):
+        for path in feature.get("files", ()):
+            match = re.match(r"app/(.*?)/?page\.[jt]sx?$", path)
+            if match:
+                route = "/" + match.group(1)
+                if route not in routes:
+                    routes.append(route)
+    return routes
+
+
+def route_pattern(url: str) -> str:
+    """
+    Normalize a URL path to its route, replacing id-like segments with [id]
+
+    Args:
+        url: Absolute or relative URL
+
+    Returns: Route such as "/products/[id]"
+    """
+    segments = [("[id]" if _ID_SEGMENT.match(segment) else segment)
+                for segment in urlsplit(url).path.split("/") if segment]
+    return "/" + "/".join(segments)
+
+
+async def role_storage_state(browser: Browser, base_url: str, role: str) -> Dict[str, Any]:
+    """
+    Sign in once as a role and capture the session
+
+    Args:
+        browser: Browser instance
+        base_url: Base URL of the app
+        role: "anonymous" (no sign in), "customer", "vendor" or "admin"
+
+    Returns: Storage state (cookies and localStorage) for ``new_context``
+    """
+    context = await browser.new_context()
+    try:
+        if role != "anonymous":
+            page = await context.new_page()
+            pages = ShopHubPages(page, base_url)
+            credentials = TEST_CREDENTIALS[role]
+            await pages.sign_in.open()
+            await pages.sign_in.sign_in(credentials["email"], credentials["password"])
+            await page.wait_for_url(lambda url: "/auth/" not in url, timeout=10000)
+        return await context.storage_state()
+    finally:
+        await stub_cleanup(context)
+
+
+class CrawlReport:
+    """Per-route measurements collected by the crawler"""
+
+    def __init__(self):
+        self.routes: Dict[str, Dict[str, Any]] = {}
+        self.states = 0
+        self.duplicates = 0
+        self.crawl_errors: List[Dict[str, Any]] = []
+
+    def visit(self, role: str, url: str, status: Optional[int], load_ms: float,
+              errors: List[str]) -> None:
+        """
+        Record one page load
+
+        Args:
+            role: Role the page was loaded as
+            url: Loaded URL
+            status: HTTP status of the document (None for client-side states)
+            load_ms: Time until the load event
+            errors: Console errors and uncaught exceptions seen
+        """
+        route = self.routes.setdefault(route_pattern(url), {
+            "loads_ms": [], "statuses": {}, "roles": set(), "console_errors": [], "example": url,
+        })
+        route["loads_ms"].append(round(load_ms, 1))
+        route["roles"].add(role)
+        if status is not None:
+            route["statuses"][str(status)] = route["statuses"].get(str(status), 0) + 1
+        for error in errors:
+            if len(route["console_errors"]) < 20 and error not in route["console_errors"]:
+                route["console_errors"].append(error)
+
+    def crawl_error(self, role: str, url: str, clicks: Sequence[str], error: str) -> None:
+        """
+        Record a state the crawler itself failed to load or replay
+
+        Kept apart from page loads, so a failed replay neither adds a load
+        time nor reports the route as broken.
+
+        Args:
+            role: Role the state was loaded as
+            url: URL of the state
+            clicks: Click sequence replayed on the URL
+            error: Exception description
+        """
+        self.crawl_errors.append({"role": role, "url": url, "clicks": list(clicks),
+                                  "error": error})
+
+    def summary(self, known_routes: Sequence[str] = ()) -> Dict[str, Any]:
+        """
+        Summarize the crawl
+
+        Args:
+            known_routes: Routes from the code summary, to list unreached ones
+
+        Returns: Dictionary with per-route load percentiles, statuses, roles,
+            console errors, unreached routes, state counts and crawler errors
+        """
+        routes = {}
+        for pattern, route in sorted(self.routes.items()):
+            loads = sorted(route["loads_ms"])
+            routes[pattern] = {
+                "visits": len(loads),
+                "load_p50_ms": loads[len(loads) // 2],
+                "load_max_ms": loads[-1],
+                "statuses": route["statuses"],
+                "roles": sorted(route["roles"]),
+                "console_errors": route["console_errors"],
+                "example": route["example"],
+            }
+        return {
+            "states": self.states,
+            "duplicate_states": self.duplicates,
+            "routes": routes,
+            "unreached_routes": [route for route in known_routes if route not in routes],
+            "crawl_errors": self.crawl_errors,
+        }
+
+
+class Crawler:
+    """Breadth-first multi-role crawler over one browser
+
+    The frontier is a FIFO of (role, url, clicks, depth). Links found on a
+    state are queued as new URLs; visible content-revealing controls (tabs,
+    disclosures, summaries) are queued as click sequences on the same URL,
+    replayed with ``stub_click_element``. A state is expanded only the first
+    time its (role, DOM hash) pair is seen.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        base_url: str = "http://localhost:3000",
+        roles: Sequence[str] = ROLES,
+        workers: int = 4,
+        max_states: int = 300,
+        max_depth: int = 4,
+        max_clicks: int = 5
+    ):
+        self.browser = browser
+        self.base_url = base_url.rstrip("/")
+        self.origin = urlsplit(self.base_url).netloc
+        self.roles = list(roles)
+        self.workers = max(1, workers)
+        self.max_states = max_states
+        self.max_depth = max_depth
+        self.max_clicks = max_clicks
+        self.report = CrawlReport()
+        self._storage: Dict[str, Any] = {}
+        self._queued: Set[Tuple[str, str, Tuple[str, ...]]] = set()
+        self._seen_states: Set[Tuple[str, str]] = set()
+        self._frontier: deque = deque()
+        self._pending = 0
+        self._wakeup: Optional[asyncio.Condition] = None
+
+    async def _sign_in(self, role: str) -> None:
+        self._storage[role] = await role_storage_state(self.browser, self.base_url, role)
+
+    def _enqueue(self, role: str, url: str, clicks: Tuple[str, ...], depth: int) -> None:
+        key = (role, url, clicks)
+        if key in self._queued or depth > self.max_depth:
+            return
+        if len(self._queued) >= self.max_states * 4:
+            return
+        self._queued.add(key)
+        self._frontier.append((role, url, clicks, depth))
+        self._pending += 1
+
+    def _normalize(self, current: str, href: str) -> Optional[str]:
+        if not href or href.startswith(("mailto:", "tel:", "javascript:", "#")):
+            return None
+        url = urljoin(current, href).split("#", 1)[0]
+        parts = urlsplit(url)
+        if parts.netloc != self.origin or _UNSAFE_PATH.search(parts.path):
+            return None
+        return url
+
+    async def _visit(self, page: Page, role: str, url: str,
+                     clicks: Tuple[str, ...], depth: int) -> None:
+        errors: List[str] = []
+        on_console = lambda msg: msg.type == "error" and errors.append(msg.text[:300])
+        on_error = lambda exc: errors.append(f"pageerror: {str(exc)[:300]}")
+        page.on("console", on_console)
+        page.on("pageerror", on_error)
+        try:
+            start = time.perf_counter()
+            response = await page.goto(url, wait_until="load", timeout=15000)
+            load_ms = (time.perf_counter() - start) * 1000
+            for label in clicks:
+                control = page.locator(_SAFE_CONTROLS).filter(
+                    has_text=re.compile(rf"^\s*{re.escape(label)}\s*$")).first
+                await stub_click_element(page, control, timeout=3000)
+                await page.wait_for_load_state("domcontentloaded")
+            signature = await page.evaluate(_DOM_SIGNATURE_SCRIPT)
+            found = await page.evaluate(_EXPLORE_SCRIPT, _SAFE_CONTROLS)
+        finally:
+            page.remove_listener("console", on_console)
+            page.remove_listener("pageerror", on_error)
+
+        self.report.visit(role, page.url, response.status if response and not clicks else None,
+                          load_ms, errors)
+        state = (role, hashlib.sha1(signature.encode()).hexdigest())
+        if state in self._seen_states:
+            self.report.duplicates += 1
+            return
+        self._seen_states.add(state)
+        self.report.states += 1
+        if self.report.states >= self.max_states:
+            return
+        for href in found["links"]:
+            link = self._normalize(page.url, href)
+            if link:
+                self._enqueue(role, link, (), depth + 1)
+        if len(clicks) < 2:
+            for label in found["buttons"][:self.max_clicks]:
+                self._enqueue(role, url, clicks + (label,), depth + 1)
+
+    async def _worker(self) -> None:
+        pages: Dict[str, Page] = {}
+        contexts: List[BrowserContext] = []
+        try:
+            while True:
+                async with self._wakeup:
+                    while not self._frontier and self._pending:
+                        await self._wakeup.wait()
+                    if not self._frontier:
+                        return
+                    role, url, clicks, depth = self._frontier.popleft()
+                try:
+                    if self.report.states < self.max_states:
+                        if role not in pages:
+                            context = await self.browser.new_context(
+                                storage_state=self._storage[role])
+                            contexts.append(context)
+                            pages[role] = await context.new_page()
+                        await self._visit(pages[role], role, url, clicks, depth)
+                except Exception as exc:
+                    self.report.crawl_error(role, url, clicks,
+                                            f"{type(exc).__name__}: {str(exc)[:200]}")
+                finally:
+                    async with self._wakeup:
+                        self._pending -= 1
+                        self._wakeup.notify_all()
+        finally:
+            for context in contexts:
+                await stub_cleanup(context)
+
+    async def crawl(self, seeds: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Crawl from the seed routes as every role
+
+        Args:
+            seeds: Paths to start from (default: app routes without dynamic
+                segments, plus "/")
+
+        Returns: ``CrawlReport.summary`` result
+        """
+        known = app_routes()
+        if seeds is None:
+            seeds = ["/"] + [route for route in known if "[" not in route]
+        self._wakeup = asyncio.Condition()
+        await asyncio.gather(*(self._sign_in(role) for role in self.roles))
+        for role in self.roles:
+            for seed in seeds:
+                self._enqueue(role, self.base_url + seed, (), 0)
+        await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        return self.report.summary(known)
+
+
+async def run_crawl(
+    base_url: str = "http://localhost:3000",
+    roles: Sequence[str] = ROLES,
+    workers: int = 4,
+    max_states: int = 300,
+    max_depth: int = 4,
+    headless: bool = True
+) -> Dict[str, Any]:
+    """
+    Launch a browser through ``stub_full_page_setup`` and crawl the app
+
+    Args:
+        base_url: Base URL of the app
+        roles: Roles to crawl as ("anonymous" for signed out)
+        workers: Parallel workers, each with one context per role
+        max_states: Stop expanding after this many distinct states
+        max_depth: Maximum link/click depth from the seeds
+        headless: Run browser in headless mode
+
+    Returns: Crawl summary
+    """
+    pw, browser, context, page = await stub_full_page_setup(base_url, headless=headless)
+    await stub_cleanup(context)
+    try:
+        crawler = Crawler(browser, base_url=base_url, roles=roles, workers=workers,
+                          max_states=max_states, max_depth=max_depth)
+        start = time.perf_counter()
+        summary = await crawler.crawl()
+        summary["seconds"] = round(time.perf_counter() - start, 2)
+        return summary
+    finally:
+        await stub_cleanup(browser=browser, pw=pw)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Crawl the app and report slow or broken routes"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--roles", nargs="+", default=list(ROLES), choices=ROLES)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-states", type=int, default=300)
+    parser.add_argument("--max-depth", type=int, default=4)
+    parser.add_argument("--slow-ms", type=float, default=3000,
+                        help="Flag routes whose median load exceeds this")
+    parser.add_argument("--output", default=DEFAULT_REPORT_PATH)
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run_crawl(args.base_url, args.roles, args.workers,
+                                    args.max_states, args.max_depth, headless=not args.headed))
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    broken = {route: data for route, data in summary["routes"].items()
+              if data["console_errors"] or any(int(status) >= 400 for status in data["statuses"])}
+    slow = {route: data["load_p50_ms"] for route, data in summary["routes"].items()
+            if data["load_p50_ms"] > args.slow_ms}
+    print(json.dumps({"states": summary["states"], "routes": len(summary["routes"]),
+                      "broken": sorted(broken), "slow": slow,
+                      "unreached": summary["unreached_routes"],
+                      "crawl_errors": len(summary["crawl_errors"]), "seconds": summary["seconds"],
+                      "report": args.output}))
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,22 +2,24 @@
 Test Fixtures Module
 Contains pytest fixtures for common test setup and teardown
 """
-import pytest
+from __future__ import annotations
+
 import asyncio
-from typing import AsyncGenerator, Generator
-from playwright.async_api import (
-    Playwright,
-    Browser,
-    BrowserContext,
-    Page,
-    async_playwright
-)
+import os
+import time
+import pytest
+import pytest_asyncio
+from typing import TYPE_CHECKING, AsyncGenerator, Generator, Optional
+
+if TYPE_CHECKING:
+    from playwright.async_api import Playwright, Browser, BrowserContext, Page
 from test_stubs import (
     stub_playwright_start,
     stub_launch_browser,
     stub_create_context,
     stub_create_page,
     stub_cleanup,
+    stub_reset_context,
     stub_navigate_to_url,
     stub_wait_for_load_state,
     stub_wait_for_all_frames
@@ -27,23 +29,49 @@ from test_mocks import (
     mock_product_data,
     mock_order_data,
     mock_cart_data,
-    mock_authentication_success
+    mock_authentication_success,
+    TEST_CREDENTIALS
 )
+from test_artifacts import ArtifactPipeline, DEFAULT_ARTIFACTS_DIR
+from test_context_pool import ContextRecycler
+from test_network import apply_network_profile, network_profile_from_env
+from test_memory import MemorySampler
+from test_orchestrator import MultiActorOrchestrator
+from test_visual import DEFAULT_BASELINE_DIR, VisualBaselineStore, VisualDiffer
+from test_postgres import connect
+from test_snapshots import BASELINE, SavepointSnapshot, TemplateSnapshots
+from test_api import ShopHubApiClient
+from test_verify import BackendVerifier
+from test_waits import WaitTimings, activate as activate_wait_timings
+from test_coverage import CoverageMap, JSCoverageCollector, shard_path, summary_files
+from pages import ShopHubPages
 
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator:
+def _test_failed(request) -> bool:
     """
-    Fixture: Create an event loop for the test session
+    Check whether the requesting test failed in setup or call
+
+    Relies on the ``pytest_runtest_makereport`` hook in conftest.py.
 
-    Yields: Event loop
+    Args:
+        request: Pytest request object
+
+    Returns: True if the test failed
     """
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+    for when in ("setup", "call"):
+        report = getattr(request.node, f"rep_{when}", None)
+        if report is not None and report.failed:
+            return True
+    return False
 
 
-@pytest.fixture(scope="session")
+# All async fixtures run on the session event loop (one per xdist worker), so
+# the Playwright instance, the browser and every context share a single loop.
+# conftest.py marks async tests with the same loop scope.
+LOOP_SCOPE = "session"
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope=LOOP_SCOPE)
 async def playwright_instance() -> AsyncGenerator[Playwright, None]:
     """
     Fixture: Initialize Playwright for the test session
@@ -55,52 +83,325 @@ async def playwright_instance() -> AsyncGenerator[Playwright, None]:
     await pw.stop()
 
 
-@pytest.fixture(scope="session")
-async def browser(playwright_instance: Playwright) -> AsyncGenerator[Browser, None]:
+@pytest_asyncio.fixture(scope="session", loop_scope=LOOP_SCOPE)
+async def browser(
+    playwright_instance: Playwright,
+    request
+) -> AsyncGenerator[Browser, None]:
     """
     Fixture: Launch browser for the test session
 
     Args:
         playwright_instance: Playwright instance
+        request: Pytest request object (reads ``--launch-profile``)
 
     Yields: Browser instance
     """
-    browser = await stub_launch_browser(playwright_instance)
+    browser = await stub_launch_browser(
+        playwright_instance,
+        profile=request.config.getoption("--launch-profile", default=None)
+    )
     yield browser
     await browser.close()
 
 
+@pytest.fixture(scope="session")
+def artifact_pipeline(request) -> Generator[ArtifactPipeline, None, None]:
+    """
+    Fixture: Background writer for failure screenshots and traces
+
+    Args:
+        request: Pytest request object
+
+    Yields: ArtifactPipeline instance
+    """
+    output_dir = request.config.getoption("--artifacts-dir", default=None)
+    pipeline = ArtifactPipeline(output_dir or DEFAULT_ARTIFACTS_DIR)
+    yield pipeline
+    pipeline.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def wait_timings(request) -> Generator[Optional[WaitTimings], None, None]:
+    """
+    Fixture: Learned wait budgets for the stubs when ``--smart-waits`` is set
+
+    Stub waits without an explicit timeout use p99 x factor of their
+    recorded durations and fail fast past it. Samples are loaded from
+    every shard in tmp/wait_timings/ and this worker's new samples are
+    saved to its own shard at the end of the session.
+
+    Args:
+        request: Pytest request object
+
+    Yields: WaitTimings instance, or None when smart waits are off
+    """
+    if not request.config.getoption("--smart-waits", default=False):
+        yield None
+        return
+    timings = WaitTimings()
+    activate_wait_timings(timings)
+    yield timings
+    activate_wait_timings(None)
+    timings.save()
+
+
+@pytest.fixture(autouse=True)
+def wait_regressions(request, wait_timings: Optional[WaitTimings]) -> Generator[None, None, None]:
+    """
+    Fixture: Attach the wait budget regressions of each test to its report
+
+    They reach the terminal summary through ``user_properties``, from xdist
+    workers too.
+
+    Args:
+        request: Pytest request object
+        wait_timings: Session WaitTimings, or None when smart waits are off
+
+    Yields: None
+    """
+    if wait_timings is None:
+        yield
+        return
+    start = len(wait_timings.regressions)
+    yield
+    regressions = wait_timings.regressions[start:]
+    if regressions:
+        request.node.user_properties.append(("wait_regressions", regressions))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def js_coverage(request) -> Generator[Optional[CoverageMap], None, None]:
+    """
+    Fixture: Coverage map of this worker when ``--js-coverage`` is set
+
+    Every test's page coverage is merged into it; the map is written to the
+    worker's shard in tmp/coverage/ at the end of the session.
+
+    Args:
+        request: Pytest request object
+
+    Yields: CoverageMap instance, or None when coverage is off
+    """
+    if not request.config.getoption("--js-coverage", default=False):
+        yield None
+        return
+    coverage = CoverageMap()
+    yield coverage
+    coverage.save(shard_path())
+
+
+@pytest.fixture(scope="session")
+def visual_differ(request) -> Generator[VisualDiffer, None, None]:
+    """
+    Fixture: Process pool comparing screenshots with visual baselines
+
+    ``--update-baselines`` rewrites the baselines instead of comparing.
+    Each test's comparisons are checked by ``visual_checks``.
+
+    Args:
+        request: Pytest request object
+
+    Yields: VisualDiffer instance (use with ``stub_compare_screenshot``)
+    """
+    directory = request.config.getoption("--visual-baselines-dir", default=None)
+    differ = VisualDiffer(
+        VisualBaselineStore(directory or DEFAULT_BASELINE_DIR),
+        update=request.config.getoption("--update-baselines", default=False)
+    )
+    yield differ
+    differ.close()
+
+
+@pytest.fixture(scope="session")
+def db_snapshots(request) -> Generator[TemplateSnapshots, None, None]:
+    """
+    Fixture: Template database snapshots of the local test database
+
+    Takes the baseline snapshot once per session and drops it at the end.
+    Needs ``--db-dsn`` or ``SHOPHUB_DATABASE_URL`` naming a test-only
+    database (never ``postgres``).
+
+    Args:
+        request: Pytest request object
+
+    Yields: TemplateSnapshots instance
+    """
+    snapshots = TemplateSnapshots(request.config.getoption("--db-dsn", default=None))
+    snapshots.snapshot(BASELINE)
+    yield snapshots
+    snapshots.drop(BASELINE)
+
+
+@pytest.fixture
+def clean_database(db_snapshots: TemplateSnapshots) -> Generator[TemplateSnapshots, None, None]:
+    """
+    Fixture: Restore the test database to the session baseline after the test
+
+    For tests whose writes go through the app (stock, orders, reviews);
+    the app's API must use the snapshotted database for those to be undone.
+
+    Args:
+        db_snapshots: Session snapshots
+
+    Yields: TemplateSnapshots instance
+    """
+    yield db_snapshots
+    db_snapshots.restore(BASELINE)
+
+
 @pytest.fixture
-async def context(browser: Browser) -> AsyncGenerator[BrowserContext, None]:
+def db_transaction(request) -> Generator:
+    """
+    Fixture: Postgres connection rolled back to a savepoint after the test
+
+    Args:
+        request: Pytest request object
+
+    Yields: psycopg Connection inside an open transaction
+    """
+    with connect(request.config.getoption("--db-dsn", default=None)) as conn:
+        with SavepointSnapshot(conn):
+            yield conn
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope=LOOP_SCOPE)
+async def context_recycler(
+    browser: Browser,
+    request
+) -> AsyncGenerator[ContextRecycler, None]:
     """
-    Fixture: Create a new browser context for each test
+    Fixture: Recycler that resets contexts in place between tests
+
+    Tests using it carry the worker's running statistics (including
+    creations saved) in ``user_properties``; the terminal summary adds up
+    the latest totals of every worker.
 
     Args:
         browser: Browser instance
+        request: Pytest request object
+
+    Yields: ContextRecycler instance
+    """
+    recycler = ContextRecycler(browser, origins=["http://localhost:3000"])
+    yield recycler
+    await recycler.close()
+
+
+def _report_recycling(request, recycler: ContextRecycler) -> None:
+    """Attach the recycler's running totals to the test for the terminal summary"""
+    stats = dict(recycler.stats, creations_saved=recycler.creations_saved)
+    stats["worker"] = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    request.node.user_properties.append(("context_recycling", stats))
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope=LOOP_SCOPE)
+async def shared_context(
+    browser: Browser,
+    request
+) -> AsyncGenerator[BrowserContext, None]:
+    """
+    Fixture: One browser context shared by the tests of a module
+
+    Used by ``context`` when running with ``--context-scope=module``.
+
+    Args:
+        browser: Browser instance
+        request: Pytest request object
 
     Yields: BrowserContext instance
     """
     context = await stub_create_context(browser)
+    if request.config.getoption("--trace-on-failure", default=False):
+        await context.tracing.start(screenshots=True, snapshots=True, sources=False)
     yield context
     await context.close()
 
 
-@pytest.fixture
-async def page(context: BrowserContext) -> AsyncGenerator[Page, None]:
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
+async def context(
+    browser: Browser,
+    artifact_pipeline: ArtifactPipeline,
+    base_url: str,
+    request
+) -> AsyncGenerator[BrowserContext, None]:
+    """
+    Fixture: Provide a clean browser context for each test
+
+    Contexts come from the ``context_recycler`` and are reset in place after
+    the test (``--no-context-recycling`` closes them instead). With
+    ``--context-scope=module`` the module's shared context is handed out and
+    reset between tests. With ``--trace-on-failure`` a Playwright trace is
+    recorded and kept only when the test fails.
+
+    Args:
+        browser: Browser instance
+        artifact_pipeline: ArtifactPipeline receiving failure traces
+        base_url: Base URL whose storage is cleared on reset
+        request: Pytest request object
+
+    Yields: BrowserContext instance
+    """
+    shared = request.config.getoption("--context-scope", default="function") == "module"
+    recycle = not request.config.getoption("--no-context-recycling", default=False)
+    tracing = request.config.getoption("--trace-on-failure", default=False)
+    recycler = None
+
+    if shared:
+        context = request.getfixturevalue("shared_context")
+        if tracing:
+            await context.tracing.start_chunk()
+    else:
+        if recycle:
+            recycler = request.getfixturevalue("context_recycler")
+            context = await recycler.acquire()
+        else:
+            context = await stub_create_context(browser)
+        if tracing:
+            await context.tracing.start(screenshots=True, snapshots=True, sources=False)
+    yield context
+
+    if tracing:
+        stop = context.tracing.stop_chunk if shared else context.tracing.stop
+        if _test_failed(request):
+            path = artifact_pipeline.path_for(request.node.nodeid, ".trace.zip")
+            await stop(path=path)
+            artifact_pipeline.submit_file(request.node.nodeid, path, kind="trace")
+        else:
+            await stop()
+    if shared:
+        await stub_reset_context(context, origins=[base_url])
+    else:
+        await stub_cleanup(context, recycler=recycler)
+        if recycler is not None:
+            _report_recycling(request, recycler)
+
+
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
+async def page(context: BrowserContext, request) -> AsyncGenerator[Page, None]:
     """
     Fixture: Create a new page for each test
 
+    The page is throttled with the network profile from the test's
+    ``@pytest.mark.network("3g")`` marker, else ``--network-profile``.
+
     Args:
         context: BrowserContext instance
+        request: Pytest request object
 
     Yields: Page instance
     """
     page = await stub_create_page(context)
+    marker = request.node.get_closest_marker("network")
+    profile = (marker.args[0] if marker else
+               request.config.getoption("--network-profile", default=None)
+               or network_profile_from_env())
+    await apply_network_profile(page, profile)
     yield page
     await page.close()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
 async def authenticated_page(
     context: BrowserContext
 ) -> AsyncGenerator[Page, None]:
@@ -126,7 +427,7 @@ async def authenticated_page(
     await page.close()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
 async def page_with_url(
     page: Page,
     request
@@ -147,6 +448,108 @@ async def page_with_url(
     yield page
 
 
+@pytest.fixture
+def shop_pages(page: Page, base_url: str) -> ShopHubPages:
+    """
+    Fixture: Page objects for the Shop Hub pages bound to the test page
+
+    Args:
+        page: Page instance
+        base_url: Base URL of the app
+
+    Returns: ShopHubPages registry (e.g. ``shop_pages.checkout``)
+    """
+    return ShopHubPages(page, base_url)
+
+
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
+async def orchestrator(
+    browser: Browser,
+    base_url: str,
+    request
+) -> AsyncGenerator[MultiActorOrchestrator, None]:
+    """
+    Fixture: Orchestrator for concurrent customer/vendor/admin flows
+
+    Actor contexts come from the ``context_recycler`` unless
+    ``--no-context-recycling`` is set.
+
+    Args:
+        browser: Browser instance
+        base_url: Base URL of the app
+        request: Pytest request object
+
+    Yields: MultiActorOrchestrator instance (add actors, then ``run``)
+    """
+    recycler = None
+    if not request.config.getoption("--no-context-recycling", default=False):
+        recycler = request.getfixturevalue("context_recycler")
+    orchestrator = MultiActorOrchestrator(browser, base_url=base_url, recycler=recycler)
+    yield orchestrator
+    await orchestrator.close()
+    if recycler is not None:
+        _report_recycling(request, recycler)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope=LOOP_SCOPE)
+async def api_client() -> AsyncGenerator[ShopHubApiClient, None]:
+    """
+    Fixture: Pooled Supabase REST client shared by the session
+
+    Connections and cached access tokens are reused across tests. Tests
+    that sign in should pass ``token=`` explicitly or use ``api_session``.
+
+    Yields: ShopHubApiClient instance
+    """
+    client = ShopHubApiClient()
+    yield client
+    await client.close()
+
+
+@pytest.fixture
+def api_session(api_client: ShopHubApiClient) -> Generator[ShopHubApiClient, None, None]:
+    """
+    Fixture: Session API client whose signed-in token is dropped after the test
+
+    Args:
+        api_client: Session API client
+
+    Yields: ShopHubApiClient instance
+    """
+    yield api_client
+    api_client.token = None
+
+
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
+async def backend_checks(
+    api_session: ShopHubApiClient,
+    request
+) -> AsyncGenerator[BackendVerifier, None]:
+    """
+    Fixture: Backend state checks that run while the test drives the page
+
+    Checks still pending when the test ends are awaited, and any failure
+    fails the test (in teardown) with every failed check listed. If the
+    test already failed the pending checks are cancelled. Results are
+    listed in the terminal summary.
+
+    Args:
+        api_session: API client
+        request: Pytest request object
+
+    Yields: BackendVerifier instance
+    """
+    verifier = BackendVerifier(api=api_session)
+    yield verifier
+    if _test_failed(request):
+        await verifier.cancel()
+        return
+    try:
+        await verifier.verify()
+    finally:
+        request.node.user_properties.append(("backend_checks", verifier.results))
+
+
 @pytest.fixture
 def mock_user():
     """
@@ -237,7 +640,7 @@ def mock_auth_token():
     return mock_authentication_success()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
 async def intercepted_page(page: Page) -> AsyncGenerator[Page, None]:
     """
     Fixture: Create a page with network interception enabled
@@ -285,35 +688,30 @@ def test_credentials():
 
     Returns: Dictionary with test credentials
     """
-    return {
-        "customer": {
-            "email": "customer@test.com",
-            "password": "Test123456!"
-        },
-        "vendor": {
-            "email": "vendor@test.com",
-            "password": "Test123456!"
-        },
-        "admin": {
-            "email": "admin@test.com",
-            "password": "Admin123456!"
-        }
-    }
+    return {role: dict(credentials) for role, credentials in TEST_CREDENTIALS.items()}
 
 
-@pytest.fixture
-async def screenshot_on_failure(page: Page, request):
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
+async def screenshot_on_failure(
+    page: Page,
+    artifact_pipeline: ArtifactPipeline,
+    request
+):
     """
     Fixture: Take screenshot on test failure
 
+    The screenshot is captured in memory and handed to the artifact
+    pipeline, which compresses, deduplicates and writes it in the background.
+
     Args:
         page: Page instance
+        artifact_pipeline: ArtifactPipeline instance
         request: Pytest request object
     """
     yield
-    if request.node.rep_call.failed:
-        screenshot_path = f"screenshots/{request.node.name}.png"
-        await page.screenshot(path=screenshot_path, full_page=True)
+    if _test_failed(request) and not page.is_closed():
+        image = await page.screenshot(full_page=True, animations="disabled", caret="hide")
+        artifact_pipeline.submit_screenshot(request.node.nodeid, image)
 
 
 @pytest.fixture
@@ -354,7 +752,7 @@ def performance_tracker():
     return metrics
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
 async def mobile_page(context: BrowserContext) -> AsyncGenerator[Page, None]:
     """
     Fixture: Create a page with mobile viewport
@@ -370,7 +768,7 @@ async def mobile_page(context: BrowserContext) -> AsyncGenerator[Page, None]:
     await page.close()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
 async def tablet_page(context: BrowserContext) -> AsyncGenerator[Page, None]:
     """
     Fixture: Create a page with tablet viewport
@@ -386,7 +784,7 @@ async def tablet_page(context: BrowserContext) -> AsyncGenerator[Page, None]:
     await page.close()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
 async def slow_network_page(context: BrowserContext) -> AsyncGenerator[Page, None]:
     """
     Fixture: Create a page with simulated slow network
@@ -394,17 +792,101 @@ async def slow_network_page(context: BrowserContext) -> AsyncGenerator[Page, Non
     Args:
         context: BrowserContext instance
 
-    Yields: Page with network throttling
+    Yields: Page throttled with the "3g" network profile
     """
-    await context.route("**/*", lambda route: route.continue_(
-        timeout=5000
-    ))
     page = await stub_create_page(context)
+    await apply_network_profile(page, "3g")
     yield page
     await page.close()
 
 
-@pytest.fixture(autouse=True)
+@pytest_asyncio.fixture(autouse=True, loop_scope=LOOP_SCOPE)
+async def memory_profile(request):
+    """
+    Fixture: Sample memory during each test when ``--memory-profile`` is set
+
+    Records browser process tree RSS, the page JS heap (if the test uses
+    ``page``) and Python allocations. The summary is attached to the test's
+    ``user_properties``, so it reaches the terminal summary from xdist
+    workers too.
+
+    Args:
+        request: Pytest request object
+
+    Yields: MemorySampler instance, or None when profiling is off
+    """
+    if not request.config.getoption("--memory-profile", default=False):
+        yield None
+        return
+    page = request.getfixturevalue("page") if "page" in request.fixturenames else None
+    sampler = MemorySampler(page=page)
+    await sampler.start()
+    yield sampler
+    summary = await sampler.stop()
+    request.node.user_properties.append(("memory_profile", summary))
+
+
+@pytest_asyncio.fixture(autouse=True, loop_scope=LOOP_SCOPE)
+async def page_js_coverage(request, js_coverage):
+    """
+    Fixture: Collect V8 coverage of the test's page when ``--js-coverage`` is set
+
+    Args:
+        request: Pytest request object
+        js_coverage: Session CoverageMap
+
+    Yields: JSCoverageCollector instance, or None when coverage is off or
+        the test uses no ``page``
+    """
+    if js_coverage is None or "page" not in request.fixturenames:
+        yield None
+        return
+    collector = JSCoverageCollector(request.getfixturevalue("page"), summary_files())
+    await collector.start()
+    start = time.perf_counter()
+    yield collector
+    js_coverage.test_seconds += time.perf_counter() - start
+    await collector.stop(js_coverage)
+
+
+@pytest_asyncio.fixture(autouse=True, loop_scope=LOOP_SCOPE)
+async def visual_checks(request):
+    """
+    Fixture: Fail a test on any visual mismatch of its background comparisons
+
+    Only active for tests using ``visual_differ``. Comparisons started with
+    ``stub_compare_screenshot`` are awaited after the test; a mismatch fails
+    it in teardown (unless it already failed). Results are attached to the
+    test's ``user_properties`` for the terminal summary.
+
+    Args:
+        request: Pytest request object
+
+    Yields: None
+    """
+    if "visual_differ" not in request.fixturenames:
+        yield
+        return
+    differ = request.getfixturevalue("visual_differ")
+    differ.test = request.node.nodeid
+    try:
+        yield
+    finally:
+        differ.test = None
+    results = await asyncio.to_thread(differ.wait, request.node.nodeid)
+    if not results:
+        return
+    request.node.user_properties.append(("visual_diff", results))
+    mismatched = [result for result in results if not result["match"]]
+    if mismatched and not _test_failed(request):
+        raise AssertionError("Visual mismatches:\n" + "\n".join(
+            f"  {result.get('name')}: "
+            f"{result.get('diff_path') or result.get('reason') or result.get('error')}"
+            for result in mismatched
+        ))
+
+
+@pytest_asyncio.fixture(autouse=True, loop_scope=LOOP_SCOPE)
 async def cleanup_after_test():
     """
     Fixture: Automatic cleanup after each test
@@ -430,7 +912,7 @@ def test_data_factory():
     }
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
 async def console_logger(page: Page):
     """
     Fixture: Capture console messages during tests
@@ -454,7 +936,7 @@ async def console_logger(page: Page):
     page.remove_listener("console", handle_console)
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(loop_scope=LOOP_SCOPE)
 async def network_logger(page: Page):
     """
     Fixture: Capture network requests during tests
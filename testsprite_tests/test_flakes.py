@@ -0,0 +1,210 @@
+"""
+Test Flakes Module
+Contains the adaptive retry and flake quarantine engine for the TC scripts
+
+Run as a script to execute the suite with targeted retries:
+
+    python test_flakes.py --retries 2 --workers 4
+    python test_flakes.py --report
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from test_runner import TESTS_DIR, discover_tcs, run_tc, run_tcs
+
+
+DEFAULT_HISTORY_PATH = os.path.join(TESTS_DIR, "tmp", "flake_history.json")
+
+
+class FlakeHistory:
+    """Pass/fail history of each TC with flake scoring
+
+    A TC is flaky when its outcome changes without code changes: it flips
+    between runs or only passes on retry. Consistently failing TCs score 0
+    (they are broken, not flaky) and are never quarantined.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_HISTORY_PATH,
+        window: int = 20,
+        quarantine_threshold: float = 0.3,
+        min_runs: int = 5
+    ):
+        self.path = path
+        self.window = window
+        self.quarantine_threshold = quarantine_threshold
+        self.min_runs = min_runs
+        self.runs: Dict[str, List[Dict[str, Any]]] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.runs = json.load(f)
+
+    def record(self, tc_id: str, passed: bool, attempts: int, duration: float) -> None:
+        """
+        Record the final outcome of one TC in one suite run
+
+        Args:
+            tc_id: TC id such as "TC019"
+            passed: Whether the TC eventually passed
+            attempts: Number of attempts it took (1 means no retry)
+            duration: Total seconds spent across attempts
+        """
+        entries = self.runs.setdefault(tc_id, [])
+        entries.append({
+            "passed": passed,
+            "first_attempt_passed": passed and attempts == 1,
+            "attempts": attempts,
+            "duration": round(duration, 3),
+            "timestamp": datetime.now().isoformat(),
+        })
+        del entries[:-self.window]
+
+    def flake_score(self, tc_id: str) -> float:
+        """
+        Compute the flake score of a TC over the history window
+
+        The score is the fraction of runs that either flipped outcome from
+        the previous run or needed a retry to pass.
+
+        Args:
+            tc_id: TC id
+
+        Returns: Score between 0.0 (stable) and 1.0 (flips every run)
+        """
+        entries = self.runs.get(tc_id, [])
+        if len(entries) < 2:
+            return 0.0
+        outcomes = [entry["first_attempt_passed"] for entry in entries]
+        flips = sum(1 for prev, cur in zip(outcomes, outcomes[1:]) if prev != cur)
+        recoveries = sum(1 for entry in entries if entry["passed"] and entry["attempts"] > 1)
+        return round(min(1.0, (flips + recoveries) / len(entries)), 3)
+
+    def is_quarantined(self, tc_id: str) -> bool:
+        """
+        Check whether a TC is chronically flaky
+
+        Args:
+            tc_id: TC id
+
+        Returns: True if the TC should not fail the suite
+        """
+        return (len(self.runs.get(tc_id, [])) >= self.min_runs
+                and self.flake_score(tc_id) >= self.quarantine_threshold)
+
+    def order(self, tc_ids: Sequence[str]) -> List[str]:
+        """
+        Order TCs so stable ones run first and flaky ones last
+
+        Args:
+            tc_ids: TC ids
+
+        Returns: Reordered TC ids (stable sort by flake score)
+        """
+        return sorted(tc_ids, key=self.flake_score)
+
+    def save(self) -> None:
+        """Write the history to disk"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.runs, f, indent=2)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        Summarize every TC in the history
+
+        Returns: List of dictionaries sorted by descending flake score
+        """
+        rows = []
+        for tc_id, entries in self.runs.items():
+            rows.append({
+                "tc_id": tc_id,
+                "runs": len(entries),
+                "pass_rate": round(sum(e["passed"] for e in entries) / len(entries), 3),
+                "flake_score": self.flake_score(tc_id),
+                "quarantined": self.is_quarantined(tc_id),
+            })
+        return sorted(rows, key=lambda row: row["flake_score"], reverse=True)
+
+
+def run_suite(
+    tc_ids: Optional[Sequence[str]] = None,
+    retries: int = 2,
+    workers: int = 1,
+    history: Optional[FlakeHistory] = None,
+    env: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Run TCs once, then retry only the failures in fresh processes
+
+    Args:
+        tc_ids: TC ids to run (default: every TC script)
+        retries: Maximum retries per failing TC
+        workers: Number of TCs to run at the same time on the first pass
+        history: FlakeHistory to read and update (default: on-disk history)
+        env: Extra environment variables for every script
+
+    Returns: Dictionary with per-TC results and the suite verdict
+    """
+    history = history or FlakeHistory()
+    ordered = history.order(list(tc_ids or discover_tcs()))
+    results = {r["tc_id"]: dict(r, attempts=1) for r in run_tcs(ordered, env=env, workers=workers)}
+
+    for tc_id in ordered:
+        result = results[tc_id]
+        while not result["passed"] and result["attempts"] <= retries:
+            retry = run_tc(tc_id, env=env)
+            result.update(passed=retry["passed"], returncode=retry["returncode"],
+                          output=retry["output"], attempts=result["attempts"] + 1,
+                          duration=round(result["duration"] + retry["duration"], 3))
+
+    for tc_id in ordered:
+        result = results[tc_id]
+        history.record(tc_id, result["passed"], result["attempts"], result["duration"])
+        result["flake_score"] = history.flake_score(tc_id)
+        result["quarantined"] = history.is_quarantined(tc_id)
+    history.save()
+
+    blocking = [tc_id for tc_id in ordered
+                if not results[tc_id]["passed"] and not results[tc_id]["quarantined"]]
+    return {
+        "passed": not blocking,
+        "failed": blocking,
+        "quarantined_failures": [tc_id for tc_id in ordered
+                                 if not results[tc_id]["passed"] and results[tc_id]["quarantined"]],
+        "retried": [tc_id for tc_id in ordered if results[tc_id]["attempts"] > 1],
+        "results": [results[tc_id] for tc_id in ordered],
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the suite with targeted retries, or print the flake report"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("tc_ids", nargs="*", help="TC ids to run (default: all)")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH)
+    parser.add_argument("--report", action="store_true", help="Print the flake report and exit")
+    args = parser.parse_args(argv)
+
+    history = FlakeHistory(args.history)
+    if args.report:
+        for row in history.report():
+            print(json.dumps(row))
+        return 0
+
+    summary = run_suite(args.tc_ids or None, retries=args.retries,
+                        workers=args.workers, history=history)
+    for result in summary["results"]:
+        status = "PASS" if result["passed"] else ("QUARANTINED" if result["quarantined"] else "FAIL")
+        print(f"{result['tc_id']}: {status} attempts={result['attempts']} "
+              f"duration={result['duration']}s flake_score={result['flake_score']}")
+    return 0 if summary["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
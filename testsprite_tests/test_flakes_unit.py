@@ -0,0 +1,68 @@
+"""
+Unit tests for test_flakes.py
+Flake scoring, quarantine and ordering on a history kept in a temp directory
+"""
+import pytest
+
+from test_flakes import FlakeHistory
+
+
+@pytest.fixture
+def history(tmp_path):
+    return FlakeHistory(str(tmp_path / "flake_history.json"), window=10, min_runs=5)
+
+
+def _record(history, tc_id, outcomes):
+    """Record runs given as attempts per run (0 = failed on every attempt)"""
+    for attempts in outcomes:
+        history.record(tc_id, attempts > 0, max(attempts, 1), 1.0)
+
+
+def test_stable_and_broken_tcs_score_zero(history):
+    _record(history, "TC001", [1] * 6)
+    _record(history, "TC002", [0] * 6)
+    assert history.flake_score("TC001") == 0.0
+    assert history.flake_score("TC002") == 0.0
+    assert not history.is_quarantined("TC002")
+
+
+def test_passing_only_on_retry_scores_as_flaky(history):
+    _record(history, "TC019", [2] * 5)
+    assert history.flake_score("TC019") == 1.0
+    assert history.is_quarantined("TC019")
+
+
+def test_flips_count_toward_the_score(history):
+    _record(history, "TC011", [1, 0, 1, 1, 1, 1, 1, 1])
+    assert history.flake_score("TC011") == pytest.approx(2 / 8, abs=1e-3)
+    assert not history.is_quarantined("TC011")
+
+
+def test_needs_min_runs_before_quarantine(history):
+    _record(history, "TC007", [1, 0, 1, 0])
+    assert history.flake_score("TC007") >= history.quarantine_threshold
+    assert not history.is_quarantined("TC007")
+    _record(history, "TC007", [1])
+    assert history.is_quarantined("TC007")
+
+
+def test_window_drops_old_runs(history):
+    _record(history, "TC005", [2] * 10 + [1] * 10)
+    assert len(history.runs["TC005"]) == 10
+    assert history.flake_score("TC005") == 0.0
+
+
+def test_order_runs_flaky_tcs_last(history):
+    _record(history, "TC001", [1] * 5)
+    _record(history, "TC002", [2] * 5)
+    _record(history, "TC003", [1, 0, 1, 1, 1])
+    order = history.order(["TC002", "TC003", "TC001", "TC004"])
+    assert order == ["TC001", "TC004", "TC003", "TC002"]
+
+
+def test_save_round_trips(history):
+    _record(history, "TC010", [1, 2, 0])
+    history.save()
+    reloaded = FlakeHistory(history.path, window=10, min_runs=5)
+    assert reloaded.runs == history.runs
+    assert reloaded.report() == history.report()
@@ -0,0 +1,152 @@
+"""
+Test Launch Profiles Module
+Contains the benchmark command for the Chromium launch profiles
+
+Measures launch time, navigation time and browser memory for each profile,
+then runs the TC set under it to check stability:
+
+    python test_launch_profiles.py --profiles fast-headless low-memory --tcs TC001 TC008
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from test_memory import MB, process_tree_rss
+from test_runner import discover_tcs, run_tcs
+from test_stubs import (
+    LAUNCH_PROFILE_ENV,
+    LAUNCH_PROFILES,
+    stub_create_context,
+    stub_create_page,
+    stub_launch_browser,
+    stub_navigate_to_url,
+    stub_playwright_start
+)
+
+
+async def measure_profile(
+    profile: str,
+    url: str = "http://localhost:3000",
+    repeats: int = 3
+) -> Dict[str, Any]:
+    """
+    Launch, navigate and sample memory with one launch profile
+
+    Args:
+        profile: Launch profile name
+        url: Page to navigate to
+        repeats: Number of launches to average over
+
+    Returns: Dictionary with median launch/navigation ms and peak RSS in MB
+    """
+    launch_ms, navigation_ms, rss_mb, errors = [], [], [], []
+    pw = await stub_playwright_start()
+    try:
+        for _ in range(repeats):
+            browser = None
+            try:
+                start = time.perf_counter()
+                browser = await stub_launch_browser(pw, profile=profile)
+                launch_ms.append((time.perf_counter() - start) * 1000)
+
+                context = await stub_create_context(browser)
+                page = await stub_create_page(context)
+                start = time.perf_counter()
+                await stub_navigate_to_url(page, url, wait_until="load")
+                navigation_ms.append((time.perf_counter() - start) * 1000)
+                rss_mb.append(process_tree_rss() / MB)
+            except Exception as exc:
+                errors.append(str(exc).splitlines()[0])
+            finally:
+                if browser is not None:
+                    await browser.close()
+    finally:
+        await pw.stop()
+
+    def median(values: List[float]) -> Optional[float]:
+        return round(statistics.median(values), 1) if values else None
+
+    return {
+        "profile": profile,
+        "launch_ms": median(launch_ms),
+        "navigation_ms": median(navigation_ms),
+        "browser_rss_mb": round(max(rss_mb), 1) if rss_mb else None,
+        "errors": errors,
+    }
+
+
+def benchmark_profiles(
+    profiles: Sequence[str],
+    tc_ids: Sequence[str],
+    url: str = "http://localhost:3000",
+    repeats: int = 3,
+    workers: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Benchmark each launch profile and run the TC set under it
+
+    Args:
+        profiles: Launch profile names
+        tc_ids: TC scripts to run per profile (empty to skip)
+        url: Page used for the navigation measurement
+        repeats: Launches per profile
+        workers: TC scripts run at the same time
+
+    Returns: One row per profile, with ``stable`` true when nothing failed
+    """
+    rows = []
+    for profile in profiles:
+        row = asyncio.run(measure_profile(profile, url=url, repeats=repeats))
+        if tc_ids:
+            results = run_tcs(tc_ids, env={LAUNCH_PROFILE_ENV: profile}, workers=workers)
+            row["tc_passed"] = sum(r["passed"] for r in results)
+            row["tc_total"] = len(results)
+            row["tc_seconds"] = round(sum(r["duration"] for r in results), 2)
+        row["stable"] = not row["errors"] and row.get("tc_passed") == row.get("tc_total")
+        rows.append(row)
+        print(json.dumps(row))
+    return rows
+
+
+def pick_fastest(rows: Sequence[Dict[str, Any]]) -> Optional[str]:
+    """
+    Choose the fastest stable profile
+
+    Args:
+        rows: Rows from ``benchmark_profiles``
+
+    Returns: Profile name, or None if no profile was stable
+    """
+    stable = [row for row in rows if row["stable"] and row["launch_ms"] is not None]
+    if not stable:
+        return None
+    key = (lambda row: row["tc_seconds"]) if "tc_seconds" in stable[0] else \
+        (lambda row: row["launch_ms"] + row["navigation_ms"])
+    return min(stable, key=key)["profile"]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Benchmark the launch profiles and print the fastest stable one"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--profiles", nargs="+", choices=list(LAUNCH_PROFILES),
+                        default=[name for name in LAUNCH_PROFILES if name != "debug"])
+    parser.add_argument("--tcs", nargs="*", default=None,
+                        help="TC ids to run per profile (default: all; pass none to skip)")
+    parser.add_argument("--url", default="http://localhost:3000")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    tc_ids = list(discover_tcs()) if args.tcs is None else args.tcs
+    rows = benchmark_profiles(args.profiles, tc_ids, url=args.url,
+                              repeats=args.repeats, workers=args.workers)
+    print(f"Fastest stable profile: {pick_fastest(rows)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
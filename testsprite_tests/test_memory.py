@@ -0,0 +1,313 @@
+"""
+Test Memory Module
+Contains the memory profiling mode for the browser and the test harness
+
+Samples the Chromium process tree RSS, the page JS heap (CDP
+``Performance.getMetrics``) and Python allocations (``tracemalloc``) while
+a test runs. Run as a script to profile the TC scripts from outside:
+
+    python test_memory.py --tcs TC008 TC011 TC017
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from test_runner import TESTS_DIR, discover_tcs, resolve_tc
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+
+BROWSER_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+DEFAULT_REPORT_PATH = os.path.join(TESTS_DIR, "tmp", "memory_report.json")
+MB = 1024 * 1024
+
+
+def _psutil():
+    try:
+        import psutil
+    except ImportError as exc:
+        raise ImportError("Memory profiling needs psutil: pip install psutil") from exc
+    return psutil
+
+
+def process_tree_rss(
+    root_pid: Optional[int] = None,
+    names: Sequence[str] = BROWSER_PROCESS_NAMES
+) -> int:
+    """
+    Sum the RSS of browser processes below a root process
+
+    Args:
+        root_pid: Root process (default: the current process)
+        names: Process name fragments counted as browser processes;
+            pass an empty tuple to count the whole tree
+
+    Returns: Resident set size in bytes
+    """
+    psutil = _psutil()
+    try:
+        root = psutil.Process(root_pid or os.getpid())
+        processes = root.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return 0
+    if not names:
+        processes.append(root)
+    total = 0
+    for proc in processes:
+        try:
+            if not names or any(name in proc.name().lower() for name in names):
+                total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total
+
+
+async def js_heap_usage(cdp: Any) -> Dict[str, int]:
+    """
+    Read the page JS heap through CDP ``Performance.getMetrics``
+
+    Args:
+        cdp: CDP session with the Performance domain enabled
+
+    Returns: Dictionary with JSHeapUsedSize and JSHeapTotalSize in bytes
+    """
+    metrics = await cdp.send("Performance.getMetrics")
+    values = {metric["name"]: metric["value"] for metric in metrics["metrics"]}
+    return {
+        "JSHeapUsedSize": int(values.get("JSHeapUsedSize", 0)),
+        "JSHeapTotalSize": int(values.get("JSHeapTotalSize", 0)),
+    }
+
+
+def _peak_and_growth(samples: List[int]) -> Dict[str, float]:
+    if not samples:
+        return {"peak_mb": 0.0, "growth_mb": 0.0}
+    return {
+        "peak_mb": round(max(samples) / MB, 1),
+        "growth_mb": round((samples[-1] - samples[0]) / MB, 1),
+    }
+
+
+class MemorySampler:
+    """Samples browser, JS heap and Python memory in the background
+
+    Start it before the test body and stop it afterwards; ``stop`` returns
+    peak and growth (last sample minus first) for each source.
+    """
+
+    def __init__(
+        self,
+        page: Optional[Page] = None,
+        root_pid: Optional[int] = None,
+        interval: float = 0.25,
+        trace_python: bool = True
+    ):
+        self.page = page
+        self.root_pid = root_pid
+        self.interval = interval
+        self.trace_python = trace_python
+        self.samples: Dict[str, List[int]] = {"browser_rss": [], "js_heap": [], "python": []}
+        self._cdp = None
+        self._task: Optional[asyncio.Task] = None
+        self._owns_tracemalloc = False
+
+    async def start(self) -> None:
+        """Begin sampling"""
+        if self.trace_python and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        if self.trace_python:
+            tracemalloc.reset_peak()
+        if self.page is not None:
+            self._cdp = await self.page.context.new_cdp_session(self.page)
+            await self._cdp.send("Performance.enable")
+        await self.sample()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.sample()
+
+    async def sample(self) -> None:
+        """Take one sample of every source"""
+        self.samples["browser_rss"].append(process_tree_rss(self.root_pid))
+        if self._cdp is not None:
+            try:
+                heap = await js_heap_usage(self._cdp)
+                self.samples["js_heap"].append(heap["JSHeapUsedSize"])
+            except Exception:
+                self._cdp = None  # page closed
+        if self.trace_python and tracemalloc.is_tracing():
+            self.samples["python"].append(tracemalloc.get_traced_memory()[0])
+
+    async def stop(self) -> Dict[str, Any]:
+        """
+        Stop sampling and summarize
+
+        Returns: Dictionary with peak/growth in MB per source and sample count
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.sample()
+        python_peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        if self._cdp is not None:
+            try:
+                await self._cdp.detach()
+            except Exception:
+                pass
+
+        browser = _peak_and_growth(self.samples["browser_rss"])
+        heap = _peak_and_growth(self.samples["js_heap"])
+        python = _peak_and_growth(self.samples["python"])
+        if python_peak:
+            python["peak_mb"] = round(python_peak / MB, 1)
+        return {
+            "browser_rss_peak_mb": browser["peak_mb"],
+            "browser_rss_growth_mb": browser["growth_mb"],
+            "js_heap_peak_mb": heap["peak_mb"],
+            "js_heap_growth_mb": heap["growth_mb"],
+            "python_peak_mb": python["peak_mb"],
+            "python_growth_mb": python["growth_mb"],
+            "samples": len(self.samples["browser_rss"]),
+        }
+
+
+def recommend_workers(
+    peak_per_test_mb: float,
+    available_mb: Optional[float] = None,
+    reserve_mb: float = 1024,
+    safety: float = 0.8
+) -> int:
+    """
+    Recommend how many tests can run at once without exhausting memory
+
+    Args:
+        peak_per_test_mb: Worst peak memory of a single test (browser + harness)
+        available_mb: Memory available for tests (default: currently available)
+        reserve_mb: Memory kept free for the OS and CI agent
+        safety: Fraction of the remaining memory to plan for
+
+    Returns: Worker count (at least 1)
+    """
+    if available_mb is None:
+        available_mb = _psutil().virtual_memory().available / MB
+    budget = max(0.0, available_mb - reserve_mb) * safety
+    if peak_per_test_mb <= 0:
+        return max(1, os.cpu_count() or 1)
+    return max(1, min(int(budget // peak_per_test_mb), os.cpu_count() or 1))
+
+
+def build_report(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine per-test summaries into a report with a worker recommendation
+
+    Args:
+        results: Mapping of test name to ``MemorySampler.stop()`` summary
+
+    Returns: Report dictionary
+    """
+    worst = max((r["browser_rss_peak_mb"] + r["python_peak_mb"] for r in results.values()),
+                default=0.0)
+    return {
+        "tests": results,
+        "worst_peak_mb": round(worst, 1),
+        "recommended_workers": recommend_workers(worst),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_report(report: Dict[str, Any], path: str = DEFAULT_REPORT_PATH) -> str:
+    """
+    Write a memory report as JSON
+
+    Args:
+        report: Report from ``build_report``
+        path: Output path
+
+    Returns: The output path
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def profile_tc(tc_id: str, interval: float = 0.25, timeout: float = 300.0) -> Dict[str, Any]:
+    """
+    Run a TC script and sample its whole process tree from outside
+
+    JS heap and tracemalloc figures are not available in this mode; the
+    harness is included in the tree RSS instead.
+
+    Args:
+        tc_id: TC id such as "TC011"
+        interval: Sampling interval in seconds
+        timeout: Timeout in seconds
+
+    Returns: Summary dictionary with peak/growth per source
+    """
+    proc = subprocess.Popen([sys.executable, resolve_tc(tc_id)], cwd=TESTS_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    psutil = _psutil()
+    browser, harness = [], []
+    deadline = time.monotonic() + timeout
+    while proc.poll() is None and time.monotonic() < deadline:
+        try:
+            harness.append(psutil.Process(proc.pid).memory_info().rss)
+        except psutil.NoSuchProcess:
+            break
+        browser.append(process_tree_rss(proc.pid))
+        time.sleep(interval)
+    if proc.poll() is None:
+        proc.kill()
+    browser_stats = _peak_and_growth(browser)
+    harness_stats = _peak_and_growth(harness)
+    return {
+        "passed": proc.wait() == 0,
+        "browser_rss_peak_mb": browser_stats["peak_mb"],
+        "browser_rss_growth_mb": browser_stats["growth_mb"],
+        "js_heap_peak_mb": 0.0,
+        "js_heap_growth_mb": 0.0,
+        "python_peak_mb": harness_stats["peak_mb"],
+        "python_growth_mb": harness_stats["growth_mb"],
+        "samples": len(browser),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Profile TC scripts one at a time and recommend a worker count"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--tcs", nargs="+", default=None, help="TC ids (default: all)")
+    parser.add_argument("--interval", type=float, default=0.25)
+    parser.add_argument("--output", default=DEFAULT_REPORT_PATH)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for tc_id in args.tcs or list(discover_tcs()):
+        results[tc_id] = profile_tc(tc_id, interval=args.interval)
+        print(json.dumps(dict(results[tc_id], tc_id=tc_id)))
+    report = build_report(results)
+    write_report(report, args.output)
+    print(f"Worst peak {report['worst_peak_mb']} MB per TC; "
+          f"recommended workers: {report['recommended_workers']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
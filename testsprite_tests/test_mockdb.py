@@ -0,0 +1,364 @@
+"""
+Test Mock Database Module
+Contains the in-process table store behind ``mock_database_connection``
+
+Fixture datasets are bulk-loaded from JSON, CSV or the mock data factories.
+Rows are kept per table with hash indexes on the usual lookup columns, and
+``fetch_one``/``fetch_all``/``execute`` take simple predicates. The sync
+store and its async view share the same data:
+
+    db = MockDatabase()
+    db.load_factory("products", mock_product_data, 500, vendor_id=lambda i: f"vendor_{i % 5}")
+    db.fetch_all("products", vendor_id="vendor_1", category="Electronics")
+    rows = await db.aio().fetch_all("products", price=lambda p: p < 50)
+"""
+import csv
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+
+# Columns indexed on every table that has them
+DEFAULT_INDEXES = ("id", "user_id", "vendor_id", "category")
+
+Predicate = Union[Any, Sequence[Any], Callable[[Any], bool]]
+
+
+def _matches(value: Any, expected: Predicate) -> bool:
+    if callable(expected):
+        return bool(expected(value))
+    if isinstance(expected, (list, tuple, set, frozenset)):
+        return value in expected
+    return value == expected
+
+
+class MockDatabase:
+    """In-process tables with secondary indexes
+
+    Each table maps an internal row number to the row dictionary; an index
+    maps a column value to the row numbers holding it (kept in insertion
+    order). Equality and IN predicates on indexed columns are answered from
+    the smallest matching index bucket; every other predicate is checked on
+    those candidate rows only. Returned rows are copies.
+    """
+
+    def __init__(self, indexes: Sequence[str] = DEFAULT_INDEXES):
+        self.default_indexes = tuple(indexes)
+        self.connected = False
+        self._tables: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._indexes: Dict[str, Dict[str, Dict[Any, Dict[int, None]]]] = {}
+        self._next_rowid = 0
+
+    # --- Connection API kept from the Mock version ------------------------
+
+    def connect(self) -> bool:
+        self.connected = True
+        return True
+
+    def disconnect(self) -> bool:
+        self.connected = False
+        return True
+
+    def aio(self) -> "AsyncMockDatabase":
+        """Async view over the same tables"""
+        return AsyncMockDatabase(self)
+
+    # --- Schema -----------------------------------------------------------
+
+    def tables(self) -> List[str]:
+        """Names of the tables holding data"""
+        return list(self._tables)
+
+    def count(self, table: str) -> int:
+        """Number of rows in ``table``"""
+        return len(self._tables.get(table, ()))
+
+    def create_index(self, table: str, column: str) -> None:
+        """
+        Index ``column`` of ``table``, including rows already loaded
+
+        Args:
+            table: Table name
+            column: Column name
+        """
+        index = self._indexes.setdefault(table, {})
+        if column in index:
+            return
+        buckets: Dict[Any, Dict[int, None]] = {}
+        for rowid, row in self._tables.get(table, {}).items():
+            if column in row:
+                buckets.setdefault(row[column], {})[rowid] = None
+        index[column] = buckets
+
+    def _index_row(self, table: str, rowid: int, row: Dict[str, Any]) -> None:
+        for column, buckets in self._indexes[table].items():
+            if column in row:
+                buckets.setdefault(row[column], {})[rowid] = None
+
+    def _unindex_row(self, table: str, rowid: int, row: Dict[str, Any]) -> None:
+        for column, buckets in self._indexes[table].items():
+            bucket = buckets.get(row.get(column))
+            if bucket is not None:
+                bucket.pop(rowid, None)
+                if not bucket:
+                    del buckets[row.get(column)]
+
+    # --- Loading ----------------------------------------------------------
+
+    def insert(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append rows to a table, creating it on first use
+
+        Default indexes are created for the columns of the first row.
+
+        Args:
+            table: Table name
+            rows: Row dictionaries
+
+        Returns: Number of rows inserted
+        """
+        store = self._tables.setdefault(table, {})
+        index = self._indexes.setdefault(table, {})
+        inserted = 0
+        for row in rows:
+            if not store and not index:
+                for column in self.default_indexes:
+                    if column in row:
+                        index[column] = {}
+            rowid = self._next_rowid
+            self._next_rowid += 1
+            store[rowid] = dict(row)
+            self._index_row(table, rowid, store[rowid])
+            inserted += 1
+        return inserted
+
+    def load_json(self, source: Union[str, Dict[str, List[Dict[str, Any]]]]) -> Dict[str, int]:
+        """
+        Load a dataset of the form ``{"table": [row, ...], ...}``
+
+        Args:
+            source: JSON file path or the already parsed dictionary
+
+        Returns: Dictionary of table to rows inserted
+        """
+        if isinstance(source, str):
+            with open(source) as f:
+                source = json.load(f)
+        return {table: self.insert(table, rows) for table, rows in source.items()}
+
+    def load_csv(
+        self,
+        table: str,
+        path: str,
+        types: Optional[Dict[str, Callable[[str], Any]]] = None
+    ) -> int:
+        """
+        Load a CSV file with a header row into a table
+
+        Args:
+            table: Table name
+            path: CSV file path
+            types: Converters per column (e.g. {"price": float}); other
+                columns stay strings and empty cells become None
+
+        Returns: Number of rows inserted
+        """
+        types = types or {}
+
+        def convert(row: Dict[str, str]) -> Dict[str, Any]:
+            return {column: (types[column](value) if column in types else value)
+                    if value != "" else None
+                    for column, value in row.items()}
+
+        with open(path, newline="") as f:
+            return self.insert(table, (convert(row) for row in csv.DictReader(f)))
+
+    def load_factory(
+        self,
+        table: str,
+        factory: Callable[..., Dict[str, Any]],
+        count: int,
+        **kwargs: Any
+    ) -> int:
+        """
+        Generate rows with a mock data factory
+
+        Keyword arguments are passed to the factory; callables among them
+        are called with the row number first, e.g. ``vendor_id=lambda i:
+        f"vendor_{i % 5}"``.
+
+        Args:
+            table: Table name
+            factory: Function returning one row, such as ``mock_product_data``
+            count: Number of rows
+            **kwargs: Factory arguments
+
+        Returns: Number of rows inserted
+        """
+        return self.insert(table, (
+            factory(**{key: value(i) if callable(value) else value for key, value in kwargs.items()})
+            for i in range(count)
+        ))
+
+    # --- Queries ----------------------------------------------------------
+
+    def _select(self, table: str, filters: Dict[str, Predicate],
+                where: Optional[Callable[[Dict[str, Any]], bool]]) -> List[int]:
+        store = self._tables.get(table, {})
+        index = self._indexes.get(table, {})
+        candidates = None
+        for column, expected in filters.items():
+            if column not in index or callable(expected):
+                continue
+            buckets = index[column]
+            if isinstance(expected, (list, tuple, set, frozenset)):
+                rowids = {rowid for value in expected for rowid in buckets.get(value, ())}
+            else:
+                rowids = buckets.get(expected, {})
+            if candidates is None or len(rowids) < len(candidates):
+                candidates = rowids
+        if candidates is None:
+            candidates = store
+        selected = []
+        for rowid in sorted(candidates) if isinstance(candidates, set) else candidates:
+            row = store[rowid]
+            if all(_matches(row.get(column), expected) for column, expected in filters.items()) \
+                    and (where is None or where(row)):
+                selected.append(rowid)
+        return selected
+
+    def fetch_all(
+        self,
+        table: str,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        **filters: Predicate
+    ) -> List[Dict[str, Any]]:
+        """
+        Select rows
+
+        Each keyword filter is a column predicate: a value (equality), a
+        list/tuple/set (IN) or a callable taking the column value.
+
+        Args:
+            table: Table name
+            where: Extra predicate on the whole row
+            order_by: Column to sort by (default: insertion order)
+            descending: Sort in descending order
+            limit: Maximum number of rows
+            **filters: Column predicates
+
+        Returns: Matching rows (copies)
+        """
+        store = self._tables.get(table, {})
+        rows = [store[rowid] for rowid in self._select(table, filters, where)]
+        if order_by is not None:
+            rows.sort(key=lambda row: row.get(order_by), reverse=descending)
+        return [dict(row) for row in rows[:limit]]
+
+    def fetch_one(
+        self,
+        table: str,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        **filters: Predicate
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Select the first matching row
+
+        Args:
+            table: Table name
+            where: Extra predicate on the whole row
+            **filters: Column predicates (see ``fetch_all``)
+
+        Returns: Row copy, or None
+        """
+        rows = self.fetch_all(table, where=where, limit=1, **filters)
+        return rows[0] if rows else None
+
+    def execute(
+        self,
+        operation: str,
+        table: str,
+        values: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        **filters: Predicate
+    ) -> Dict[str, Any]:
+        """
+        Insert, update or delete rows
+
+        Args:
+            operation: "insert", "update" or "delete"
+            table: Table name
+            values: Row(s) to insert, or columns to set on update
+            where: Extra predicate on the whole row (update/delete)
+            **filters: Column predicates (update/delete)
+
+        Returns: Dictionary with success and rowcount
+
+        Raises:
+            ValueError: Unknown operation
+        """
+        operation = operation.lower()
+        if operation == "insert":
+            rows = [values] if isinstance(values, dict) else list(values or ())
+            return {"success": True, "rowcount": self.insert(table, rows)}
+        if operation not in ("update", "delete"):
+            raise ValueError(f"Unknown operation {operation!r}; use insert, update or delete")
+
+        store = self._tables.get(table, {})
+        rowids = self._select(table, filters, where)
+        for rowid in rowids:
+            row = store[rowid]
+            self._unindex_row(table, rowid, row)
+            if operation == "delete":
+                del store[rowid]
+            else:
+                row.update(values or {})
+                self._index_row(table, rowid, row)
+        return {"success": True, "rowcount": len(rowids)}
+
+    def clear(self, table: Optional[str] = None) -> None:
+        """
+        Remove all rows (keeping the indexed columns)
+
+        Args:
+            table: Table to empty (default: every table)
+        """
+        for name in [table] if table else list(self._tables):
+            self._tables[name] = {}
+            for column in self._indexes.get(name, {}):
+                self._indexes[name][column] = {}
+
+
+class AsyncMockDatabase:
+    """Async interface over a ``MockDatabase``
+
+    Operations run inline (there is no I/O), so results are consistent with
+    the sync interface of the same store.
+    """
+
+    def __init__(self, db: Optional[MockDatabase] = None):
+        self.db = db or MockDatabase()
+
+    async def connect(self) -> bool:
+        return self.db.connect()
+
+    async def disconnect(self) -> bool:
+        return self.db.disconnect()
+
+    async def fetch_all(self, table: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Async ``MockDatabase.fetch_all``"""
+        return self.db.fetch_all(table, **kwargs)
+
+    async def fetch_one(self, table: str, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """Async ``MockDatabase.fetch_one``"""
+        return self.db.fetch_one(table, **kwargs)
+
+    async def execute(self, operation: str, table: str, **kwargs: Any) -> Dict[str, Any]:
+        """Async ``MockDatabase.execute``"""
+        return self.db.execute(operation, table, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Loaders and schema helpers stay synchronous
+        return getattr(self.db, name)
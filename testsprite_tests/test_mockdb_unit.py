@@ -0,0 +1,81 @@
+"""
+Unit tests for test_mockdb.py
+Indexed lookups must give the same rows as a full scan after every write
+"""
+import pytest
+
+from test_mockdb import MockDatabase
+
+
+def _scan(db, table, **filters):
+    """Rows matching ``filters`` without the indexes"""
+    unindexed = MockDatabase(indexes=())
+    unindexed.insert(table, db.fetch_all(table))
+    return unindexed.fetch_all(table, **filters)
+
+
+@pytest.fixture
+def db():
+    database = MockDatabase()
+    database.insert("products", [
+        {"id": f"p{i}", "vendor_id": f"v{i % 3}", "category": ("Books", "Toys")[i % 2],
+         "price": i * 10}
+        for i in range(12)
+    ])
+    return database
+
+
+def test_default_indexes_cover_present_columns(db):
+    assert set(db._indexes["products"]) == {"id", "vendor_id", "category"}
+
+
+def test_indexed_filters_match_scan(db):
+    for filters in ({"vendor_id": "v1"}, {"vendor_id": ["v0", "v2"], "category": "Toys"},
+                    {"id": "p5"}, {"vendor_id": "v9"}, {"category": "Books", "price": 40}):
+        assert db.fetch_all("products", **filters) == _scan(db, "products", **filters)
+
+
+def test_in_filter_keeps_insertion_order(db):
+    rows = db.fetch_all("products", vendor_id=["v2", "v0"])
+    assert [row["id"] for row in rows] == ["p0", "p2", "p3", "p5", "p6", "p8", "p9", "p11"]
+
+
+def test_update_moves_rows_between_buckets(db):
+    result = db.execute("update", "products", {"vendor_id": "v9"}, vendor_id="v1")
+    assert result["rowcount"] == 4
+    assert db.fetch_all("products", vendor_id="v1") == []
+    moved = db.fetch_all("products", vendor_id="v9")
+    assert [row["id"] for row in moved] == ["p1", "p4", "p7", "p10"]
+    assert "v1" not in db._indexes["products"]["vendor_id"]
+
+
+def test_delete_drops_rows_from_every_index(db):
+    db.execute("delete", "products", where=lambda row: row["price"] >= 60, category="Toys")
+    assert db.count("products") == 9
+    for column, buckets in db._indexes["products"].items():
+        for value, rowids in buckets.items():
+            assert rowids, f"empty bucket left for {column}={value!r}"
+    assert db.fetch_all("products", id=["p7", "p9", "p11"]) == []
+    assert db.fetch_all("products", category="Toys") == _scan(db, "products", category="Toys")
+
+
+def test_create_index_covers_rows_already_loaded(db):
+    db.create_index("products", "price")
+    assert db.fetch_all("products", price=30) == [
+        {"id": "p3", "vendor_id": "v0", "category": "Toys", "price": 30}]
+    db.insert("products", [{"id": "p12", "vendor_id": "v0", "category": "Toys", "price": 30}])
+    assert [row["id"] for row in db.fetch_all("products", price=30)] == ["p3", "p12"]
+
+
+def test_clear_empties_indexes(db):
+    db.clear("products")
+    db.insert("products", [{"id": "p0", "vendor_id": "v0"}])
+    assert db.fetch_all("products", vendor_id="v0") == [{"id": "p0", "vendor_id": "v0"}]
+    assert set(db._indexes["products"]) == {"id", "vendor_id", "category"}
+
+
+def test_returned_rows_are_copies(db):
+    row = db.fetch_one("products", id="p1")
+    row["vendor_id"] = "changed"
+    assert db.fetch_one("products", id="p1")["vendor_id"] == "v1"
+    assert db.fetch_all("products", vendor_id="changed") == []
@@ -2,14 +2,45 @@
 Test Mocks Module
 Contains mock functions for external dependencies and API responses
 """
-from typing import Any, Dict, List, Optional, Callable
-from unittest.mock import Mock, AsyncMock, MagicMock
-from playwright.async_api import Page, Route, Request
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Callable, Union
 import json
 import random
 import string
 from datetime import datetime, timedelta
 
+if TYPE_CHECKING:
+    from unittest.mock import Mock
+    from playwright.async_api import Page, Route, Request
+    from test_mockdb import AsyncMockDatabase, MockDatabase
+
+# Heavy modules are only imported when a mock that needs them is built
+_LAZY_NAMES = {
+    "Mock": "unittest.mock",
+    "AsyncMock": "unittest.mock",
+    "MagicMock": "unittest.mock",
+    "Page": "playwright.async_api",
+    "Route": "playwright.async_api",
+    "Request": "playwright.async_api",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve re-exported names from unittest.mock and Playwright on first access"""
+    if name in _LAZY_NAMES:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_NAMES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Seeded test accounts, one per role (also the ``test_credentials`` fixture)
+TEST_CREDENTIALS = {
+    "customer": {"email": "customer@test.com", "password": "Test123456!"},
+    "vendor": {"email": "vendor@test.com", "password": "Test123456!"},
+    "admin": {"email": "admin@test.com", "password": "Admin123456!"},
+}
+
 
 class MockAPIResponse:
     """Mock API response object"""
@@ -142,7 +173,8 @@ def mock_order_data(
 def mock_payment_data(
     payment_id: Optional[str] = None,
     order_id: Optional[str] = None,
-    status: str = "completed"
+    status: str = "completed",
+    commission_rate: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Mock: Generate mock payment data
@@ -151,16 +183,25 @@ def mock_payment_data(
         payment_id: Payment ID (auto-generated if None)
         order_id: Order ID (auto-generated if None)
         status: Payment status (pending, completed, failed, refunded)
+        commission_rate: Vendor commission rate in percent; when given the
+            commission is derived from the amount (see test_payouts.py)
+            instead of being random
 
     Returns: Mock payment data dictionary
     """
     pid = payment_id or f"pay_{random.randint(10000, 99999)}"
     oid = order_id or f"order_{random.randint(10000, 99999)}"
+    amount = round(random.uniform(50.0, 1000.0), 2)
+    if commission_rate is None:
+        commission = round(random.uniform(5.0, 100.0), 2)
+    else:
+        from test_payouts import reference_commission
+        commission = float(reference_commission(amount, commission_rate))
     return {
         "id": pid,
         "order_id": oid,
-        "amount": round(random.uniform(50.0, 1000.0), 2),
-        "commission": round(random.uniform(5.0, 100.0), 2),
+        "amount": amount,
+        "commission": commission,
         "status": status,
         "payment_method": random.choice(["credit_card", "paypal", "stripe"]),
         "transaction_id": f"txn_{''.join(random.choices(string.ascii_uppercase + string.digits, k=16))}",
@@ -351,34 +392,42 @@ def mock_cart_data(
     }
 
 
-def mock_database_connection() -> Mock:
+def mock_database_connection(
+    dataset: Optional[Union[str, Dict[str, List[Dict[str, Any]]]]] = None
+) -> MockDatabase:
     """
-    Mock: Create a mock database connection
+    Mock: Create an in-memory database connection
+
+    Args:
+        dataset: JSON file path or ``{"table": [rows]}`` to bulk-load
+            (default: a "users" table with 5 mock users)
 
-    Returns: Mock database connection object
+    Returns: MockDatabase instance
     """
-    mock_db = Mock()
-    mock_db.connect = Mock(return_value=True)
-    mock_db.disconnect = Mock(return_value=True)
-    mock_db.execute = Mock(return_value={"success": True})
-    mock_db.fetch_one = Mock(return_value=mock_user_data())
-    mock_db.fetch_all = Mock(return_value=[mock_user_data() for _ in range(5)])
-    return mock_db
+    from test_mockdb import MockDatabase
 
+    db = MockDatabase()
+    if dataset is None:
+        db.load_factory("users", mock_user_data, 5)
+    else:
+        db.load_json(dataset)
+    return db
 
-async def mock_async_database_connection() -> AsyncMock:
+
+async def mock_async_database_connection(
+    dataset: Optional[Union[str, Dict[str, List[Dict[str, Any]]]]] = None,
+    db: Optional[MockDatabase] = None
+) -> AsyncMockDatabase:
     """
-    Mock: Create a mock async database connection
+    Mock: Create an async in-memory database connection
+
+    Args:
+        dataset: Dataset to load into a new store (see ``mock_database_connection``)
+        db: Existing store to share with sync code instead
 
-    Returns: AsyncMock database connection object
+    Returns: AsyncMockDatabase instance
     """
-    mock_db = AsyncMock()
-    mock_db.connect = AsyncMock(return_value=True)
-    mock_db.disconnect = AsyncMock(return_value=True)
-    mock_db.execute = AsyncMock(return_value={"success": True})
-    mock_db.fetch_one = AsyncMock(return_value=mock_user_data())
-    mock_db.fetch_all = AsyncMock(return_value=[mock_user_data() for _ in range(5)])
-    return mock_db
+    return (db or mock_database_connection(dataset)).aio()
 
 
 def mock_email_service() -> Mock:
@@ -387,6 +436,8 @@ def mock_email_service() -> Mock:
 
     Returns: Mock email service object
     """
+    from unittest.mock import Mock
+
     mock_email = Mock()
     mock_email.send = Mock(return_value={"success": True, "message_id": f"msg_{random.randint(1000, 9999)}"})
     mock_email.send_bulk = Mock(return_value={"success": True, "sent_count": 10})
@@ -399,6 +450,8 @@ def mock_payment_gateway() -> Mock:
 
     Returns: Mock payment gateway object
     """
+    from unittest.mock import Mock
+
     mock_gateway = Mock()
     mock_gateway.process_payment = Mock(return_value=mock_payment_data(status="completed"))
     mock_gateway.refund_payment = Mock(return_value={"success": True, "refund_id": f"ref_{random.randint(1000, 9999)}"})
@@ -412,6 +465,8 @@ def mock_storage_service() -> Mock:
 
     Returns: Mock storage service object
     """
+    from unittest.mock import Mock
+
     mock_storage = Mock()
     mock_storage.upload = Mock(return_value={"success": True, "url": "https://example.com/uploads/test.jpg"})
     mock_storage.download = Mock(return_value=b"mock file content")
@@ -484,6 +539,8 @@ def mock_page_element(
 
     Returns: Mock element object
     """
+    from unittest.mock import Mock, AsyncMock
+
     mock_element = Mock()
     mock_element.tag_name = tag
     mock_element.text_content = Mock(return_value=text or "Mock element text")
@@ -503,6 +560,8 @@ def create_mock_locator(text: str = "Mock Text") -> Mock:
 
     Returns: Mock locator object
     """
+    from unittest.mock import Mock, AsyncMock
+
     mock_locator = Mock()
     mock_locator.first = mock_locator
     mock_locator.text_content = AsyncMock(return_value=text)
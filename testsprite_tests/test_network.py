@@ -0,0 +1,246 @@
+"""
+Test Network Module
+Contains network and CPU emulation profiles applied through the Chrome
+DevTools Protocol
+
+Run as a script to see how search and checkout degrade under each profile.
+The TCs' plan steps run in one browser and only step time is compared, so
+browser start-up and fixed sleeps do not dilute the slowdown:
+
+    python test_network.py --tcs TC008 TC017 TC011
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, CDPSession, Page
+
+
+NETWORK_PROFILE_ENV = "SHOPHUB_NETWORK_PROFILE"
+
+# Throughput in kilobits per second, latency in milliseconds (added per
+# request round trip), packet loss in percent, CPU slowdown multiplier.
+NETWORK_PROFILES: Dict[str, Dict[str, float]] = {
+    "3g": {"latency": 300, "download_kbps": 1600, "upload_kbps": 750,
+           "packet_loss": 0, "cpu_throttle": 4},
+    "slow-4g": {"latency": 150, "download_kbps": 4000, "upload_kbps": 3000,
+                "packet_loss": 0, "cpu_throttle": 2},
+    "high-latency": {"latency": 800, "download_kbps": 10000, "upload_kbps": 5000,
+                     "packet_loss": 0, "cpu_throttle": 1},
+    "lossy": {"latency": 100, "download_kbps": 5000, "upload_kbps": 2000,
+              "packet_loss": 5, "cpu_throttle": 1},
+}
+
+# Delay added to a "lost" request when the browser cannot emulate packet
+# loss itself, approximating a TCP retransmission timeout
+RETRANSMIT_DELAY_MS = 1000
+
+
+def resolve_network_profile(name: Optional[str]) -> Optional[Dict[str, float]]:
+    """
+    Look up a network profile by name
+
+    Args:
+        name: Profile name; None, "" or "none" disables emulation
+
+    Returns: Profile dictionary, or None for no emulation
+    """
+    if not name or name == "none":
+        return None
+    if name not in NETWORK_PROFILES:
+        raise KeyError(f"Unknown network profile {name!r}; "
+                       f"available: {', '.join(NETWORK_PROFILES)}")
+    return NETWORK_PROFILES[name]
+
+
+def network_profile_from_env() -> Optional[str]:
+    """
+    Get the suite-wide profile name from ``SHOPHUB_NETWORK_PROFILE``
+
+    Returns: Profile name or None
+    """
+    return os.environ.get(NETWORK_PROFILE_ENV) or None
+
+
+def _conditions(profile: Dict[str, float]) -> Dict[str, Any]:
+    return {
+        "offline": False,
+        "latency": profile["latency"],
+        "downloadThroughput": profile["download_kbps"] * 1000 / 8,
+        "uploadThroughput": profile["upload_kbps"] * 1000 / 8,
+    }
+
+
+async def _simulate_loss(page: Page, packet_loss: float) -> None:
+    async def handler(route):
+        if random.uniform(0, 100) < packet_loss:
+            await asyncio.sleep(RETRANSMIT_DELAY_MS / 1000)
+        await route.continue_()
+
+    await page.route("**/*", handler)
+
+
+async def apply_network_profile(page: Page, name: str) -> Optional[CDPSession]:
+    """
+    Throttle one page's network and CPU with a named profile
+
+    Uses ``Network.emulateNetworkConditions`` and
+    ``Emulation.setCPUThrottlingRate`` (Chromium only). Packet loss is sent
+    to CDP when supported; otherwise a fraction of requests is delayed by
+    a retransmission timeout instead.
+
+    Args:
+        page: Page instance
+        name: Profile name from ``NETWORK_PROFILES``
+
+    Returns: The CDP session (keep it alive for the page's lifetime), or
+        None when ``name`` disables emulation
+    """
+    profile = resolve_network_profile(name)
+    if profile is None:
+        return None
+
+    cdp = await page.context.new_cdp_session(page)
+    await cdp.send("Network.enable")
+    conditions = _conditions(profile)
+    if profile["packet_loss"]:
+        try:
+            await cdp.send("Network.emulateNetworkConditions",
+                           dict(conditions, packetLoss=profile["packet_loss"]))
+        except Exception:
+            await cdp.send("Network.emulateNetworkConditions", conditions)
+            await _simulate_loss(page, profile["packet_loss"])
+    else:
+        await cdp.send("Network.emulateNetworkConditions", conditions)
+    if profile["cpu_throttle"] > 1:
+        await cdp.send("Emulation.setCPUThrottlingRate", {"rate": profile["cpu_throttle"]})
+    return cdp
+
+
+async def apply_network_profile_to_context(
+    context: BrowserContext,
+    name: str
+) -> List[CDPSession]:
+    """
+    Throttle every page currently open in a context
+
+    Each page is throttled before this returns, so navigations started
+    afterwards are always throttled. Pages opened later are not: create
+    them with ``stub_create_page(context, network_profile=name)``, which
+    throttles the page before handing it out.
+
+    Args:
+        context: BrowserContext instance
+        name: Profile name from ``NETWORK_PROFILES``
+
+    Returns: List of CDP sessions, one per page
+    """
+    sessions: List[CDPSession] = []
+    if resolve_network_profile(name) is None:
+        return sessions
+    for page in context.pages:
+        sessions.append(await apply_network_profile(page, name))
+    return sessions
+
+
+async def clear_network_profile(cdp: Optional[CDPSession]) -> None:
+    """
+    Remove network and CPU throttling from a page
+
+    Args:
+        cdp: CDP session returned by ``apply_network_profile``
+    """
+    if cdp is None:
+        return
+    await cdp.send("Network.emulateNetworkConditions",
+                   {"offline": False, "latency": 0,
+                    "downloadThroughput": -1, "uploadThroughput": -1})
+    await cdp.send("Emulation.setCPUThrottlingRate", {"rate": 1})
+    await cdp.detach()
+
+
+async def run_profile_matrix(
+    tc_ids: Sequence[str] = ("TC008", "TC017", "TC011"),
+    profiles: Optional[Sequence[str]] = None,
+    base_url: str = "http://localhost:3000",
+    headless: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Run the plan steps of TCs under every network profile (and unthrottled)
+
+    One browser serves every run; each TC and profile gets a fresh context
+    whose page is throttled before its first navigation. Slowdown compares
+    the summed step time with the unthrottled run, so browser start-up is
+    not part of it.
+
+    Args:
+        tc_ids: TC ids from the test plan
+        profiles: Profile names (default: "none" plus every profile)
+        base_url: Base URL of the app
+        headless: Run browser in headless mode
+
+    Returns: One result row per TC and profile, with slowdown vs. "none"
+    """
+    from test_plan import load_plan, run_plan_tc
+    from test_stubs import (stub_cleanup, stub_create_page, stub_launch_browser,
+                            stub_playwright_start)
+
+    profiles = list(profiles or ["none", *NETWORK_PROFILES])
+    plan = {tc["id"]: tc for tc in load_plan()}
+    rows = []
+    pw = await stub_playwright_start()
+    browser = await stub_launch_browser(pw, headless=headless)
+    try:
+        for tc_id in tc_ids:
+            baseline = None
+            for name in profiles:
+                context = await browser.new_context()
+                try:
+                    page = await stub_create_page(context, network_profile=name)
+                    result = await run_plan_tc(plan[tc_id], page, base_url=base_url)
+                finally:
+                    await stub_cleanup(context)
+                timed = [step for step in result["steps"] if "duration" in step]
+                step_seconds = round(sum(step["duration"] for step in timed), 3)
+                if name == "none":
+                    baseline = step_seconds
+                slowest = max(timed, key=lambda step: step["duration"], default=None)
+                row = {
+                    "tc_id": tc_id,
+                    "profile": name,
+                    "passed": result["passed"],
+                    "step_seconds": step_seconds,
+                    "slowdown": round(step_seconds / baseline, 2) if baseline else None,
+                    "slowest_step": slowest and {"description": slowest["description"],
+                                                 "seconds": slowest["duration"]},
+                }
+                rows.append(row)
+                print(json.dumps(row))
+    finally:
+        await stub_cleanup(browser=browser, pw=pw)
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the TC set under each network profile"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--tcs", nargs="+", default=["TC008", "TC017", "TC011"])
+    parser.add_argument("--profiles", nargs="+", default=None,
+                        choices=["none", *NETWORK_PROFILES])
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+    asyncio.run(run_profile_matrix(args.tcs, args.profiles, args.base_url,
+                                   headless=not args.headed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+Test Notifications Module
+Contains the realtime notification latency benchmark for TC015
+
+Writes order and payment notifications straight into the local Supabase
+Postgres and times how long each takes to appear in signed-in customer and
+vendor pages, for a growing number of subscribed pages:
+
+    python test_notifications.py --subscribers 1 2 4 8 --events 100 --rate 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from test_mocks import TEST_CREDENTIALS, mock_notification_data
+from test_orchestrator import Actor, MultiActorOrchestrator
+from test_postgres import connect, explicit_dsn
+from test_stubs import stub_cleanup, stub_launch_browser, stub_playwright_start
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser
+
+
+SUBSCRIBER_COUNTS = (1, 2, 4, 8)
+
+SUBSCRIBER_CREDENTIALS = {role: TEST_CREDENTIALS[role] for role in ("customer", "vendor")}
+
+# Notification titles carry "bench:<event id>" so the page can spot them in
+# whatever markup the notification list or toast uses
+_BINDING_NAME = "__shophubNotificationSeen"
+_OBSERVER_SCRIPT = """
+(() => {
+  const seen = new Set();
+  const pattern = /bench:([A-Za-z0-9_-]+)/g;
+  const scan = (text) => {
+    if (!text || text.indexOf('bench:') === -1) return;
+    for (const match of text.matchAll(pattern)) {
+      if (seen.has(match[1])) continue;
+      seen.add(match[1]);
+      window.%(binding)s(match[1], Date.now());
+    }
+  };
+  const start = () => {
+    new MutationObserver((mutations) => {
+      for (const mutation of mutations) {
+        if (mutation.type === 'characterData') scan(mutation.target.data);
+        for (const node of mutation.addedNodes) scan(node.textContent);
+      }
+    }).observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+  };
+  if (document.documentElement) start();
+  else document.addEventListener('DOMContentLoaded', start);
+})();
+""" % {"binding": _BINDING_NAME}
+
+
+def lookup_user_ids(conn: Any, emails: Sequence[str]) -> Dict[str, str]:
+    """
+    Resolve account emails to profile ids
+
+    Args:
+        conn: psycopg Connection
+        emails: Account emails
+
+    Returns: Dictionary of email to profile id
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT email, id FROM profiles WHERE email = ANY(%s)", (list(emails),))
+        found = dict(cur.fetchall())
+    missing = set(emails) - set(found)
+    if missing:
+        raise LookupError(f"No profile for {', '.join(sorted(missing))}; seed the test accounts first")
+    return found
+
+
+def build_events(count: int, user_ids: Sequence[str], run_id: str) -> List[List[Dict[str, Any]]]:
+    """
+    Build ``count`` events, each notifying every user
+
+    Events alternate between order and payment updates. Every notification
+    row of an event carries the same ``bench:<event id>`` marker.
+
+    Args:
+        count: Number of events
+        user_ids: Profile ids to notify
+        run_id: Prefix keeping rows of this run apart
+
+    Returns: One list of notification rows per event
+    """
+    events = []
+    for seq in range(count):
+        event_id = f"{run_id}-{seq}"
+        kind = "order_update" if seq % 2 == 0 else "payment_update"
+        rows = []
+        for user_id in user_ids:
+            row = mock_notification_data(f"bench_{event_id}_{user_id}", user_id, kind)
+            row["title"] = f"{kind.replace('_', ' ').capitalize()} bench:{event_id}"
+            rows.append(row)
+        events.append(rows)
+    return events
+
+
+def publish_events(
+    conn: Any,
+    events: Sequence[Sequence[Dict[str, Any]]],
+    rate: float
+) -> Dict[str, float]:
+    """
+    Insert each event in its own transaction at a steady rate
+
+    Args:
+        conn: psycopg Connection
+        events: Rows from ``build_events``
+        rate: Events per second
+
+    Returns: Dictionary of event id to commit time (epoch milliseconds)
+    """
+    sent_at = {}
+    interval = 1 / rate if rate > 0 else 0
+    next_at = time.monotonic()
+    with conn.cursor() as cur:
+        for rows in events:
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_at += interval
+            for row in rows:
+                cur.execute(
+                    "INSERT INTO notifications (id, user_id, type, title, message) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    (row["id"], row["user_id"], row["type"], row["title"], row["message"]),
+                )
+            conn.commit()
+            event_id = rows[0]["title"].rsplit("bench:", 1)[1]
+            sent_at[event_id] = time.time() * 1000
+    return sent_at
+
+
+def _percentile(samples: List[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    return round(samples[int(fraction * (len(samples) - 1))], 1)
+
+
+def summarize_deliveries(
+    sent_at: Dict[str, float],
+    received: Dict[str, List[Tuple[str, float]]]
+) -> Dict[str, Any]:
+    """
+    Compute latency percentiles, drops and ordering violations
+
+    An ordering violation is an event shown on a page after a later event
+    was already shown there.
+
+    Args:
+        sent_at: Event id to commit time (epoch milliseconds)
+        received: Subscriber name to (event id, seen time) in arrival order
+
+    Returns: Dictionary with latency percentiles in milliseconds, expected,
+        delivered and dropped counts and ordering violations
+    """
+    order = {event_id: index for index, event_id in enumerate(sent_at)}
+    latencies = []
+    violations = 0
+    delivered = 0
+    for arrivals in received.values():
+        highest = -1
+        for event_id, seen_at in arrivals:
+            if event_id not in order:
+                continue
+            delivered += 1
+            latencies.append(max(0.0, seen_at - sent_at[event_id]))
+            if order[event_id] < highest:
+                violations += 1
+            highest = max(highest, order[event_id])
+    latencies.sort()
+    expected = len(sent_at) * len(received)
+    return {
+        "expected": expected,
+        "delivered": delivered,
+        "dropped": expected - delivered,
+        "ordering_violations": violations,
+        "latency_p50_ms": _percentile(latencies, 0.5),
+        "latency_p95_ms": _percentile(latencies, 0.95),
+        "latency_p99_ms": _percentile(latencies, 0.99),
+        "latency_max_ms": round(latencies[-1], 1) if latencies else None,
+    }
+
+
+async def _subscribe(actor: Actor, url: str, arrivals: List[Tuple[str, float]]) -> None:
+    await actor.page.expose_binding(
+        _BINDING_NAME, lambda source, event_id, seen_at: arrivals.append((event_id, seen_at))
+    )
+    await actor.page.add_init_script(_OBSERVER_SCRIPT)
+    credentials = SUBSCRIBER_CREDENTIALS[actor.role]
+    await actor.sign_in(credentials["email"], credentials["password"])
+    await actor.page.goto(url, wait_until="domcontentloaded")
+    await actor.page.wait_for_load_state("networkidle")
+
+
+async def measure_delivery(
+    browser: Browser,
+    subscribers: int,
+    events: int = 100,
+    rate: float = 20.0,
+    dsn: Optional[str] = None,
+    base_url: str = "http://localhost:3000",
+    notifications_path: str = "/notifications",
+    grace: float = 10.0
+) -> Dict[str, Any]:
+    """
+    Publish events and time their arrival on ``subscribers`` pages
+
+    Subscribers alternate between the customer and the vendor account, each
+    in its own context. Events still missing ``grace`` seconds after the
+    last commit count as dropped.
+
+    Args:
+        browser: Browser instance
+        subscribers: Number of subscribed pages
+        events: Number of events to publish
+        rate: Events per second
+        dsn: Postgres connection string (required, or ``SHOPHUB_DATABASE_URL``)
+        base_url: Base URL of the app
+        notifications_path: Page that lists notifications in real time
+        grace: Seconds to wait for late deliveries
+
+    Returns: Summary row for this subscriber count
+    """
+    run_id = uuid.uuid4().hex[:8]
+    orchestrator = MultiActorOrchestrator(browser, base_url=base_url)
+    received: Dict[str, List[Tuple[str, float]]] = {}
+    try:
+        for index in range(subscribers):
+            role = "customer" if index % 2 == 0 else "vendor"
+            await orchestrator.add_actor(f"{role}_{index}", role=role, url="")
+            received[f"{role}_{index}"] = []
+        await asyncio.gather(*(
+            _subscribe(actor, base_url + notifications_path, received[name])
+            for name, actor in orchestrator.actors.items()
+        ))
+
+        with connect(explicit_dsn(dsn)) as conn:
+            emails = [SUBSCRIBER_CREDENTIALS[role]["email"] for role in ("customer", "vendor")]
+            user_ids = lookup_user_ids(conn, emails)
+            rows = build_events(events, list(user_ids.values()), run_id)
+            try:
+                sent_at = await asyncio.to_thread(publish_events, conn, rows, rate)
+
+                deadline = time.monotonic() + grace
+                while time.monotonic() < deadline:
+                    if all(len(arrivals) >= events for arrivals in received.values()):
+                        break
+                    await asyncio.sleep(0.1)
+            finally:
+                conn.rollback()  # a failed insert leaves the transaction aborted
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM notifications WHERE id LIKE %s",
+                                (f"bench_{run_id}-%",))
+                conn.commit()
+    finally:
+        await orchestrator.close()
+    return dict(summarize_deliveries(sent_at, received), subscribers=subscribers,
+                events=events, rate=rate)
+
+
+async def run_benchmark(
+    subscriber_counts: Sequence[int] = SUBSCRIBER_COUNTS,
+    events: int = 100,
+    rate: float = 20.0,
+    dsn: Optional[str] = None,
+    base_url: str = "http://localhost:3000",
+    notifications_path: str = "/notifications",
+    headless: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Measure delivery at each subscriber count in one browser
+
+    Args:
+        subscriber_counts: Numbers of subscribed pages to test
+        events: Events published per subscriber count
+        rate: Events per second
+        dsn: Postgres connection string (required, or ``SHOPHUB_DATABASE_URL``)
+        base_url: Base URL of the app
+        notifications_path: Page that lists notifications in real time
+        headless: Run browser in headless mode
+
+    Returns: One summary row per subscriber count
+    """
+    dsn = explicit_dsn(dsn)  # fail before opening any browser
+    pw = await stub_playwright_start()
+    browser = await stub_launch_browser(pw, headless=headless)
+    rows = []
+    try:
+        for subscribers in subscriber_counts:
+            row = await measure_delivery(browser, subscribers, events=events, rate=rate,
+                                         dsn=dsn, base_url=base_url,
+                                         notifications_path=notifications_path)
+            rows.append(row)
+            print(json.dumps(row))
+    finally:
+        await stub_cleanup(browser=browser, pw=pw)
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the notification benchmark and fail on dropped or reordered events"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--subscribers", type=int, nargs="+", default=list(SUBSCRIBER_COUNTS))
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=20.0, help="Events per second")
+    parser.add_argument("--dsn", default=None,
+                        help="Postgres connection string (or set SHOPHUB_DATABASE_URL)")
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--path", default="/notifications", help="Notifications page path")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+
+    rows = asyncio.run(run_benchmark(args.subscribers, events=args.events, rate=args.rate,
+                                     dsn=args.dsn, base_url=args.base_url,
+                                     notifications_path=args.path, headless=not args.headed))
+    return 0 if all(not row["dropped"] and not row["ordering_violations"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""
+Test Orchestrator Module
+Contains the multi-actor orchestrator that runs customer, vendor and admin
+flows at the same time in one browser
+
+Each actor gets its own context (its own session) or a tab in another
+actor's context; flows run concurrently and line up at named checkpoints:
+
+    orchestrator = MultiActorOrchestrator(browser)
+    await orchestrator.add_actor("customer")
+    await orchestrator.add_actor("vendor")
+
+    async def customer(actor):
+        ...  # place the order
+        await actor.checkpoint("order_placed")
+
+    async def vendor(actor):
+        await actor.checkpoint("order_placed")
+        ...  # check the sub-order
+
+    await orchestrator.run(customer=customer, vendor=vendor)
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+
+from pages import ShopHubPages
+from test_stubs import stub_cleanup, stub_create_context, stub_create_page
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page
+
+
+class BarrierAbortedError(RuntimeError):
+    """Raised in actors waiting at a checkpoint another actor will never reach"""
+
+
+class CheckpointBarrier:
+    """Reusable barrier for a fixed number of actors
+
+    Works like ``asyncio.Barrier`` (Python 3.11+) on older interpreters,
+    with ``leave`` so actors that finish early stop counting as parties.
+    ``abort`` wakes every waiter with ``BarrierAbortedError`` so a failing
+    actor does not leave the others hanging.
+    """
+
+    def __init__(self, parties: int):
+        self.parties = parties
+        self._condition = asyncio.Condition()
+        self._arrived = 0
+        self._generation = 0
+        self._aborted = False
+
+    async def wait(self, timeout: Optional[float] = None) -> int:
+        """
+        Wait until every party has arrived
+
+        Args:
+            timeout: Seconds to wait before aborting the barrier
+
+        Returns: Arrival index (0 for the first actor to arrive)
+        """
+        async with self._condition:
+            if self._aborted:
+                raise BarrierAbortedError("checkpoint aborted")
+            index = self._arrived
+            self._arrived += 1
+            if self._arrived == self.parties:
+                self._arrived = 0
+                self._generation += 1
+                self._condition.notify_all()
+                return index
+
+            generation = self._generation
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(
+                        lambda: self._generation != generation or self._aborted
+                    ),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                self._abort()
+                raise BarrierAbortedError(f"checkpoint timed out after {timeout}s") from None
+            if self._generation == generation:
+                raise BarrierAbortedError("checkpoint aborted")
+            return index
+
+    async def leave(self) -> None:
+        """Remove one party for good (an actor that finished its flow)"""
+        async with self._condition:
+            self.parties -= 1
+            if self._arrived and self._arrived >= self.parties:
+                self._arrived = 0
+                self._generation += 1
+                self._condition.notify_all()
+
+    def _abort(self) -> None:
+        self._aborted = True
+        self._condition.notify_all()
+
+    async def abort(self) -> None:
+        """Release every waiter with ``BarrierAbortedError``"""
+        async with self._condition:
+            self._abort()
+
+
+class Actor:
+    """One user taking part in a multi-actor flow
+
+    Holds the actor's context, its main page and page objects bound to it.
+    ``tab`` opens further pages in the same session (multi-tab flows such as
+    cart persistence), ``mark`` writes to the shared timeline and
+    ``checkpoint`` waits for the other actors.
+    """
+
+    def __init__(
+        self,
+        orchestrator: "MultiActorOrchestrator",
+        name: str,
+        role: str,
+        context: BrowserContext,
+        page: Page
+    ):
+        self.orchestrator = orchestrator
+        self.name = name
+        self.role = role
+        self.context = context
+        self.page = page
+        self.pages = ShopHubPages(page, orchestrator.base_url)
+
+    async def tab(self) -> Page:
+        """
+        Open another page in this actor's context
+
+        Returns: Page instance sharing cookies and storage with ``page``
+        """
+        return await stub_create_page(self.context)
+
+    def mark(self, event: str, **details: Any) -> float:
+        """
+        Record an event on the shared timeline
+
+        Args:
+            event: Event name
+            **details: Extra fields stored with the event
+
+        Returns: Seconds since the orchestrator started
+        """
+        return self.orchestrator.mark(self.name, event, **details)
+
+    async def checkpoint(self, name: str, timeout: Optional[float] = None) -> None:
+        """
+        Wait at a named checkpoint until every actor has reached it
+
+        Args:
+            name: Checkpoint name shared by all actors
+            timeout: Seconds to wait (default: the orchestrator timeout)
+        """
+        await self.orchestrator.checkpoint(self.name, name, timeout)
+
+    async def sign_in(self, email: str, password: str, timeout: int = 5000) -> None:
+        """
+        Sign this actor in through the sign in page
+
+        Args:
+            email: Account email
+            password: Account password
+            timeout: Wait timeout in milliseconds
+        """
+        await self.pages.sign_in.open()
+        await self.pages.sign_in.sign_in(email, password, timeout=timeout)
+        self.mark("signed_in")
+
+
+ActorFlow = Callable[[Actor], Awaitable[Any]]
+
+
+class MultiActorOrchestrator:
+    """Runs several actors' flows concurrently in one browser
+
+    Actors get separate contexts by default, so a customer, a vendor and an
+    admin are logged in at the same time without sharing cookies. All actors
+    share one clock: ``timeline`` lists every ``mark`` and checkpoint arrival
+    in seconds since the orchestrator was created.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        base_url: str = "http://localhost:3000",
+        default_timeout: int = 5000,
+        checkpoint_timeout: float = 30.0,
+        recycler: Optional[Any] = None
+    ):
+        self.browser = browser
+        self.base_url = base_url
+        self.default_timeout = default_timeout
+        self.checkpoint_timeout = checkpoint_timeout
+        self.recycler = recycler
+        self.actors: Dict[str, Actor] = {}
+        self.timeline: List[Dict[str, Any]] = []
+        self._started = time.monotonic()
+        self._barriers: Dict[str, CheckpointBarrier] = {}
+        self._owned_contexts: List[BrowserContext] = []
+        self._running: List[str] = []
+        self._failed: Optional[str] = None
+
+    def now(self) -> float:
+        """Seconds since the orchestrator was created"""
+        return time.monotonic() - self._started
+
+    async def add_actor(
+        self,
+        name: str,
+        role: Optional[str] = None,
+        share_context_with: Optional[str] = None,
+        url: Optional[str] = None
+    ) -> Actor:
+        """
+        Create an actor with its own page
+
+        Args:
+            name: Unique actor name (used in flows, checkpoints and timeline)
+            role: Role such as "customer", "vendor" or "admin" (default: name)
+            share_context_with: Name of an existing actor whose context (and
+                session) this actor should share, as another tab
+            url: URL to open first (default: base URL; "" opens nothing)
+
+        Returns: Actor instance
+        """
+        if name in self.actors:
+            raise ValueError(f"Actor {name!r} already exists")
+        if share_context_with is not None:
+            context = self.actors[share_context_with].context
+        elif self.recycler is not None:
+            context = await self.recycler.acquire()
+            self._owned_contexts.append(context)
+        else:
+            context = await stub_create_context(self.browser, default_timeout=self.default_timeout)
+            self._owned_contexts.append(context)
+        page = await stub_create_page(context)
+        actor = Actor(self, name, role or name, context, page)
+        self.actors[name] = actor
+        target = self.base_url if url is None else url
+        if target:
+            await page.goto(target, wait_until="domcontentloaded")
+        return actor
+
+    def mark(self, actor: str, event: str, **details: Any) -> float:
+        """
+        Record an event on the shared timeline
+
+        Args:
+            actor: Actor name
+            event: Event name
+            **details: Extra fields stored with the event
+
+        Returns: Seconds since the orchestrator started
+        """
+        at = round(self.now(), 4)
+        self.timeline.append(dict(details, at=at, actor=actor, event=event))
+        return at
+
+    async def checkpoint(self, actor: str, name: str, timeout: Optional[float] = None) -> None:
+        """
+        Wait at a named checkpoint until every running actor has reached it
+
+        Args:
+            actor: Name of the arriving actor
+            name: Checkpoint name
+            timeout: Seconds to wait (default: ``checkpoint_timeout``)
+
+        Raises:
+            BarrierAbortedError: Another actor has failed during this run
+        """
+        if self._failed is not None:
+            raise BarrierAbortedError(f"Checkpoint {name!r} aborted: actor "
+                                      f"{self._failed!r} failed")
+        barrier = self._barriers.get(name)
+        if barrier is None:
+            parties = len(self._running) or len(self.actors)
+            barrier = self._barriers[name] = CheckpointBarrier(parties)
+        self.mark(actor, f"arrive:{name}")
+        await barrier.wait(self.checkpoint_timeout if timeout is None else timeout)
+        self.mark(actor, f"release:{name}")
+
+    async def _run_actor(self, name: str, flow: ActorFlow) -> Any:
+        actor = self.actors[name]
+        actor.mark("start")
+        try:
+            result = await flow(actor)
+        except BaseException:
+            actor.mark("failed")
+            self._running.remove(name)
+            if self._failed is None:
+                self._failed = name
+            for barrier in self._barriers.values():
+                await barrier.abort()
+            raise
+        actor.mark("done")
+        self._running.remove(name)
+        for barrier in self._barriers.values():
+            await barrier.leave()
+        return result
+
+    async def run(self, **flows: ActorFlow) -> Dict[str, Any]:
+        """
+        Run one flow per actor concurrently
+
+        If a flow fails, every pending checkpoint is aborted and every later
+        checkpoint raises at once, so the other actors stop instead of
+        waiting for the timeout; the first real error (not a
+        ``BarrierAbortedError``) is raised.
+
+        Args:
+            **flows: Actor name mapped to an async callable taking the Actor
+
+        Returns: Actor name mapped to the flow's return value
+        """
+        missing = set(flows) - set(self.actors)
+        if missing:
+            raise KeyError(f"No actor for flows: {', '.join(sorted(missing))}")
+        names = list(flows)
+        self._running = list(names)
+        self._failed = None
+        try:
+            results = await asyncio.gather(
+                *(self._run_actor(name, flows[name]) for name in names),
+                return_exceptions=True,
+            )
+        finally:
+            self._running = []
+            self._barriers.clear()
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            real = [e for e in errors if not isinstance(e, BarrierAbortedError)]
+            raise (real or errors)[0]
+        return dict(zip(names, results))
+
+    def durations(self) -> Dict[str, float]:
+        """
+        Seconds from "start" to "done" for each actor of the last run
+
+        Returns: Actor name mapped to duration
+        """
+        starts, durations = {}, {}
+        for entry in self.timeline:
+            if entry["event"] == "start":
+                starts[entry["actor"]] = entry["at"]
+            elif entry["event"] == "done" and entry["actor"] in starts:
+                durations[entry["actor"]] = round(entry["at"] - starts[entry["actor"]], 4)
+        return durations
+
+    async def close(self) -> None:
+        """Close (or hand back to the recycler) every context the actors own"""
+        for context in self._owned_contexts:
+            try:
+                await stub_cleanup(context, recycler=self.recycler)
+            except Exception:
+                pass
+        self._owned_contexts.clear()
+        self.actors.clear()
@@ -0,0 +1,365 @@
+"""
+Test Payouts Module
+Contains the reference engine for commission and vendor payout figures
+
+Amounts are handled as integer cents and commission rates as basis points,
+so every figure is exact and rounds like Postgres ``numeric`` (half away
+from zero). Batches are vectorized with NumPy when it is installed:
+
+    python test_payouts.py --payments 1000000 --vendors 5000
+    python test_payouts.py --validate-db
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from test_postgres import connect
+
+
+CENT = Decimal("0.01")
+
+# Payments counted in a settlement and their sign
+SETTLED_STATUSES = {"completed": 1, "refunded": -1}
+
+SUB_ORDER_QUERY = """
+SELECT s.id, s.vendor_id, s.subtotal, s.commission, v.commission_rate
+FROM sub_orders s
+JOIN vendors v ON v.id = s.vendor_id
+"""
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def to_cents(value: Any) -> int:
+    """
+    Convert a money amount to integer cents without float rounding
+
+    Args:
+        value: Amount as Decimal, str, int or float
+
+    Returns: Amount in cents
+    """
+    return int((Decimal(str(value)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def rate_to_basis_points(rate: Any) -> int:
+    """
+    Convert a commission rate in percent (``vendors.commission_rate``) to
+    basis points
+
+    Args:
+        rate: Rate in percent, e.g. 12.5
+
+    Returns: Rate in hundredths of a percent, e.g. 1250
+    """
+    return to_cents(rate)
+
+
+def reference_commission(amount: Any, rate: Any) -> Decimal:
+    """
+    Commission of one payment, computed with Decimal
+
+    This is the definition the vectorized engine must match.
+
+    Args:
+        amount: Payment or sub-order amount
+        rate: Commission rate in percent
+
+    Returns: Commission rounded to cents (half away from zero)
+    """
+    return (Decimal(str(amount)) * Decimal(str(rate)) / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def commission_cents(amount_cents: Sequence[int], rate_bp: Sequence[int]) -> Any:
+    """
+    Vectorized commission in cents
+
+    Args:
+        amount_cents: Amounts in cents (negative for refunds)
+        rate_bp: Commission rate in basis points, one per amount
+
+    Returns: NumPy int64 array (or list without NumPy) of commissions in cents
+    """
+    np = _numpy()
+    if np is None:
+        return [(1 if a * r >= 0 else -1) * ((abs(a * r) + 5000) // 10000)
+                for a, r in zip(amount_cents, rate_bp)]
+    product = np.asarray(amount_cents, dtype=np.int64) * np.asarray(rate_bp, dtype=np.int64)
+    return np.sign(product) * ((np.abs(product) + 5000) // 10000)
+
+
+def settle_columns(
+    amount_cents: Sequence[int],
+    vendor_index: Sequence[int],
+    vendor_rate_bp: Sequence[int]
+) -> Dict[str, Any]:
+    """
+    Settle a columnar batch of payments per vendor
+
+    Args:
+        amount_cents: Signed payment amounts in cents
+        vendor_index: Position of each payment's vendor in ``vendor_rate_bp``
+        vendor_rate_bp: Commission rate of each vendor in basis points
+
+    Returns: Dictionary of per-vendor columns in cents: gross, commission,
+        payout (gross minus commission) and payments (count)
+    """
+    vendors = len(vendor_rate_bp)
+    np = _numpy()
+    if np is None:
+        totals = {key: [0] * vendors for key in ("gross", "commission", "payments")}
+        rates = [vendor_rate_bp[v] for v in vendor_index]
+        for amount, vendor, fee in zip(amount_cents, vendor_index,
+                                       commission_cents(amount_cents, rates)):
+            totals["gross"][vendor] += amount
+            totals["commission"][vendor] += fee
+            totals["payments"][vendor] += 1
+        totals["payout"] = [g - c for g, c in zip(totals["gross"], totals["commission"])]
+        return totals
+
+    amounts = np.asarray(amount_cents, dtype=np.int64)
+    index = np.asarray(vendor_index, dtype=np.int64)
+    fees = commission_cents(amounts, np.asarray(vendor_rate_bp, dtype=np.int64)[index])
+    totals = {key: np.zeros(vendors, dtype=np.int64) for key in ("gross", "commission", "payments")}
+    if len(index):
+        # Integer reduceat over vendor-sorted runs keeps the sums exact
+        order = np.argsort(index, kind="stable")
+        sorted_index = index[order]
+        starts = np.flatnonzero(np.r_[True, sorted_index[1:] != sorted_index[:-1]])
+        owners = sorted_index[starts]
+        totals["gross"][owners] = np.add.reduceat(amounts[order], starts)
+        totals["commission"][owners] = np.add.reduceat(fees[order], starts)
+        totals["payments"][owners] = np.diff(np.r_[starts, len(index)])
+    totals["payout"] = totals["gross"] - totals["commission"]
+    return totals
+
+
+def settle_payments(
+    payments: Iterable[Mapping[str, Any]],
+    commission_rates: Mapping[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Settle payments per vendor
+
+    Completed payments add to the vendor's gross, refunded ones subtract
+    (with their commission); other statuses are ignored.
+
+    Args:
+        payments: Dictionaries with amount, vendor_id and status
+            (``mock_payment_data`` rows plus a vendor_id)
+        commission_rates: Vendor id to commission rate in percent
+
+    Returns: Vendor id to gross, commission and payout (Decimal) and the
+        number of settled payments
+    """
+    vendor_ids = list(commission_rates)
+    position = {vendor_id: i for i, vendor_id in enumerate(vendor_ids)}
+    amounts, index = [], []
+    for payment in payments:
+        sign = SETTLED_STATUSES.get(payment.get("status", "completed"))
+        if sign is None:
+            continue
+        amounts.append(sign * to_cents(payment["amount"]))
+        index.append(position[payment["vendor_id"]])
+    totals = settle_columns(amounts, index,
+                            [rate_to_basis_points(commission_rates[v]) for v in vendor_ids])
+    return {
+        vendor_id: {
+            "gross": Decimal(int(totals["gross"][i])) / 100,
+            "commission": Decimal(int(totals["commission"][i])) / 100,
+            "payout": Decimal(int(totals["payout"][i])) / 100,
+            "payments": int(totals["payments"][i]),
+        }
+        for i, vendor_id in enumerate(vendor_ids)
+    }
+
+
+def validate_payouts(
+    reported: Mapping[str, Mapping[str, Any]],
+    expected: Mapping[str, Mapping[str, Any]],
+    fields: Sequence[str] = ("gross", "commission", "payout")
+) -> List[Dict[str, Any]]:
+    """
+    Compare the app's payout figures with the reference settlement
+
+    Args:
+        reported: Vendor id to figures shown by the app (numbers or strings)
+        expected: Output of ``settle_payments``
+        fields: Figures to compare
+
+    Returns: One dictionary per mismatch (empty when everything matches)
+    """
+    mismatches = []
+    for vendor_id, figures in expected.items():
+        shown = reported.get(vendor_id)
+        if shown is None:
+            mismatches.append({"vendor_id": vendor_id, "field": None, "expected": None,
+                               "reported": "missing"})
+            continue
+        for field in fields:
+            if field in shown and to_cents(shown[field]) != to_cents(figures[field]):
+                mismatches.append({"vendor_id": vendor_id, "field": field,
+                                   "expected": str(figures[field]), "reported": str(shown[field])})
+    return mismatches
+
+
+def validate_sub_orders(
+    conn: Any,
+    batch_size: int = 50000,
+    max_mismatches: int = 100
+) -> Dict[str, Any]:
+    """
+    Check every stored sub-order commission against ``vendors.commission_rate``
+
+    Rows are streamed with a server-side cursor and checked a batch at a
+    time.
+
+    Args:
+        conn: psycopg Connection
+        batch_size: Rows fetched and checked per batch
+        max_mismatches: Mismatching rows to return in full
+
+    Returns: Dictionary with rows checked, mismatch count and sample rows
+    """
+    checked = bad = 0
+    samples = []
+    with conn.cursor(name="shophub_sub_orders") as cur:
+        cur.execute(SUB_ORDER_QUERY)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            fees = commission_cents([to_cents(row[2]) for row in rows],
+                                    [rate_to_basis_points(row[4]) for row in rows])
+            for row, fee in zip(rows, fees):
+                if to_cents(row[3]) != int(fee):
+                    bad += 1
+                    if len(samples) < max_mismatches:
+                        samples.append({"sub_order_id": row[0], "vendor_id": row[1],
+                                        "subtotal": str(row[2]), "commission": str(row[3]),
+                                        "expected": str(Decimal(int(fee)) / 100)})
+            checked += len(rows)
+    conn.commit()
+    return {"checked": checked, "mismatches": bad, "samples": samples}
+
+
+def generate_payment_columns(
+    count: int,
+    vendor_count: int,
+    seed: int = 0,
+    refund_rate: float = 0.02
+) -> Dict[str, Any]:
+    """
+    Generate a columnar batch of synthetic payments
+
+    Args:
+        count: Number of payments
+        vendor_count: Number of vendors
+        seed: Random seed
+        refund_rate: Fraction of refunded payments
+
+    Returns: Dictionary with amount_cents, vendor_index and vendor_rate_bp
+    """
+    rates = [500, 800, 1000, 1250, 1500]
+    np = _numpy()
+    if np is None:
+        rng = random.Random(seed)
+        return {
+            "amount_cents": [rng.randint(500, 100000) * (-1 if rng.random() < refund_rate else 1)
+                             for _ in range(count)],
+            "vendor_index": [rng.randrange(vendor_count) for _ in range(count)],
+            "vendor_rate_bp": [rng.choice(rates) for _ in range(vendor_count)],
+        }
+    rng = np.random.default_rng(seed)
+    signs = np.where(rng.random(count) < refund_rate, -1, 1)
+    return {
+        "amount_cents": rng.integers(500, 100001, count, dtype=np.int64) * signs,
+        "vendor_index": rng.integers(0, vendor_count, count, dtype=np.int64),
+        "vendor_rate_bp": rng.choice(np.array(rates, dtype=np.int64), vendor_count),
+    }
+
+
+def benchmark_settlement(
+    payments: int = 1_000_000,
+    vendors: int = 5000,
+    seed: int = 0,
+    reference_sample: int = 20000
+) -> Dict[str, Any]:
+    """
+    Time the vectorized settlement and check it against Decimal
+
+    The Decimal reference runs on a sample only; its rate is extrapolated.
+
+    Args:
+        payments: Number of payments to settle
+        vendors: Number of vendors
+        seed: Random seed
+        reference_sample: Payments settled one at a time with Decimal
+
+    Returns: Dictionary with timings, throughput and sample mismatches
+    """
+    columns = generate_payment_columns(payments, vendors, seed=seed)
+    start = time.perf_counter()
+    totals = settle_columns(columns["amount_cents"], columns["vendor_index"],
+                            columns["vendor_rate_bp"])
+    engine_seconds = time.perf_counter() - start
+
+    sample = min(reference_sample, payments)
+    amounts = [int(a) for a in columns["amount_cents"][:sample]]
+    rates = [int(columns["vendor_rate_bp"][int(v)]) for v in columns["vendor_index"][:sample]]
+    start = time.perf_counter()
+    reference = [reference_commission(Decimal(a) / 100, Decimal(r) / 100)
+                 for a, r in zip(amounts, rates)]
+    reference_seconds = time.perf_counter() - start
+    fees = commission_cents(amounts, rates)
+    mismatches = sum(1 for ref, fee in zip(reference, fees) if to_cents(ref) != int(fee))
+
+    reference_rate = sample / reference_seconds if reference_seconds else None
+    return {
+        "payments": payments,
+        "vendors": vendors,
+        "numpy": _numpy() is not None,
+        "engine_seconds": round(engine_seconds, 3),
+        "payments_per_second": round(payments / engine_seconds) if engine_seconds else None,
+        "decimal_payments_per_second": round(reference_rate) if reference_rate else None,
+        "speedup": round(payments / engine_seconds / reference_rate, 1)
+        if engine_seconds and reference_rate else None,
+        "sample_mismatches": mismatches,
+        "total_commission": str(Decimal(int(sum(int(c) for c in totals["commission"]))) / 100),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Benchmark settlement, or validate the stored sub-order commissions"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--payments", type=int, default=1_000_000)
+    parser.add_argument("--vendors", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--validate-db", action="store_true",
+                        help="Check sub_orders.commission in the local Postgres instead")
+    parser.add_argument("--dsn", default=None, help="Postgres connection string")
+    args = parser.parse_args(argv)
+
+    if args.validate_db:
+        with connect(args.dsn) as conn:
+            result = validate_sub_orders(conn)
+        print(json.dumps(result, indent=2))
+        return 1 if result["mismatches"] else 0
+
+    result = benchmark_settlement(args.payments, args.vendors, seed=args.seed)
+    print(json.dumps(result))
+    return 1 if result["sample_mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Unit tests for test_payouts.py
+The integer-cent engine must match the Decimal reference, with and without NumPy
+"""
+import random
+from decimal import Decimal
+
+import pytest
+
+import test_payouts
+from test_payouts import (
+    commission_cents,
+    rate_to_basis_points,
+    reference_commission,
+    settle_columns,
+    to_cents,
+)
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    """Run a test on the pure-Python path and, when installed, the NumPy path"""
+    if request.param == "python":
+        monkeypatch.setattr(test_payouts, "_numpy", lambda: None)
+    else:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+def _as_list(values):
+    return [int(value) for value in values]
+
+
+@pytest.mark.parametrize("amount, rate", [
+    ("0.01", "12.5"), ("0.04", "12.5"), ("0.05", "10"), ("19.99", "7.25"),
+    ("100.00", "0"), ("-0.05", "10"), ("-19.99", "7.25"), ("123456.78", "99.99"),
+])
+def test_commission_matches_reference_on_edges(backend, amount, rate):
+    """Half-cent ties round away from zero for payments and refunds alike"""
+    fee = commission_cents([to_cents(amount)], [rate_to_basis_points(rate)])
+    assert _as_list(fee) == [to_cents(reference_commission(amount, rate))]
+
+
+def test_commission_matches_reference_on_random_amounts(backend):
+    rng = random.Random(1234)
+    amounts = [Decimal(rng.randint(-50000, 500000)) / 100 for _ in range(2000)]
+    rates = [Decimal(rng.randint(0, 3000)) / 100 for _ in amounts]
+    fees = commission_cents([to_cents(a) for a in amounts],
+                            [rate_to_basis_points(r) for r in rates])
+    assert _as_list(fees) == [to_cents(reference_commission(a, r)) for a, r in zip(amounts, rates)]
+
+
+def test_settle_columns_matches_reference_per_vendor(backend):
+    rng = random.Random(99)
+    rates = [Decimal(rng.randint(500, 2000)) / 100 for _ in range(7)]
+    payments = [(Decimal(rng.randint(-5000, 90000)) / 100, rng.randrange(5)) for _ in range(500)]
+    totals = settle_columns([to_cents(amount) for amount, _ in payments],
+                            [vendor for _, vendor in payments],
+                            [rate_to_basis_points(rate) for rate in rates])
+
+    for vendor, rate in enumerate(rates):
+        amounts = [amount for amount, owner in payments if owner == vendor]
+        gross = to_cents(sum(amounts, Decimal(0)))
+        commission = sum(to_cents(reference_commission(amount, rate)) for amount in amounts)
+        assert int(totals["gross"][vendor]) == gross
+        assert int(totals["commission"][vendor]) == commission
+        assert int(totals["payout"][vendor]) == gross - commission
+        assert int(totals["payments"][vendor]) == len(amounts)
+
+
+def test_settle_columns_without_payments(backend):
+    totals = settle_columns([], [], [1000, 1500])
+    for column in ("gross", "commission", "payout", "payments"):
+        assert _as_list(totals[column]) == [0, 0]
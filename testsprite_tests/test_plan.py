@@ -0,0 +1,553 @@
+"""
+Test Plan Module
+Contains the interpreter that runs TCs straight from
+testsprite_frontend_test_plan.json
+
+Each plan step is matched by its description against a registry of step
+handlers that call the stubs and page objects. Resolved handlers are cached
+per description and the plan file is re-read when it changes, so a TC added
+to the plan runs without generated code or a re-import:
+
+    python test_plan.py --tcs TC003 TC008 --workers 4
+    python test_plan.py --coverage
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from typing import (
+    TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Pattern, Sequence, Tuple
+)
+
+from pages import ShopHubPages
+from test_mocks import TEST_CREDENTIALS, mock_product_data, mock_user_data
+from test_network import network_profile_from_env
+from test_runner import TESTS_DIR
+from test_stubs import (
+    stub_cleanup,
+    stub_clear_cookies,
+    stub_click_element,
+    stub_create_context,
+    stub_create_page,
+    stub_fill_input,
+    stub_launch_browser,
+    stub_navigate_to_url,
+    stub_playwright_start,
+    stub_select_option,
+    stub_wait_for_selector,
+)
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page
+
+
+DEFAULT_PLAN_PATH = os.path.join(TESTS_DIR, "testsprite_frontend_test_plan.json")
+
+StepHandler = Callable[..., Awaitable[Any]]
+
+
+class StepContext:
+    """State shared by the steps of one TC
+
+    Holds the page, page objects bound to it, the test accounts and a
+    scratch ``state`` dictionary that steps use to hand values to later
+    steps (the role signed in, the last measured duration, ...).
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        base_url: str = "http://localhost:3000",
+        credentials: Optional[Dict[str, Dict[str, str]]] = None
+    ):
+        self.page = page
+        self.base_url = base_url.rstrip("/")
+        self.pages = ShopHubPages(page, self.base_url)
+        self.credentials = credentials or TEST_CREDENTIALS
+        self.state: Dict[str, Any] = {}
+
+    @property
+    def context(self) -> BrowserContext:
+        return self.page.context
+
+    async def goto(self, path: str) -> None:
+        """
+        Navigate to a path of the app
+
+        Args:
+            path: Path such as "/cart"
+        """
+        await stub_navigate_to_url(self.page, f"{self.base_url}{path}", wait_until="domcontentloaded")
+
+
+class StepRegistry:
+    """Maps plan step descriptions to handlers by regular expression
+
+    Every pattern found in a step description contributes its handler, and
+    named groups of the pattern are passed to it as keyword arguments. Every
+    resolved (kind, description) pair is cached, including misses, and the
+    cache is cleared when a handler is registered.
+    """
+
+    def __init__(self):
+        self._handlers: List[Tuple[Optional[str], Pattern, StepHandler]] = []
+        self._cache: Dict[Tuple[str, str], Optional[List[Tuple[StepHandler, Dict[str, str]]]]] = {}
+
+    def step(self, pattern: str, kind: Optional[str] = None) -> Callable[[StepHandler], StepHandler]:
+        """
+        Decorator registering a step handler
+
+        Args:
+            pattern: Regular expression searched (case-insensitively) in the
+                step description
+            kind: Only match steps of this type ("action" or "assertion")
+
+        Returns: Decorator returning the handler unchanged
+        """
+        def register(handler: StepHandler) -> StepHandler:
+            self._handlers.append((kind, re.compile(pattern, re.IGNORECASE), handler))
+            self._cache.clear()
+            return handler
+        return register
+
+    def resolve(self, kind: str, description: str) -> Optional[List[Tuple[StepHandler, Dict[str, str]]]]:
+        """
+        Find the handlers for a step
+
+        A compound step ("Login as customer and add items to cart") matches
+        several handlers; they run in the order they appear in the text.
+
+        Args:
+            kind: Step type from the plan
+            description: Step description from the plan
+
+        Returns: List of (handler, keyword arguments), or None if unmapped
+        """
+        key = (kind, description)
+        if key in self._cache:
+            return self._cache[key]
+        matches = []
+        for handler_kind, pattern, handler in self._handlers:
+            if handler_kind is not None and handler_kind != kind:
+                continue
+            match = pattern.search(description)
+            if match and all(handler is not other for _, other, _ in matches):
+                params = {name: value for name, value in match.groupdict().items()
+                          if value is not None}
+                matches.append((match.start(), handler, params))
+        resolved = [(handler, params) for _, handler, params in sorted(matches, key=lambda m: m[0])]
+        self._cache[key] = resolved or None
+        return self._cache[key]
+
+    def coverage(self, plan: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Count plan steps with and without a handler
+
+        Args:
+            plan: Loaded test plan
+
+        Returns: Dictionary with mapped/total counts and unmapped descriptions
+        """
+        total = mapped = 0
+        unmapped = []
+        for tc in plan:
+            for step in tc["steps"]:
+                total += 1
+                if self.resolve(step["type"], step["description"]):
+                    mapped += 1
+                else:
+                    unmapped.append(f"{tc['id']}: {step['description']}")
+        return {"steps": total, "mapped": mapped, "unmapped": unmapped}
+
+
+registry = StepRegistry()
+
+_plan_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+def load_plan(path: str = DEFAULT_PLAN_PATH) -> List[Dict[str, Any]]:
+    """
+    Load the test plan, re-reading it only when the file changed
+
+    Args:
+        path: Plan JSON path
+
+    Returns: List of TC dictionaries (id, title, steps, ...)
+    """
+    mtime = os.path.getmtime(path)
+    cached = _plan_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as f:
+            cached = (mtime, json.load(f))
+        _plan_cache[path] = cached
+    return cached[1]
+
+
+# --- Step handlers ---------------------------------------------------------
+
+_PAGE_PATHS = {
+    "registration": "/auth/signup",
+    "login": "/auth/signin",
+    "marketplace": "/marketplace",
+    "order history": "/orders",
+    "checkout": "/checkout",
+    "notification settings": "/notifications",
+    "new product": "/vendor/products/new",
+    "admin dashboard": "/admin",
+    "vendor dashboard": "/vendor/dashboard",
+}
+_ERROR_SELECTOR = "[role='alert'], .text-red-500, .text-red-600"
+
+
+@registry.step(r"navigate to (?:the )?'?(?P<target>registration|login|marketplace|order history"
+               r"|checkout|notification settings|new product|admin dashboard|vendor dashboard)",
+               kind="action")
+async def navigate(ctx: StepContext, target: str) -> None:
+    await ctx.goto(_PAGE_PATHS[target.lower()])
+
+
+@registry.step(r"open a product detail page", kind="action")
+async def open_product_detail(ctx: StepContext) -> None:
+    marketplace = await ctx.pages.marketplace.open()
+    await marketplace.locator("product_cards").first.click()
+    await ctx.page.wait_for_url("**/products/**")
+
+
+@registry.step(r"log ?in as (?:an? )?(?P<role>customer|vendor|admin|user)", kind="action")
+async def sign_in_as(ctx: StepContext, role: str) -> None:
+    role = "customer" if role.lower() == "user" else role.lower()
+    if ctx.state.get("role") == role:
+        return  # already signed in, e.g. started from a checkpoint
+    credentials = ctx.credentials[role]
+    await ctx.pages.sign_in.open()
+    await ctx.pages.sign_in.sign_in(credentials["email"], credentials["password"])
+    await ctx.page.wait_for_url(lambda url: "/auth/" not in url)
+    ctx.state["role"] = role
+
+
+@registry.step(r"fill in all mandatory fields with valid data", kind="action")
+async def fill_registration(ctx: StepContext) -> None:
+    user = mock_user_data(role="customer")
+    ctx.state["registered_email"] = user["email"]
+    await ctx.pages.sign_up.fill_fields({"email": user["email"], "password": "Test123456!"})
+
+
+@registry.step(r"registration form using an invalid email", kind="action")
+async def fill_invalid_registration(ctx: StepContext) -> None:
+    await ctx.pages.sign_up.fill_fields({"email": "not-an-email", "password": "Test123456!"})
+
+
+@registry.step(r"input (?P<validity>valid|incorrect) username/email", kind="action")
+async def fill_login(ctx: StepContext, validity: str) -> None:
+    credentials = ctx.credentials["customer"]
+    password = credentials["password"] if validity.lower() == "valid" else "wrong-password"
+    await ctx.pages.sign_in.fill_fields({"email": credentials["email"], "password": password})
+
+
+@registry.step(r"fill in product details", kind="action")
+async def fill_product(ctx: StepContext) -> None:
+    product = mock_product_data(stock=100)
+    ctx.state["product"] = {key: product[key]
+                            for key in ("name", "description", "price", "stock", "category")}
+    for field in ("name", "description", "price", "stock"):
+        await stub_fill_input(ctx.page, f"#product-{field}", str(product[field]))
+    await stub_select_option(ctx.page, "#product-category", product["category"])
+
+
+@registry.step(r"submit the (?:registration|product creation) form|click the login button",
+               kind="action")
+async def submit_form(ctx: StepContext) -> None:
+    await stub_click_element(ctx.page, "button[type='submit']")
+
+
+@registry.step(r"type a partial product name", kind="action")
+async def search_partial(ctx: StepContext) -> None:
+    marketplace = ctx.pages.marketplace
+    start = time.perf_counter()
+    ctx.state["results"] = await marketplace.search("pro")
+    ctx.state["last_duration_ms"] = (time.perf_counter() - start) * 1000
+
+
+@registry.step(r"apply category filter", kind="action")
+async def filter_category(ctx: StepContext) -> None:
+    start = time.perf_counter()
+    ctx.state["results"] = await ctx.pages.marketplace.filter_category("Electronics")
+    ctx.state["last_duration_ms"] = (time.perf_counter() - start) * 1000
+
+
+@registry.step(r"within (?P<ms>\d+) ?ms")
+async def within_budget(ctx: StepContext, ms: str) -> None:
+    duration = ctx.state.get("last_duration_ms")
+    assert duration is not None, "No timed step ran before this check"
+    assert duration <= int(ms), f"Took {duration:.0f} ms, budget {ms} ms"
+
+
+@registry.step(r"add (?:multiple items|products? .*|a product) to (?:the )?cart(?! with quantity)",
+               kind="action")
+async def add_to_cart(ctx: StepContext) -> None:
+    await open_product_detail(ctx)
+    await ctx.pages.product_detail.add_to_cart()
+
+
+@registry.step(r"add a product to cart with quantity greater than (?:the )?current stock",
+               kind="action")
+async def add_over_stock(ctx: StepContext) -> None:
+    await open_product_detail(ctx)
+    detail = ctx.pages.product_detail
+    stock = await detail.locator("quantity").get_attribute("max")
+    # Without a max attribute the stock is not shown; ask for more than any seeded product has
+    quantity = int(stock) + 1 if stock and stock.isdigit() else 100000
+    ctx.state["quantity"] = quantity
+    await detail.add_to_cart(quantity=quantity)
+
+
+@registry.step(r"select quantity and click 'add to cart'", kind="action")
+async def select_quantity_and_add(ctx: StepContext) -> None:
+    await ctx.pages.product_detail.add_to_cart(quantity=2)
+
+
+@registry.step(r"empty the cart", kind="action")
+async def empty_cart(ctx: StepContext) -> None:
+    await ctx.pages.cart.open()
+    await ctx.pages.cart.clear()
+
+
+@registry.step(r"proceed to checkout", kind="action")
+async def proceed_to_checkout(ctx: StepContext) -> None:
+    await ctx.pages.cart.open()
+    await ctx.pages.cart.proceed_to_checkout()
+
+
+@registry.step(r"fill shipping address form", kind="action")
+async def fill_shipping(ctx: StepContext) -> None:
+    profile = mock_user_data()["profile"]
+    ctx.state["shipping"] = {"full_name": "Test User", "address": profile["address"],
+                             "city": profile["city"], "postal_code": "12345",
+                             "country": profile["country"], "phone": profile["phone"]}
+    checkout = ctx.pages.checkout
+    await checkout.fill_fields({key: value for key, value in ctx.state["shipping"].items()
+                                if key in checkout.SELECTORS})
+
+
+@registry.step(r"place (?:the )?order", kind="action")
+async def place_order(ctx: StepContext) -> None:
+    await stub_click_element(ctx.page, "button[type='submit']")
+
+
+@registry.step(r"logout", kind="action")
+async def sign_out(ctx: StepContext) -> None:
+    await stub_clear_cookies(ctx.context)
+    await ctx.page.evaluate("() => { localStorage.clear(); sessionStorage.clear(); }")
+    ctx.state.pop("role", None)
+
+
+@registry.step(r"login again as the same customer", kind="action")
+async def sign_in_again(ctx: StepContext) -> None:
+    await sign_in_as(ctx, "customer")
+
+
+@registry.step(r"attempt to (?:visit|access) (?P<target>vendor or admin|admin) dashboard",
+               kind="action")
+async def visit_forbidden(ctx: StepContext, target: str) -> None:
+    paths = ["/vendor/dashboard", "/admin"] if target.lower().startswith("vendor") else ["/admin"]
+    ctx.state["forbidden"] = []
+    for path in paths:
+        await ctx.goto(path)
+        ctx.state["forbidden"].append((path, ctx.page.url))
+
+
+@registry.step(r"access is denied", kind="assertion")
+async def verify_denied(ctx: StepContext) -> None:
+    for path, landed in ctx.state.get("forbidden", []):
+        if landed.rstrip("/").endswith(path):
+            denied = await ctx.pages.admin.locator("access_denied").count()
+            assert denied, f"{ctx.state.get('role')} reached {path}"
+
+
+@registry.step(r"can access (?:the )?(?P<target>vendor|admin) dashboard", kind="assertion")
+async def verify_dashboard_access(ctx: StepContext, target: str) -> None:
+    path = _PAGE_PATHS[f"{target.lower()} dashboard"]
+    await ctx.goto(path)
+    landed = ctx.page.url
+    assert landed.rstrip("/").endswith(path), f"{ctx.state.get('role')} was sent to {landed}"
+    denied = await ctx.pages.admin.locator("access_denied").count()
+    assert not denied, f"{ctx.state.get('role')} was denied {path}"
+
+
+@registry.step(r"error message", kind="assertion")
+async def verify_error_shown(ctx: StepContext) -> None:
+    await stub_wait_for_selector(ctx.page, _ERROR_SELECTOR, timeout=5000)
+
+
+@registry.step(r"checkout is blocked", kind="assertion")
+async def verify_checkout_blocked(ctx: StepContext) -> None:
+    await stub_wait_for_selector(ctx.page, _ERROR_SELECTOR, timeout=5000)
+    message = await ctx.page.locator(_ERROR_SELECTOR).first.inner_text()
+    assert "stock" in message.lower(), f"Error does not mention stock: {message!r}"
+    assert "/checkout" in ctx.page.url, f"Checkout went through to {ctx.page.url}"
+
+
+@registry.step(r"remains unauthenticated", kind="assertion")
+async def verify_unauthenticated(ctx: StepContext) -> None:
+    assert "/auth/" in ctx.page.url, f"Left the sign in page: {ctx.page.url}"
+
+
+@registry.step(r"authenticated and redirected", kind="assertion")
+async def verify_authenticated(ctx: StepContext) -> None:
+    await ctx.page.wait_for_url(lambda url: "/auth/" not in url, timeout=10000)
+
+
+@registry.step(r"cart items and quantities are intact", kind="assertion")
+async def verify_cart_kept(ctx: StepContext) -> None:
+    await ctx.pages.cart.open()
+    assert not await ctx.pages.cart.is_empty(), "Cart is empty after signing in again"
+
+
+# --- Execution -------------------------------------------------------------
+
+async def run_plan_tc(
+    tc: Dict[str, Any],
+    page: Page,
+    base_url: str = "http://localhost:3000",
+    strict: bool = False,
+    step_registry: Optional[StepRegistry] = None,
+    state: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Run the steps of one TC on a page
+
+    Unmapped steps are reported and skipped (or fail the TC when
+    ``strict``); after the first failure the remaining steps are skipped.
+    A TC with an unmapped assertion is incomplete and never passes, since
+    nothing checked what that assertion describes.
+
+    Args:
+        tc: TC dictionary from the plan
+        page: Page instance
+        base_url: Base URL of the app
+        strict: Treat unmapped steps as failures
+        step_registry: Registry to resolve steps with (default: ``registry``)
+        state: Initial step state (e.g. from a checkpoint)
+
+    Returns: Dictionary with tc_id, passed, incomplete, duration and
+        per-step results
+    """
+    step_registry = step_registry or registry
+    ctx = StepContext(page, base_url)
+    ctx.state.update(state or {})
+    steps = []
+    failed = False
+    incomplete = False
+    start = time.perf_counter()
+    for step in tc["steps"]:
+        entry = {"type": step["type"], "description": step["description"]}
+        resolved = step_registry.resolve(step["type"], step["description"])
+        if failed:
+            entry["status"] = "skipped"
+        elif resolved is None:
+            entry["status"] = "unmapped"
+            incomplete = incomplete or step["type"] == "assertion"
+            failed = strict
+        else:
+            step_start = time.perf_counter()
+            try:
+                for handler, params in resolved:
+                    await handler(ctx, **params)
+                entry["status"] = "passed"
+            except Exception as exc:
+                entry.update(status="failed", error=f"{type(exc).__name__}: {exc}"[:500])
+                failed = True
+            entry["duration"] = round(time.perf_counter() - step_start, 3)
+        steps.append(entry)
+    return {
+        "tc_id": tc["id"],
+        "passed": not failed and not incomplete,
+        "incomplete": incomplete,
+        "duration": round(time.perf_counter() - start, 3),
+        "steps": steps,
+        "state": ctx.state,
+    }
+
+
+async def run_plan(
+    tc_ids: Optional[Sequence[str]] = None,
+    workers: int = 4,
+    plan_path: str = DEFAULT_PLAN_PATH,
+    base_url: str = "http://localhost:3000",
+    headless: bool = True,
+    strict: bool = False,
+    browser: Optional[Browser] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run plan TCs concurrently on one shared browser
+
+    The browser is started once; each TC gets its own context (they do not
+    share state), and at most ``workers`` TCs run at the same time.
+
+    Args:
+        tc_ids: TC ids to run (default: every TC in the plan)
+        workers: Maximum concurrent TCs
+        plan_path: Plan JSON path
+        base_url: Base URL of the app
+        headless: Run browser in headless mode
+        strict: Treat unmapped steps as failures
+        browser: Existing browser to use instead of launching one
+
+    Returns: One result per TC, in plan order
+    """
+    plan = [tc for tc in load_plan(plan_path) if not tc_ids or tc["id"] in tc_ids]
+    pw = None
+    if browser is None:
+        pw = await stub_playwright_start()
+        browser = await stub_launch_browser(pw, headless=headless)
+    semaphore = asyncio.Semaphore(max(1, workers))
+
+    async def run_one(tc: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            context = await stub_create_context(browser)
+            try:
+                page = await stub_create_page(context, network_profile_from_env())
+                return await run_plan_tc(tc, page, base_url=base_url, strict=strict)
+            finally:
+                await stub_cleanup(context)
+
+    try:
+        return list(await asyncio.gather(*(run_one(tc) for tc in plan)))
+    finally:
+        if pw is not None:
+            await stub_cleanup(browser=browser, pw=pw)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run TCs from the plan, or report which steps have handlers"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--tcs", nargs="*", default=None, help="TC ids (default: whole plan)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--plan", default=DEFAULT_PLAN_PATH)
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--strict", action="store_true", help="Fail TCs with unmapped steps")
+    parser.add_argument("--coverage", action="store_true",
+                        help="Print step handler coverage and exit")
+    args = parser.parse_args(argv)
+
+    if args.coverage:
+        print(json.dumps(registry.coverage(load_plan(args.plan)), indent=2))
+        return 0
+    results = asyncio.run(run_plan(args.tcs, workers=args.workers, plan_path=args.plan,
+                                   base_url=args.base_url, strict=args.strict))
+    for result in results:
+        counts: Dict[str, int] = {}
+        for step in result["steps"]:
+            counts[step["status"]] = counts.get(step["status"], 0) + 1
+        print(json.dumps({"tc_id": result["tc_id"], "passed": result["passed"],
+                          "incomplete": result["incomplete"], "duration": result["duration"], "steps": counts}))
+    return 0 if all(result["passed"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
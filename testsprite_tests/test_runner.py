@@ -0,0 +1,116 @@
+"""
+Test Runner Module
+Contains helpers to discover and run the generated TC scripts
+"""
+import glob
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def discover_tcs(tests_dir: str = TESTS_DIR) -> Dict[str, str]:
+    """
+    Find the generated TC scripts
+
+    Args:
+        tests_dir: Directory containing the TC scripts
+
+    Returns: Dictionary mapping TC id (e.g. "TC008") to script path, in order
+    """
+    scripts = {}
+    for path in sorted(glob.glob(os.path.join(tests_dir, "TC[0-9]*_*.py"))):
+        match = re.match(r"(TC\d+)_", os.path.basename(path))
+        if match:
+            scripts[match.group(1)] = path
+    return scripts
+
+
+def resolve_tc(tc_id: str, tests_dir: str = TESTS_DIR) -> str:
+    """
+    Get the script path for a TC id
+
+    Args:
+        tc_id: TC id such as "TC008"
+        tests_dir: Directory containing the TC scripts
+
+    Returns: Script path
+    """
+    scripts = discover_tcs(tests_dir)
+    if tc_id not in scripts:
+        raise KeyError(f"Unknown test case {tc_id!r}; available: {', '.join(scripts)}")
+    return scripts[tc_id]
+
+
+def run_tc(
+    tc_id: str,
+    env: Optional[Dict[str, str]] = None,
+    timeout: float = 300.0,
+    tests_dir: str = TESTS_DIR
+) -> Dict[str, Any]:
+    """
+    Run one TC script in a fresh interpreter (and so a fresh browser)
+
+    Args:
+        tc_id: TC id such as "TC008"
+        env: Extra environment variables for the script
+        timeout: Timeout in seconds
+        tests_dir: Directory containing the TC scripts
+
+    Returns: Result dictionary with passed, duration, returncode and output tail
+    """
+    path = resolve_tc(tc_id, tests_dir)
+    run_env = dict(os.environ)
+    run_env.update(env or {})
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            [sys.executable, path],
+            cwd=tests_dir,
+            env=run_env,
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        returncode, output = proc.returncode, (proc.stdout + proc.stderr)
+    except subprocess.TimeoutExpired as exc:
+        returncode = None
+        output = f"Timed out after {timeout}s\n{exc.stdout or ''}{exc.stderr or ''}"
+    duration = time.perf_counter() - start
+    return {
+        "tc_id": tc_id,
+        "passed": returncode == 0,
+        "returncode": returncode,
+        "duration": round(duration, 3),
+        "output": output[-2000:],
+    }
+
+
+def run_tcs(
+    tc_ids: Iterable[str],
+    env: Optional[Dict[str, str]] = None,
+    workers: int = 1,
+    timeout: float = 300.0
+) -> List[Dict[str, Any]]:
+    """
+    Run several TC scripts, optionally in parallel processes
+
+    Args:
+        tc_ids: TC ids to run
+        env: Extra environment variables for every script
+        workers: Number of scripts to run at the same time
+        timeout: Per-script timeout in seconds
+
+    Returns: List of result dictionaries, in the order given
+    """
+    tc_ids = list(tc_ids)
+    if workers <= 1:
+        return [run_tc(tc_id, env=env, timeout=timeout) for tc_id in tc_ids]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda tc_id: run_tc(tc_id, env=env, timeout=timeout), tc_ids))
@@ -0,0 +1,449 @@
+"""
+Test Scheduler Module
+Contains the dependency-aware scheduler that runs plan TCs from shared checkpoints
+
+Many TCs repeat the same setup (sign in, create a product, fill the cart,
+place an order). The scheduler models TC prerequisites and setup
+checkpoints as a DAG, builds each checkpoint once (the context storage
+state plus the step state and any seeded backend data) and starts every
+dependent TC from it in a fresh context. Independent branches run in
+parallel:
+
+    python test_scheduler.py --workers 4
+    python test_scheduler.py --tcs TC011 TC012 --graph
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set
+
+from test_plan import DEFAULT_PLAN_PATH, load_plan, run_plan_tc
+from test_stubs import stub_cleanup, stub_launch_browser, stub_playwright_start
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser
+
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "tmp", "checkpoints"
+)
+
+# Setup checkpoints. "from" is the checkpoint they extend, "after" the TCs
+# that must pass first (a failed gate blocks everything downstream), "steps"
+# plan-style step descriptions run by the plan step handlers and "seed" an
+# optional callable returning backend data merged into the step state.
+# Backend rows are not part of the storage state: every context signed in as
+# the same user shares them. "reseed" makes each dependent re-run the
+# checkpoint's steps in its own context first, so it starts from the rows the
+# checkpoint created rather than what an earlier dependent left behind.
+# Nodes (checkpoints or TCs) listing the same name in "locks" never run at
+# the same time.
+CHECKPOINTS: Dict[str, Dict[str, Any]] = {
+    "customer_session": {"after": ["TC003"], "steps": ["Login as customer."]},
+    "vendor_session": {"after": ["TC003"], "steps": ["Login as a vendor."]},
+    "admin_session": {"after": ["TC003"], "steps": ["Login as admin."]},
+    "vendor_product": {
+        "from": "vendor_session",
+        "after": ["TC006"],
+        "steps": [
+            "Navigate to 'New Product' page.",
+            "Fill in product details including name, description, price, stock quantity, "
+            "and category.",
+            "Submit the product creation form.",
+        ],
+    },
+    "cart_filled": {
+        "from": "customer_session",
+        "after": ["TC009"],
+        "steps": ["Empty the cart.", "Add products from different vendors to the cart."],
+        "reseed": True,
+        "locks": ["customer_cart"],
+    },
+    "order_placed": {
+        "from": "cart_filled",
+        "after": ["TC011"],
+        "steps": [
+            "Proceed to checkout with multi-vendor items in cart.",
+            "Fill shipping address form with valid data.",
+            "Confirm and place the order.",
+        ],
+        "locks": ["customer_cart"],
+    },
+}
+
+# TC prerequisites: "from" is the checkpoint the TC starts at, "skip" the
+# number of leading plan steps that checkpoint already covers, "after"
+# TCs that must pass first and "locks" as for checkpoints. TCs not listed
+# start from a blank context.
+TC_PREREQUISITES: Dict[str, Dict[str, Any]] = {
+    "TC003": {"after": ["TC001"]},
+    "TC006": {"from": "vendor_session", "skip": 1},
+    "TC007": {"from": "vendor_product", "skip": 1},
+    "TC009": {"from": "customer_session", "locks": ["customer_cart"]},
+    "TC010": {"from": "customer_session", "locks": ["customer_cart"]},
+    "TC011": {"from": "cart_filled", "locks": ["customer_cart"]},
+    "TC012": {"from": "order_placed", "skip": 1},
+    "TC013": {"from": "order_placed", "skip": 1},
+    "TC014": {"from": "order_placed"},
+    "TC015": {"from": "customer_session"},
+    "TC016": {"from": "admin_session"},
+    "TC019": {"from": "cart_filled", "skip": 1, "locks": ["customer_cart"]},
+    "TC020": {"from": "customer_session", "locks": ["customer_cart"]},
+}
+
+
+def _tc_node(tc_id: str) -> str:
+    return f"tc:{tc_id}"
+
+
+def _checkpoint_node(name: str) -> str:
+    return f"checkpoint:{name}"
+
+
+def build_graph(
+    tc_ids: Sequence[str],
+    checkpoints: Dict[str, Dict[str, Any]] = CHECKPOINTS,
+    prerequisites: Dict[str, Dict[str, Any]] = TC_PREREQUISITES
+) -> Dict[str, List[str]]:
+    """
+    Build the dependency graph needed to run some TCs
+
+    Checkpoints are pulled in when a selected TC (or another checkpoint)
+    starts from them. "after" gates only apply to TCs that are selected, so
+    running TC012 alone does not drag TC011 and its own gates along.
+
+    Args:
+        tc_ids: TCs to run
+        checkpoints: Checkpoint definitions
+        prerequisites: TC prerequisites
+
+    Returns: Dictionary of node ("tc:<id>" or "checkpoint:<name>") to the
+        nodes it depends on
+
+    Raises:
+        KeyError: A TC or checkpoint starts from an unknown checkpoint
+        ValueError: The graph has a cycle
+    """
+    selected = set(tc_ids)
+    graph: Dict[str, List[str]] = {}
+
+    def add(node: str, spec: Dict[str, Any]) -> None:
+        if node in graph:
+            return
+        deps = [_tc_node(tc_id) for tc_id in spec.get("after", ()) if tc_id in selected]
+        parent = spec.get("from")
+        if parent:
+            if parent not in checkpoints:
+                raise KeyError(f"{node} starts from unknown checkpoint {parent!r}")
+            deps.append(_checkpoint_node(parent))
+        graph[node] = deps
+        if parent:
+            add(_checkpoint_node(parent), checkpoints[parent])
+
+    for tc_id in tc_ids:
+        add(_tc_node(tc_id), prerequisites.get(tc_id, {}))
+    topological_order(graph)
+    return graph
+
+
+def topological_order(graph: Dict[str, List[str]]) -> List[str]:
+    """
+    Order nodes so every node comes after its dependencies
+
+    Args:
+        graph: Node to dependencies
+
+    Returns: List of nodes
+
+    Raises:
+        ValueError: The graph has a cycle
+    """
+    order: List[str] = []
+    done: Set[str] = set()
+    visiting: Set[str] = set()
+
+    def visit(node: str, path: List[str]) -> None:
+        if node in done:
+            return
+        if node in visiting:
+            raise ValueError("Dependency cycle: " + " -> ".join(path + [node]))
+        visiting.add(node)
+        for dep in graph.get(node, ()):
+            visit(dep, path + [node])
+        visiting.discard(node)
+        done.add(node)
+        order.append(node)
+
+    for node in graph:
+        visit(node, [])
+    return order
+
+
+class DagScheduler:
+    """Runs plan TCs in dependency order on one browser
+
+    Every node of the graph becomes a task that waits for its dependencies
+    and then takes one of ``workers`` slots, so independent branches run
+    side by side. A checkpoint is built once in its own context; its
+    storage state (cookies and local storage) is written to
+    ``checkpoint_dir`` and handed to each dependent through
+    ``browser.new_context(storage_state=...)`` together with a copy of the
+    step state. Dependents of a "reseed" checkpoint re-run its steps
+    first, and nodes sharing a lock name wait for each other (before taking
+    a slot). Nodes whose dependencies failed are reported as blocked.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        plan: Sequence[Dict[str, Any]],
+        base_url: str = "http://localhost:3000",
+        workers: int = 4,
+        strict: bool = False,
+        checkpoints: Dict[str, Dict[str, Any]] = CHECKPOINTS,
+        prerequisites: Dict[str, Dict[str, Any]] = TC_PREREQUISITES,
+        checkpoint_dir: Optional[str] = DEFAULT_CHECKPOINT_DIR
+    ):
+        self.browser = browser
+        self.plan = {tc["id"]: tc for tc in plan}
+        self.base_url = base_url
+        self.strict = strict
+        self.checkpoints = checkpoints
+        self.prerequisites = prerequisites
+        self.checkpoint_dir = checkpoint_dir
+        self.built: Dict[str, Dict[str, Any]] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._semaphore = asyncio.Semaphore(max(1, workers))
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def _new_page(self, checkpoint: Optional[str]) -> Any:
+        storage_state = self.built[checkpoint]["storage_state"] if checkpoint else None
+        context = await self.browser.new_context(storage_state=storage_state)
+        return await context.new_page()
+
+    def _start_state(self, checkpoint: Optional[str]) -> Dict[str, Any]:
+        return dict(self.built[checkpoint]["state"]) if checkpoint else {}
+
+    async def _run_steps(self, run_id: str, descriptions: Sequence[str], page: Any,
+                         state: Dict[str, Any]) -> Dict[str, Any]:
+        steps = [{"type": "action", "description": description} for description in descriptions]
+        return await run_plan_tc({"id": run_id, "steps": steps}, page, base_url=self.base_url,
+                                 strict=True, state=state)
+
+    async def _reseed(self, page: Any, checkpoint: Optional[str],
+                      state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not checkpoint or not self.checkpoints[checkpoint].get("reseed"):
+            return None
+        return await self._run_steps(f"reseed:{checkpoint}", self.checkpoints[checkpoint]["steps"],
+                                     page, state)
+
+    async def _build_checkpoint(self, name: str) -> Dict[str, Any]:
+        spec = self.checkpoints[name]
+        parent = spec.get("from")
+        start = time.perf_counter()
+        state = self._start_state(parent)
+        if spec.get("seed"):
+            state.update(await asyncio.to_thread(spec["seed"]))
+        page = await self._new_page(parent)
+        try:
+            result = await self._reseed(page, parent, state)
+            if result is None or result["passed"]:
+                result = await self._run_steps(f"checkpoint:{name}", spec.get("steps", ()), page,
+                                               result["state"] if result else state)
+            storage_state = await page.context.storage_state()
+        finally:
+            await stub_cleanup(page.context)
+        if result["passed"] and self.checkpoint_dir:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            with open(os.path.join(self.checkpoint_dir, f"{name}.json"), "w") as f:
+                json.dump(storage_state, f)
+        self.built[name] = {"storage_state": storage_state, "state": result["state"]}
+        return {"checkpoint": name, "passed": result["passed"],
+                "duration": round(time.perf_counter() - start, 3), "steps": result["steps"]}
+
+    async def _run_tc(self, tc_id: str) -> Dict[str, Any]:
+        spec = self.prerequisites.get(tc_id, {})
+        checkpoint = spec.get("from")
+        tc = self.plan[tc_id]
+        tc = dict(tc, steps=tc["steps"][spec.get("skip", 0):])
+        page = await self._new_page(checkpoint)
+        try:
+            result = await self._reseed(page, checkpoint, self._start_state(checkpoint))
+            if result is None or result["passed"]:
+                state = result["state"] if result else self._start_state(checkpoint)
+                result = await run_plan_tc(tc, page, base_url=self.base_url, strict=self.strict,
+                                           state=state)
+        finally:
+            await stub_cleanup(page.context)
+        result.pop("state", None)
+        result["checkpoint"] = checkpoint
+        return result
+
+    async def run(self, tc_ids: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Run TCs and the checkpoints they need
+
+        Args:
+            tc_ids: TC ids to run (default: every TC in the plan)
+
+        Returns: Dictionary with per-TC results in plan order, checkpoint
+            results, blocked nodes and the number of setups reused
+        """
+        tc_ids = [tc_id for tc_id in self.plan if not tc_ids or tc_id in tc_ids]
+        graph = build_graph(tc_ids, self.checkpoints, self.prerequisites)
+        outcome: Dict[str, asyncio.Future] = {
+            node: asyncio.get_running_loop().create_future() for node in graph
+        }
+
+        async def run_node(node: str) -> None:
+            deps_passed = [await outcome[dep] for dep in graph[node]]
+            if not all(deps_passed):
+                failed = [dep for dep, ok in zip(graph[node], deps_passed) if not ok]
+                self.results[node] = {"passed": False, "blocked_by": failed}
+                outcome[node].set_result(False)
+                return
+            kind, name = node.split(":", 1)
+            spec = (self.prerequisites.get(name, {}) if kind == "tc"
+                    else self.checkpoints[name])
+            try:
+                async with AsyncExitStack() as stack:
+                    for lock in sorted(set(spec.get("locks", ()))):
+                        await stack.enter_async_context(self._locks[lock])
+                    await stack.enter_async_context(self._semaphore)
+                    if kind == "tc":
+                        result = await self._run_tc(name)
+                    else:
+                        result = await self._build_checkpoint(name)
+            except Exception as exc:
+                result = {"passed": False, "error": f"{type(exc).__name__}: {exc}"[:500]}
+            self.results[node] = result
+            outcome[node].set_result(result["passed"])
+
+        await asyncio.gather(*(run_node(node) for node in topological_order(graph)))
+
+        checkpoint_runs = {node.split(":", 1)[1]: result for node, result in self.results.items()
+                           if node.startswith("checkpoint:")}
+        reused = sum(1 for tc_id in tc_ids
+                     if self.prerequisites.get(tc_id, {}).get("from")
+                     and "blocked_by" not in self.results[_tc_node(tc_id)])
+        return {
+            "tcs": [dict(self.results[_tc_node(tc_id)], tc_id=tc_id) for tc_id in tc_ids],
+            "checkpoints": checkpoint_runs,
+            "blocked": sorted(node for node, result in self.results.items()
+                              if "blocked_by" in result),
+            "setups_reused": reused,
+            "setups_built": sum(1 for result in checkpoint_runs.values()
+                                if "blocked_by" not in result),
+        }
+
+
+async def run_scheduled(
+    tc_ids: Optional[Sequence[str]] = None,
+    workers: int = 4,
+    plan_path: str = DEFAULT_PLAN_PATH,
+    base_url: str = "http://localhost:3000",
+    headless: bool = True,
+    strict: bool = False,
+    checkpoints: Dict[str, Dict[str, Any]] = CHECKPOINTS
+) -> Dict[str, Any]:
+    """
+    Launch a browser and run TCs through a ``DagScheduler``
+
+    Args:
+        tc_ids: TC ids to run (default: every TC in the plan)
+        workers: Maximum concurrent TCs and checkpoint builds
+        plan_path: Plan JSON path
+        base_url: Base URL of the app
+        headless: Run browser in headless mode
+        strict: Treat unmapped steps as failures
+        checkpoints: Checkpoint definitions
+
+    Returns: Result of ``DagScheduler.run``
+    """
+    pw = await stub_playwright_start()
+    browser = await stub_launch_browser(pw, headless=headless)
+    try:
+        scheduler = DagScheduler(browser, load_plan(plan_path), base_url=base_url,
+                                 workers=workers, strict=strict, checkpoints=checkpoints)
+        return await scheduler.run(tc_ids)
+    finally:
+        await stub_cleanup(browser=browser, pw=pw)
+
+
+def _seed_catalog(size: int, dsn: Optional[str]) -> Dict[str, Any]:
+    from test_catalog import seed_catalog
+    from test_postgres import connect, explicit_dsn
+
+    with connect(explicit_dsn(dsn)) as conn:
+        return {"seeded_catalog": seed_catalog(conn, size)}
+
+
+def with_seeded_catalog(size: int, dsn: Optional[str] = None,
+                        checkpoints: Dict[str, Dict[str, Any]] = CHECKPOINTS) -> Dict[str, Dict[str, Any]]:
+    """
+    Copy checkpoint definitions so the catalog is seeded once up front
+
+    A "catalog" checkpoint seeds ``size`` synthetic products into the local
+    Postgres and every root checkpoint starts from it.
+
+    Args:
+        size: Number of products to seed
+        dsn: Postgres connection string (required, or ``SHOPHUB_DATABASE_URL``)
+        checkpoints: Checkpoint definitions to extend
+
+    Returns: New checkpoint definitions
+    """
+    seeded = {"catalog": {"seed": partial(_seed_catalog, size, dsn)}}
+    for name, spec in checkpoints.items():
+        seeded[name] = dict(spec) if spec.get("from") else dict(spec, **{"from": "catalog"})
+    return seeded
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run plan TCs from shared checkpoints, or print the dependency graph"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--tcs", nargs="*", default=None, help="TC ids (default: whole plan)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--plan", default=DEFAULT_PLAN_PATH)
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--strict", action="store_true", help="Fail TCs with unmapped steps")
+    parser.add_argument("--seed-catalog", type=int, default=None, metavar="SIZE",
+                        help="Seed SIZE synthetic products into Postgres before any checkpoint")
+    parser.add_argument("--dsn", default=None, help="Postgres connection string")
+    parser.add_argument("--graph", action="store_true",
+                        help="Print the dependency graph in run order and exit")
+    args = parser.parse_args(argv)
+
+    checkpoints = CHECKPOINTS
+    if args.seed_catalog:
+        checkpoints = with_seeded_catalog(args.seed_catalog, args.dsn)
+    if args.graph:
+        tc_ids = [tc["id"] for tc in load_plan(args.plan) if not args.tcs or tc["id"] in args.tcs]
+        graph = build_graph(tc_ids, checkpoints)
+        for node in topological_order(graph):
+            print(f"{node} <- {', '.join(graph[node]) or '-'}")
+        return 0
+
+    report = asyncio.run(run_scheduled(args.tcs, workers=args.workers, plan_path=args.plan,
+                                       base_url=args.base_url, strict=args.strict,
+                                       checkpoints=checkpoints))
+    for name, result in report["checkpoints"].items():
+        print(json.dumps({"checkpoint": name, "passed": result["passed"],
+                          "duration": result.get("duration")}))
+    for result in report["tcs"]:
+        print(json.dumps({key: result.get(key) for key in
+                          ("tc_id", "passed", "duration", "checkpoint", "blocked_by")}))
+    print(json.dumps({key: report[key] for key in ("setups_built", "setups_reused", "blocked")}))
+    return 0 if all(result["passed"] for result in report["tcs"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Unit tests for test_scheduler.py
+Dependency ordering and graph construction, without a browser
+"""
+import pytest
+
+from test_plan import registry
+from test_scheduler import CHECKPOINTS, TC_PREREQUISITES, build_graph, topological_order
+
+
+def _assert_ordered(graph, order):
+    position = {node: index for index, node in enumerate(order)}
+    assert sorted(order) == sorted(graph)
+    for node, deps in graph.items():
+        for dep in deps:
+            assert position[dep] < position[node], f"{dep} must come before {node}"
+
+
+def test_topological_order_puts_dependencies_first():
+    graph = {"d": ["b", "c"], "b": ["a"], "c": ["a"], "a": [], "e": []}
+    _assert_ordered(graph, topological_order(graph))
+
+
+def test_topological_order_keeps_independent_nodes_in_graph_order():
+    assert topological_order({"x": [], "y": [], "z": []}) == ["x", "y", "z"]
+
+
+def test_topological_order_reports_the_cycle():
+    with pytest.raises(ValueError, match="a -> b -> c -> a"):
+        topological_order({"a": ["b"], "b": ["c"], "c": ["a"]})
+
+
+def test_topological_order_rejects_self_dependency():
+    with pytest.raises(ValueError, match="Dependency cycle"):
+        topological_order({"a": ["a"]})
+
+
+def test_build_graph_pulls_in_checkpoint_chain():
+    graph = build_graph(["TC012"])
+    assert graph["tc:TC012"] == ["checkpoint:order_placed"]
+    assert graph["checkpoint:order_placed"] == ["checkpoint:cart_filled"]
+    assert graph["checkpoint:cart_filled"] == ["checkpoint:customer_session"]
+    assert "tc:TC011" not in graph  # gates only apply to selected TCs
+    _assert_ordered(graph, topological_order(graph))
+
+
+def test_build_graph_adds_gates_of_selected_tcs():
+    graph = build_graph(["TC001", "TC003", "TC009", "TC011"])
+    assert "tc:TC001" in graph["tc:TC003"]
+    assert "tc:TC003" in graph["checkpoint:customer_session"]
+    assert "tc:TC009" in graph["checkpoint:cart_filled"]
+    _assert_ordered(graph, topological_order(graph))
+
+
+def test_build_graph_rejects_unknown_checkpoint():
+    with pytest.raises(KeyError, match="missing"):
+        build_graph(["TC100"], CHECKPOINTS, {"TC100": {"from": "missing"}})
+
+
+def test_build_graph_rejects_gate_cycles():
+    prerequisites = dict(TC_PREREQUISITES, TC001={"after": ["TC003"]})
+    with pytest.raises(ValueError, match="Dependency cycle"):
+        build_graph(["TC001", "TC003"], CHECKPOINTS, prerequisites)
+
+
+@pytest.mark.parametrize("name", sorted(CHECKPOINTS))
+def test_checkpoint_steps_have_handlers(name):
+    """Checkpoints run their steps strictly, so an unmapped step blocks every dependent"""
+    for description in CHECKPOINTS[name]["steps"]:
+        assert registry.resolve("action", description), f"No handler for {description!r}"
@@ -0,0 +1,262 @@
+"""
+Test Snapshots Module
+Contains backend snapshot and restore helpers for a local Postgres
+
+Two mechanisms, both avoiding TRUNCATE plus re-seeding between tests:
+
+- ``TemplateSnapshots`` copies the whole test database with
+  ``CREATE DATABASE ... TEMPLATE``; restoring drops the database and clones
+  it back from the snapshot, at the cost of dropping its connections. It
+  covers every connection to that database, so writes made by the app
+  (browser TCs) are undone only if the app's API is pointed at the test
+  database; `supabase start` serves the ``postgres`` database, which is
+  never snapshotted.
+- ``SavepointSnapshot`` wraps a connection in a transaction and rolls it
+  back to a savepoint, for tests that write through their own connection.
+
+Run as a script to run TCs in order, restoring the baseline after each TC
+that mutates stock, orders or reviews:
+
+    python test_snapshots.py --tcs TC006 TC007 TC008 TC011 --dsn postgresql://.../shophub_test
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from test_postgres import connect, explicit_dsn
+from test_runner import discover_tcs, run_tc
+
+
+# TCs that leave rows behind in products, orders, sub_orders or reviews
+MUTATING_TCS = ("TC006", "TC007", "TC011", "TC014", "TC020")
+
+BASELINE = "baseline"
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _conninfo() -> Any:
+    try:
+        from psycopg import conninfo
+    except ImportError as exc:
+        raise ImportError(
+            "Postgres helpers need psycopg 3: pip install 'psycopg[binary]'"
+        ) from exc
+    return conninfo
+
+
+class TemplateSnapshots:
+    """Whole-database snapshots of the test database
+
+    A snapshot is a sibling database ``<prefix>_<name>`` created with the
+    test database as template, which Postgres copies at file level. Restoring
+    terminates the sessions on the test database, drops it and recreates it
+    from the snapshot; clients such as the app's API reconnect on their own.
+
+    The DSN must be given (or ``SHOPHUB_DATABASE_URL`` set) and name a
+    database used only for tests: restoring drops it, so the default
+    Supabase database and the maintenance databases are refused.
+
+    Raises:
+        ValueError: No DSN, or it names ``postgres`` or a template database
+    """
+
+    def __init__(self, dsn: Optional[str] = None, prefix: str = "shophub_snap",
+                 attempts: int = 5):
+        conninfo = _conninfo()
+        self.dsn = explicit_dsn(dsn)
+        self.database = conninfo.conninfo_to_dict(self.dsn).get("dbname") or ""
+        if self.database in ("", "postgres", "template0", "template1"):
+            raise ValueError(f"Refusing to snapshot and drop database {self.database!r}: "
+                             "point the DSN at a database used only for tests")
+        self.prefix = prefix
+        self.attempts = attempts
+        # Maintenance database for CREATE/DROP DATABASE; never the copied one
+        self._admin_dsn = conninfo.make_conninfo(self.dsn, dbname="postgres")
+        self.timings: List[Dict[str, Any]] = []
+
+    def snapshot_database(self, name: str) -> str:
+        """Name of the database holding snapshot ``name``"""
+        return f"{self.prefix}_{name}"
+
+    def _terminate(self, cur: Any, database: str) -> None:
+        cur.execute(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            "WHERE datname = %s AND pid <> pg_backend_pid()",
+            (database,),
+        )
+
+    def _clone(self, source: str, target: str, drop_target: bool) -> float:
+        # Sessions reconnecting between terminate and CREATE/DROP make those
+        # fail with "is being accessed by other users", so retry a few times
+        start = time.perf_counter()
+        with connect(self._admin_dsn, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                for attempt in range(self.attempts):
+                    try:
+                        self._terminate(cur, source)
+                        if drop_target:
+                            self._terminate(cur, target)
+                            cur.execute(f"DROP DATABASE IF EXISTS {_quote(target)}")
+                        cur.execute(f"CREATE DATABASE {_quote(target)} TEMPLATE {_quote(source)}")
+                        break
+                    except Exception:
+                        if attempt == self.attempts - 1:
+                            raise
+                        time.sleep(0.05 * (attempt + 1))
+        return (time.perf_counter() - start) * 1000
+
+    def snapshot(self, name: str = BASELINE) -> float:
+        """
+        Capture the current state of the test database
+
+        Args:
+            name: Snapshot name (replaced if it exists)
+
+        Returns: Milliseconds taken
+        """
+        elapsed = self._clone(self.database, self.snapshot_database(name), drop_target=True)
+        self.timings.append({"op": "snapshot", "name": name, "ms": round(elapsed, 1)})
+        return elapsed
+
+    def restore(self, name: str = BASELINE) -> float:
+        """
+        Put the test database back to snapshot ``name``
+
+        Args:
+            name: Snapshot name
+
+        Returns: Milliseconds taken
+        """
+        elapsed = self._clone(self.snapshot_database(name), self.database, drop_target=True)
+        self.timings.append({"op": "restore", "name": name, "ms": round(elapsed, 1)})
+        return elapsed
+
+    def other_sessions(self) -> int:
+        """
+        Count sessions on the test database besides this process's own
+
+        Zero while the app is running usually means its API is connected to
+        another database, so restoring will not undo the app's writes.
+
+        Returns: Number of sessions
+        """
+        with connect(self._admin_dsn, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT count(*) FROM pg_stat_activity "
+                            "WHERE datname = %s AND pid <> pg_backend_pid()", (self.database,))
+                return cur.fetchone()[0]
+
+    def exists(self, name: str = BASELINE) -> bool:
+        """Check whether snapshot ``name`` exists"""
+        with connect(self._admin_dsn, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1 FROM pg_database WHERE datname = %s",
+                            (self.snapshot_database(name),))
+                return cur.fetchone() is not None
+
+    def drop(self, name: str = BASELINE) -> None:
+        """
+        Delete a snapshot
+
+        Args:
+            name: Snapshot name
+        """
+        with connect(self._admin_dsn, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP DATABASE IF EXISTS {_quote(self.snapshot_database(name))}")
+
+
+class SavepointSnapshot:
+    """Rolls one connection back to a savepoint
+
+    Everything written through the connection after ``take`` is undone by
+    ``restore`` without touching the disk, so it costs well under a
+    millisecond. Writes from other connections (the app, worker threads)
+    are not covered; use ``TemplateSnapshots`` for those.
+    """
+
+    def __init__(self, conn: Any, name: str = "shophub_snapshot"):
+        self.conn = conn
+        self.name = _quote(name)
+
+    def take(self) -> None:
+        """Open the outer transaction (if needed) and set the savepoint"""
+        with self.conn.cursor() as cur:
+            cur.execute(f"SAVEPOINT {self.name}")
+
+    def restore(self) -> None:
+        """Undo everything since ``take``; the savepoint stays usable"""
+        with self.conn.cursor() as cur:
+            cur.execute(f"ROLLBACK TO SAVEPOINT {self.name}")
+
+    def __enter__(self) -> "SavepointSnapshot":
+        self.take()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.conn.rollback()
+
+
+def run_isolated(
+    tc_ids: Sequence[str],
+    snapshots: TemplateSnapshots,
+    restore_all: bool = False,
+    timeout: float = 300.0
+) -> List[Dict[str, Any]]:
+    """
+    Run TC scripts in order, restoring the baseline after mutating ones
+
+    Args:
+        tc_ids: TC ids, in run order
+        snapshots: Snapshot helper whose baseline already exists
+        restore_all: Restore after every TC, not only ``MUTATING_TCS``
+        timeout: Seconds before a TC is killed
+
+    Returns: ``run_tc`` results with the restore time added
+    """
+    results = []
+    for tc_id in tc_ids:
+        result = run_tc(tc_id, timeout=timeout)
+        if restore_all or tc_id in MUTATING_TCS:
+            result["restore_ms"] = round(snapshots.restore(BASELINE), 1)
+        results.append(result)
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Snapshot the test database, run TCs and restore between them"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--tcs", nargs="*", default=None, help="TC ids (default: all)")
+    parser.add_argument("--dsn", default=None,
+                        help="Postgres connection string of a test-only database "
+                             "(default: SHOPHUB_DATABASE_URL)")
+    parser.add_argument("--restore-all", action="store_true",
+                        help="Restore after every TC, not only the mutating ones")
+    parser.add_argument("--keep", action="store_true", help="Keep the baseline snapshot")
+    args = parser.parse_args(argv)
+
+    snapshots = TemplateSnapshots(args.dsn)
+    if not snapshots.other_sessions():
+        print(f"warning: nothing else is connected to {snapshots.database!r}; if the app's API "
+              "uses another database, restores will not undo the TCs' writes", file=sys.stderr)
+    snapshots.snapshot(BASELINE)
+    try:
+        results = run_isolated(args.tcs or list(discover_tcs()), snapshots,
+                               restore_all=args.restore_all)
+    finally:
+        if not args.keep:
+            snapshots.drop(BASELINE)
+    for result in results:
+        print(json.dumps({key: result.get(key)
+                          for key in ("tc_id", "passed", "duration", "restore_ms")}))
+    print(json.dumps({"timings": snapshots.timings}))
+    return 0 if all(result["passed"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
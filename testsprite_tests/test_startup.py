@@ -0,0 +1,148 @@
+"""
+Test Startup Module
+Contains the import-time benchmark for the harness modules and TC scripts
+
+Measures cold import time of each harness module and the time to import
+hundreds of generated TC scripts, failing when collection exceeds the budget:
+
+    python test_startup.py --count 300 --budget 1.0
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+from test_runner import TESTS_DIR
+
+
+HARNESS_MODULES = (
+    "test_stubs",
+    "test_mocks",
+    "test_fixtures",
+    "test_artifacts",
+    "test_context_pool",
+    "test_network",
+    "test_memory",
+    "pages",
+)
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+_COLLECT_SCRIPT = """
+import importlib, json, sys, time
+sys.path[:0] = [{tests_dir!r}, {generated_dir!r}]
+modules = {modules!r}
+start = time.perf_counter()
+for name in modules:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+heavy = [name for name in ("playwright", "unittest.mock", "pytest") if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy_modules": heavy}}))
+"""
+
+
+def measure_import(module: str, repeats: int = 3) -> float:
+    """
+    Measure the cold import time of a module in a fresh interpreter
+
+    Args:
+        module: Module name importable from the tests directory
+        repeats: Number of fresh interpreters (the fastest run is kept)
+
+    Returns: Cumulative import time in milliseconds
+    """
+    best = None
+    for _ in range(repeats):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=TESTS_DIR, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+        cumulative = [int(match.group(2)) for match in _IMPORTTIME_LINE.finditer(proc.stderr)
+                      if match.group(4) == module]
+        if cumulative:
+            value = max(cumulative) / 1000
+            best = value if best is None else min(best, value)
+    return round(best or 0.0, 2)
+
+
+def generate_tcs(count: int, target_dir: str) -> List[str]:
+    """
+    Write ``count`` TC scripts by cycling through the existing ones
+
+    Args:
+        count: Number of scripts to generate
+        target_dir: Directory to write them to
+
+    Returns: Module names of the generated scripts
+    """
+    sources = sorted(glob.glob(os.path.join(TESTS_DIR, "TC[0-9]*_*.py")))
+    modules = []
+    for index in range(count):
+        name = f"TC{index + 1:04d}_Generated"
+        shutil.copyfile(sources[index % len(sources)], os.path.join(target_dir, f"{name}.py"))
+        modules.append(name)
+    return modules
+
+
+def measure_collection(count: int = 300) -> Dict[str, Any]:
+    """
+    Time importing ``count`` generated TC scripts in a fresh interpreter
+
+    Args:
+        count: Number of generated TC scripts
+
+    Returns: Dictionary with total seconds, per-script milliseconds and the
+        heavy modules that got imported as a side effect
+    """
+    generated_dir = tempfile.mkdtemp(prefix="shophub_tcs_")
+    try:
+        modules = generate_tcs(count, generated_dir)
+        script = _COLLECT_SCRIPT.format(tests_dir=TESTS_DIR, generated_dir=generated_dir,
+                                        modules=modules)
+        proc = subprocess.run([sys.executable, "-c", script], cwd=generated_dir,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"collection failed:\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(generated_dir, ignore_errors=True)
+    return {
+        "count": count,
+        "seconds": round(result["seconds"], 3),
+        "per_script_ms": round(result["seconds"] * 1000 / count, 3),
+        "heavy_modules": result["heavy_modules"],
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Print import times and fail if TC collection exceeds the budget"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--count", type=int, default=300)
+    parser.add_argument("--budget", type=float, default=1.0, help="Seconds allowed for collection")
+    parser.add_argument("--modules", nargs="*", default=list(HARNESS_MODULES))
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        try:
+            print(f"{module}: {measure_import(module)} ms")
+        except RuntimeError as exc:
+            print(f"{module}: not importable here ({str(exc).splitlines()[-1]})")
+    collection = measure_collection(args.count)
+    print(json.dumps(collection))
+    if collection["seconds"] > args.budget:
+        print(f"Collection of {args.count} TC scripts took {collection['seconds']}s "
+              f"(budget {args.budget}s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,26 @@
 Test Stubs Module
 Contains stub functions for common Playwright test operations
 """
+from __future__ import annotations
+
 import asyncio
-from playwright import async_api
-from playwright.async_api import Page, Browser, BrowserContext, Playwright
-from typing import Optional, List, Dict, Any
+import os
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Sequence, Union
+
+from test_waits import timed_wait
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Browser, BrowserContext, Locator, Playwright
+
+_PLAYWRIGHT_NAMES = {"Page", "Browser", "BrowserContext", "Locator", "Playwright"}
+
+
+def __getattr__(name: str) -> Any:
+    """Import Playwright on first access so importing the stubs stays cheap"""
+    if name == "async_api" or name in _PLAYWRIGHT_NAMES:
+        from playwright import async_api
+        return async_api if name == "async_api" else getattr(async_api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def stub_playwright_start() -> Playwright:
@@ -13,33 +29,85 @@ async def stub_playwright_start() -> Playwright:
     Stub: Initialize and start Playwright session
     Returns: Playwright instance
     """
-    pw = await async_api.async_playwright().start()
+    from playwright.async_api import async_playwright
+
+    pw = await async_playwright().start()
     return pw
 
 
+LAUNCH_PROFILE_ENV = "SHOPHUB_LAUNCH_PROFILE"
+
+# Named Chromium launch configurations. "default" keeps only
+# --disable-dev-shm-usage of the historical flags: --single-process put every
+# renderer in the browser process (unstable, one huge RSS) and --ipc=host is
+# a Docker option Chromium ignores.
+LAUNCH_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "args": ["--disable-dev-shm-usage"],
+    },
+    "fast-headless": {
+        "headless": True,
+        "args": [
+            "--disable-gpu",
+            "--disable-extensions",
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+            "--disable-renderer-backgrounding",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--no-first-run",
+            "--mute-audio",
+            "--disable-features=Translate,MediaRouter,OptimizationHints",
+        ],
+    },
+    "debug": {
+        "headless": False,
+        "slow_mo": 250,
+        "args": ["--auto-open-devtools-for-tabs"],
+    },
+    "low-memory": {
+        "headless": True,
+        "args": [
+            "--disable-dev-shm-usage",
+            "--disable-gpu",
+            "--disable-extensions",
+            "--renderer-process-limit=2",
+            "--disable-site-isolation-trials",
+            "--disable-features=site-per-process,Translate,MediaRouter",
+            "--js-flags=--max-old-space-size=256",
+        ],
+    },
+}
+
+
 async def stub_launch_browser(
     pw: Playwright,
     headless: bool = True,
-    window_size: str = "1280,720"
+    window_size: str = "1280,720",
+    profile: Optional[str] = None
 ) -> Browser:
     """
-    Stub: Launch a Chromium browser with standard arguments
+    Stub: Launch a Chromium browser with a named launch profile
 
     Args:
         pw: Playwright instance
-        headless: Run browser in headless mode
+        headless: Run browser in headless mode (profiles may override)
         window_size: Browser window dimensions
+        profile: Launch profile from LAUNCH_PROFILES; defaults to the
+            SHOPHUB_LAUNCH_PROFILE environment variable, then "default"
 
     Returns: Browser instance
     """
+    name = profile or os.environ.get(LAUNCH_PROFILE_ENV) or "default"
+    if name not in LAUNCH_PROFILES:
+        raise KeyError(f"Unknown launch profile {name!r}; available: {', '.join(LAUNCH_PROFILES)}")
+    settings = LAUNCH_PROFILES[name]
     browser = await pw.chromium.launch(
-        headless=headless,
-        args=[
-            f"--window-size={window_size}",
-            "--disable-dev-shm-usage",
-            "--ipc=host",
-            "--single-process"
-        ],
+        headless=settings.get("headless", headless),
+        slow_mo=settings.get("slow_mo"),
+        args=[f"--window-size={window_size}", *settings["args"]],
     )
     return browser
 
@@ -62,16 +130,24 @@ async def stub_create_context(
     return context
 
 
-async def stub_create_page(context: BrowserContext) -> Page:
+async def stub_create_page(
+    context: BrowserContext,
+    network_profile: Optional[str] = None
+) -> Page:
     """
     Stub: Open a new page in the browser context
 
     Args:
         context: BrowserContext instance
+        network_profile: Network emulation profile applied before the page
+            is returned (see test_network.py)
 
     Returns: Page instance
     """
     page = await context.new_page()
+    if network_profile:
+        from test_network import apply_network_profile
+        await apply_network_profile(page, network_profile)
     return page
 
 
@@ -79,7 +155,7 @@ async def stub_navigate_to_url(
     page: Page,
     url: str,
     wait_until: str = "commit",
-    timeout: int = 10000
+    timeout: Optional[int] = None
 ) -> None:
     """
     Stub: Navigate to a URL with specified wait condition
@@ -88,9 +164,11 @@ async def stub_navigate_to_url(
         page: Page instance
         url: Target URL
         wait_until: Wait condition (commit, load, domcontentloaded, networkidle)
-        timeout: Navigation timeout in milliseconds
+        timeout: Navigation timeout in milliseconds (default: learned
+            budget with ``--smart-waits``, at most 10000)
     """
-    await page.goto(url, wait_until=wait_until, timeout=timeout)
+    await timed_wait(f"goto[{wait_until}]", url, 10000,
+                     lambda ms: page.goto(url, wait_until=wait_until, timeout=ms), timeout)
 
 
 async def stub_wait_for_load_state(
@@ -106,9 +184,11 @@ async def stub_wait_for_load_state(
         state: Load state to wait for
         timeout: Wait timeout in milliseconds
     """
+    from playwright.async_api import Error as PlaywrightError
+
     try:
         await page.wait_for_load_state(state, timeout=timeout)
-    except async_api.Error:
+    except PlaywrightError:
         pass
 
 
@@ -125,17 +205,21 @@ async def stub_wait_for_all_frames(
         state: Load state to wait for
         timeout: Wait timeout in milliseconds
     """
+    from playwright.async_api import Error as PlaywrightError
+
     for frame in page.frames:
         try:
             await frame.wait_for_load_state(state, timeout=timeout)
-        except async_api.Error:
+        except PlaywrightError:
             pass
 
 
 async def stub_full_page_setup(
     url: str = "http://localhost:3000",
     headless: bool = True,
-    default_timeout: int = 5000
+    default_timeout: int = 5000,
+    network_profile: Optional[str] = None,
+    launch_profile: Optional[str] = None
 ) -> tuple[Playwright, Browser, BrowserContext, Page]:
     """
     Stub: Complete page setup with all initialization steps
@@ -144,13 +228,18 @@ async def stub_full_page_setup(
         url: Target URL to navigate to
         headless: Run browser in headless mode
         default_timeout: Default timeout in milliseconds
+        network_profile: Network emulation profile (see test_network.py);
+            defaults to the SHOPHUB_NETWORK_PROFILE environment variable
+        launch_profile: Chromium launch profile (see LAUNCH_PROFILES)
 
     Returns: Tuple of (Playwright, Browser, BrowserContext, Page)
     """
+    from test_network import network_profile_from_env
+
     pw = await stub_playwright_start()
-    browser = await stub_launch_browser(pw, headless=headless)
+    browser = await stub_launch_browser(pw, headless=headless, profile=launch_profile)
     context = await stub_create_context(browser, default_timeout=default_timeout)
-    page = await stub_create_page(context)
+    page = await stub_create_page(context, network_profile or network_profile_from_env())
 
     await stub_navigate_to_url(page, url)
     await stub_wait_for_load_state(page)
@@ -159,10 +248,39 @@ async def stub_full_page_setup(
     return pw, browser, context, page
 
 
+async def stub_multi_actor_setup(
+    actors: Sequence[str] = ("customer", "vendor", "admin"),
+    url: str = "http://localhost:3000",
+    headless: bool = True,
+    default_timeout: int = 5000,
+    launch_profile: Optional[str] = None
+) -> tuple[Playwright, Browser, Any]:
+    """
+    Stub: Start one browser with a separate context and page per actor
+
+    Args:
+        actors: Actor names (each also used as the actor's role)
+        url: URL every actor opens first
+        headless: Run browser in headless mode
+        default_timeout: Default timeout in milliseconds
+        launch_profile: Chromium launch profile (see LAUNCH_PROFILES)
+
+    Returns: Tuple of (Playwright, Browser, MultiActorOrchestrator)
+    """
+    from test_orchestrator import MultiActorOrchestrator
+
+    pw = await stub_playwright_start()
+    browser = await stub_launch_browser(pw, headless=headless, profile=launch_profile)
+    orchestrator = MultiActorOrchestrator(browser, base_url=url, default_timeout=default_timeout)
+    await asyncio.gather(*(orchestrator.add_actor(name) for name in actors))
+    return pw, browser, orchestrator
+
+
 async def stub_cleanup(
     context: Optional[BrowserContext] = None,
     browser: Optional[Browser] = None,
-    pw: Optional[Playwright] = None
+    pw: Optional[Playwright] = None,
+    recycler: Optional[Any] = None
 ) -> None:
     """
     Stub: Clean up browser resources
@@ -171,8 +289,12 @@ async def stub_cleanup(
         context: BrowserContext to close
         browser: Browser to close
         pw: Playwright instance to stop
+        recycler: Optional ContextRecycler; the context is reset and handed
+            back to it instead of being closed
     """
-    if context:
+    if context and recycler is not None:
+        await recycler.release(context)
+    elif context:
         await context.close()
     if browser:
         await browser.close()
@@ -180,45 +302,108 @@ async def stub_cleanup(
         await pw.stop()
 
 
+_CLEAR_STORAGE_SCRIPT = """
+async () => {
+    try { localStorage.clear(); } catch (e) {}
+    try { sessionStorage.clear(); } catch (e) {}
+    if (indexedDB && indexedDB.databases) {
+        const dbs = await indexedDB.databases();
+        await Promise.all(dbs.map(db => new Promise(resolve => {
+            const req = indexedDB.deleteDatabase(db.name);
+            req.onsuccess = req.onerror = req.onblocked = () => resolve();
+        })));
+    }
+}
+"""
+
+
+async def stub_reset_context(
+    context: BrowserContext,
+    origins: Optional[List[str]] = None
+) -> None:
+    """
+    Stub: Reset a browser context in place instead of closing it
+
+    Clears cookies, closes all pages, removes routes and clears
+    localStorage, sessionStorage and IndexedDB for every origin that has
+    stored data (plus ``origins``). Each origin is visited on a scratch page
+    whose navigation is fulfilled locally, so the app is never loaded.
+
+    Args:
+        context: BrowserContext instance
+        origins: Extra origins to clear, e.g. ["http://localhost:3000"]
+    """
+    state = await context.storage_state()
+    targets = {entry["origin"] for entry in state.get("origins", [])}
+    targets.update(origin.rstrip("/") for origin in origins or [])
+
+    await stub_clear_cookies(context)
+    for page in list(context.pages):
+        await page.close()
+    if hasattr(context, "unroute_all"):
+        await context.unroute_all(behavior="ignoreErrors")
+
+    if targets:
+        scratch = await context.new_page()
+        await scratch.route("**/*", lambda route: route.fulfill(
+            status=200, content_type="text/html", body="<html></html>"
+        ))
+        for origin in sorted(targets):
+            await scratch.goto(f"{origin}/", wait_until="commit")
+            await scratch.evaluate(_CLEAR_STORAGE_SCRIPT)
+        await scratch.close()
+
+
 async def stub_click_element(
     page: Page,
-    selector: str,
-    timeout: int = 5000
+    selector: Union[str, Locator],
+    timeout: Optional[int] = None
 ) -> None:
     """
     Stub: Click an element with retry logic
 
     Args:
         page: Page instance
-        selector: Element selector
-        timeout: Click timeout in milliseconds
+        selector: Element selector, or a cached Locator (e.g. from a page object)
+        timeout: Click timeout in milliseconds (default: learned budget with
+            ``--smart-waits``, at most 5000)
     """
-    await page.click(selector, timeout=timeout)
+    if isinstance(selector, str):
+        await timed_wait("click", selector, 5000,
+                         lambda ms: page.click(selector, timeout=ms), timeout)
+    else:
+        await timed_wait("click", selector, 5000, lambda ms: selector.click(timeout=ms), timeout)
 
 
 async def stub_fill_input(
     page: Page,
-    selector: str,
+    selector: Union[str, Locator],
     value: str,
-    timeout: int = 5000
+    timeout: Optional[int] = None
 ) -> None:
     """
     Stub: Fill an input field
 
     Args:
         page: Page instance
-        selector: Input selector
+        selector: Input selector, or a cached Locator (e.g. from a page object)
         value: Value to fill
-        timeout: Fill timeout in milliseconds
+        timeout: Fill timeout in milliseconds (default: learned budget with
+            ``--smart-waits``, at most 5000)
     """
-    await page.fill(selector, value, timeout=timeout)
+    if isinstance(selector, str):
+        await timed_wait("fill", selector, 5000,
+                         lambda ms: page.fill(selector, value, timeout=ms), timeout)
+    else:
+        await timed_wait("fill", selector, 5000,
+                         lambda ms: selector.fill(value, timeout=ms), timeout)
 
 
 async def stub_select_option(
     page: Page,
     selector: str,
     value: str,
-    timeout: int = 5000
+    timeout: Optional[int] = None
 ) -> None:
     """
     Stub: Select an option from a dropdown
@@ -227,16 +412,18 @@ async def stub_select_option(
         page: Page instance
         selector: Select element selector
         value: Option value to select
-        timeout: Select timeout in milliseconds
+        timeout: Select timeout in milliseconds (default: learned budget
+            with ``--smart-waits``, at most 5000)
     """
-    await page.select_option(selector, value, timeout=timeout)
+    await timed_wait("select", selector, 5000,
+                     lambda ms: page.select_option(selector, value, timeout=ms), timeout)
 
 
 async def stub_wait_for_selector(
     page: Page,
     selector: str,
     state: str = "visible",
-    timeout: int = 30000
+    timeout: Optional[int] = None
 ) -> None:
     """
     Stub: Wait for an element to reach a specific state
@@ -245,9 +432,11 @@ async def stub_wait_for_selector(
         page: Page instance
         selector: Element selector
         state: State to wait for (visible, hidden, attached, detached)
-        timeout: Wait timeout in milliseconds
+        timeout: Wait timeout in milliseconds (default: learned budget with
+            ``--smart-waits``, at most 30000)
     """
-    await page.wait_for_selector(selector, state=state, timeout=timeout)
+    await timed_wait(f"wait[{state}]", selector, 30000,
+                     lambda ms: page.wait_for_selector(selector, state=state, timeout=ms), timeout)
 
 
 async def stub_get_text(
@@ -269,17 +458,64 @@ async def stub_get_text(
 async def stub_take_screenshot(
     page: Page,
     path: str,
-    full_page: bool = True
+    full_page: bool = True,
+    pipeline: Optional[Any] = None
 ) -> None:
     """
     Stub: Take a screenshot of the page
 
+    Animations and the text caret are frozen so repeated captures of the
+    same state are byte-stable and deduplicate well.
+
     Args:
         page: Page instance
-        path: Screenshot file path
+        path: Screenshot file path (used as the artifact name with a pipeline)
         full_page: Capture full page or viewport only
+        pipeline: Optional ArtifactPipeline; when given the image is captured
+            in memory and compressed/written in the background
+    """
+    options = {"full_page": full_page, "animations": "disabled", "caret": "hide"}
+    if pipeline is None:
+        await page.screenshot(path=path, **options)
+        return
+    image = await page.screenshot(**options)
+    name = os.path.splitext(os.path.basename(path))[0]
+    pipeline.submit_screenshot(name, image)
+
+
+async def stub_compare_screenshot(
+    page: Page,
+    name: str,
+    differ: Any,
+    full_page: bool = True,
+    wait: bool = False
+) -> Any:
     """
-    await page.screenshot(path=path, full_page=full_page)
+    Stub: Compare a screenshot with its visual baseline
+
+    The comparison runs in the differ's process pool; by default this
+    returns at once so the test can continue while it runs.
+
+    Args:
+        page: Page instance
+        name: Snapshot name (one baseline per name)
+        differ: VisualDiffer from test_visual.py
+        full_page: Capture full page or viewport only
+        wait: Wait for the result and raise AssertionError on a mismatch
+
+    Returns: Future of the comparison result, or the result when ``wait``
+    """
+    options = {"full_page": full_page, "animations": "disabled", "caret": "hide"}
+    image = await page.screenshot(**options)
+    future = differ.submit(name, image)
+    if not wait:
+        return future
+    result = await asyncio.wrap_future(future)
+    if not result["match"]:
+        raise AssertionError(f"Visual mismatch for {name!r}: "
+                             f"{len(result.get('changed_tiles', []))} changed tiles "
+                             f"({result.get('diff_path') or result.get('reason')})")
+    return result
 
 
 async def stub_intercept_route(
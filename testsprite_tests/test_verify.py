@@ -0,0 +1,279 @@
+"""
+Test Verify Module
+Contains the hybrid UI+API verification layer for backend state checks
+
+A ``BackendVerifier`` collects the backend checks of one test (stock
+decremented, sub-orders created, no account created, ...). Each check starts
+as soon as it is declared and polls the pooled API client or a Postgres
+connection in the background while the test keeps driving the page; the
+results are gathered at the end and merged into the test outcome, so no TC
+needs to navigate to another page just to read a value back:
+
+    before = await verify.expect_change("products", {"id": product_id}, "stock", -2)
+    await shop_pages.checkout.submit_shipping(address)
+    verify.expect_rows("sub_orders", {"order_id": order_id}, count=2)
+    await verify.verify()
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from test_api import ShopHubApiClient
+
+
+class BackendVerifier:
+    """Concurrent backend checks for one test
+
+    Reads go through ``api`` (a ``ShopHubApiClient``) when given, otherwise
+    through a psycopg connection ``conn``; queries on the connection are
+    serialized in a worker thread since one connection runs one statement
+    at a time. Every check polls until its predicate holds or ``timeout``
+    runs out, which absorbs the delay between a UI action and its backend
+    effect. An absence check (``hold=True``, e.g. ``count=0``) is the
+    reverse: a first poll finding nothing proves nothing, so it keeps
+    polling until ``timeout`` or until ``gather``/``verify`` is called and
+    fails on the first poll where the predicate does not hold.
+    """
+
+    def __init__(
+        self,
+        api: Optional[ShopHubApiClient] = None,
+        conn: Optional[Any] = None,
+        timeout: float = 10.0,
+        interval: float = 0.25
+    ):
+        if api is None and conn is None:
+            raise ValueError("BackendVerifier needs an API client or a database connection")
+        self.api = api
+        self.conn = conn
+        self.timeout = timeout
+        self.interval = interval
+        self.results: List[Dict[str, Any]] = []
+        self._tasks: List[asyncio.Task] = []
+        self._db_lock = asyncio.Lock()
+        self._settled = asyncio.Event()
+
+    # --- Reads ------------------------------------------------------------
+
+    def _query(self, table: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        for column, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                clauses.append(f"{column} = ANY(%s)")
+                params.append(list(value))
+            elif value is None:
+                clauses.append(f"{column} IS NULL")
+            else:
+                clauses.append(f"{column} = %s")
+                params.append(value)
+        sql = f"SELECT * FROM {table}" + (" WHERE " + " AND ".join(clauses) if clauses else "")
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            columns = [column.name for column in cur.description]
+            rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+        self.conn.commit()  # end the read transaction so the next poll sees new rows
+        return rows
+
+    async def select(self, table: str, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Read rows matching equality (or IN, for lists) filters
+
+        Args:
+            table: Table name
+            filters: Column to value
+
+        Returns: List of rows
+        """
+        if self.api is not None:
+            return await self.api.select(table, filters)
+        async with self._db_lock:
+            return await asyncio.to_thread(self._query, table, filters or {})
+
+    # --- Checks -----------------------------------------------------------
+
+    def expect(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[Any]],
+        predicate: Callable[[Any], bool],
+        timeout: Optional[float] = None,
+        hold: bool = False
+    ) -> asyncio.Task:
+        """
+        Start a check in the background
+
+        Args:
+            name: Check name shown in failures
+            fetch: Coroutine function reading the backend value
+            predicate: Returns True when the value is as expected
+            timeout: Seconds to keep polling (default: the verifier timeout)
+            hold: The predicate must hold on every poll until ``timeout``
+                or ``gather``, instead of becoming true once
+
+        Returns: Task resolving to the check result
+        """
+        task = asyncio.ensure_future(self._poll(name, fetch, predicate,
+                                                self.timeout if timeout is None else timeout,
+                                                hold, self._settled))
+        self._tasks.append(task)
+        return task
+
+    async def _poll(self, name: str, fetch: Callable[[], Awaitable[Any]],
+                    predicate: Callable[[Any], bool], timeout: float, hold: bool,
+                    settled: asyncio.Event) -> Dict[str, Any]:
+        start = time.perf_counter()
+        deadline = start + timeout
+        attempts = 0
+        value: Any = None
+        error = None
+        while True:
+            attempts += 1
+            try:
+                value = await fetch()
+                error = None
+                if predicate(value) != hold:
+                    break
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"[:300]
+            if time.perf_counter() >= deadline or (hold and settled.is_set()):
+                break
+            if hold:
+                try:
+                    await asyncio.wait_for(settled.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(self.interval)
+        passed = error is None and predicate(value)
+        result = {"name": name, "passed": passed, "attempts": attempts,
+                  "duration": round(time.perf_counter() - start, 3)}
+        if not passed:
+            result["value"] = repr(value)[:300]
+            if error:
+                result["error"] = error
+        self.results.append(result)
+        return result
+
+    def expect_rows(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        count: Optional[int] = None,
+        at_least: int = 1,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        timeout: Optional[float] = None,
+        hold: Optional[bool] = None
+    ) -> asyncio.Task:
+        """
+        Check how many rows match
+
+        Args:
+            table: Table name
+            filters: Column to value
+            count: Exact row count (0 checks that nothing was created)
+            at_least: Minimum row count when ``count`` is None
+            where: Predicate every matching row must satisfy
+            timeout: Seconds to keep polling
+            hold: Fail if any poll does not match, polling until ``timeout``
+                or ``verify`` (default: only for ``count=0``)
+
+        Returns: Task resolving to the check result
+        """
+        def predicate(rows: List[Dict[str, Any]]) -> bool:
+            if count is not None and len(rows) != count:
+                return False
+            if count is None and len(rows) < at_least:
+                return False
+            return where is None or all(where(row) for row in rows)
+
+        expected = f"={count}" if count is not None else f">={at_least}"
+        return self.expect(f"{table} {filters or {}} rows{expected}",
+                           lambda: self.select(table, filters), predicate, timeout,
+                           hold=count == 0 if hold is None else hold)
+
+    async def expect_change(
+        self,
+        table: str,
+        filters: Dict[str, Any],
+        column: str,
+        delta: float,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Read a value now and check later that it moved by ``delta``
+
+        Await this before the UI action; the check itself runs in the
+        background.
+
+        Args:
+            table: Table name
+            filters: Filters selecting exactly one row
+            column: Numeric column
+            delta: Expected change (e.g. -2 for two units sold)
+            timeout: Seconds to keep polling
+
+        Returns: The value before the action
+        """
+        rows = await self.select(table, filters)
+        if len(rows) != 1:
+            raise LookupError(f"{table} {filters} matched {len(rows)} rows, expected 1")
+        before = rows[0][column]
+        target = float(before) + delta
+
+        async def fetch() -> Any:
+            rows = await self.select(table, filters)
+            return rows[0][column] if rows else None
+
+        self.expect(f"{table}.{column} {filters} {before} -> {target:g}", fetch,
+                    lambda value: value is not None and abs(float(value) - target) < 1e-9, timeout)
+        return before
+
+    # --- Outcome ----------------------------------------------------------
+
+    async def gather(self) -> List[Dict[str, Any]]:
+        """
+        Wait for every check started so far
+
+        Absence checks still polling stop after their next poll.
+
+        Returns: All check results, in completion order
+        """
+        if self._tasks:
+            self._settled.set()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+            self._settled = asyncio.Event()
+        return self.results
+
+    def failures(self) -> List[Dict[str, Any]]:
+        """Finished checks that did not pass"""
+        return [result for result in self.results if not result["passed"]]
+
+    async def verify(self) -> List[Dict[str, Any]]:
+        """
+        Wait for every check and fail with all failures at once
+
+        Returns: All check results
+
+        Raises:
+            AssertionError: One or more checks failed
+        """
+        results = await self.gather()
+        failures = self.failures()
+        if failures:
+            raise AssertionError("Backend checks failed:\n" + "\n".join(
+                f"  {failure['name']}: got {failure.get('value')}"
+                + (f" ({failure['error']})" if failure.get("error") else "")
+                for failure in failures
+            ))
+        return results
+
+    async def cancel(self) -> None:
+        """Stop checks still polling (e.g. after the UI part failed)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,97 @@
+"""
+Unit tests for test_verify.py
+Presence and absence checks polled against an in-memory API
+"""
+import asyncio
+
+import pytest
+
+from test_verify import BackendVerifier
+
+
+class FakeApi:
+    """Minimal ShopHubApiClient.select over in-memory tables"""
+
+    def __init__(self):
+        self.tables = {}
+
+    async def select(self, table, filters=None):
+        return [dict(row) for row in self.tables.get(table, ())
+                if all(row.get(column) == value for column, value in (filters or {}).items())]
+
+
+@pytest.fixture
+def api():
+    return FakeApi()
+
+
+def _verifier(api, timeout=1.0):
+    return BackendVerifier(api=api, timeout=timeout, interval=0.01)
+
+
+def test_needs_a_backend():
+    with pytest.raises(ValueError):
+        BackendVerifier()
+
+
+def test_presence_check_passes_once_the_row_appears(api):
+    async def scenario():
+        verify = _verifier(api)
+        verify.expect_rows("orders", {"user_id": "u1"}, count=1)
+        await asyncio.sleep(0.03)
+        api.tables["orders"] = [{"id": "o1", "user_id": "u1"}]
+        return await verify.verify()
+
+    results = asyncio.run(scenario())
+    assert results[0]["passed"] and results[0]["attempts"] > 1
+
+
+def test_absence_check_fails_once_a_row_appears(api):
+    async def scenario():
+        verify = _verifier(api)
+        task = verify.expect_rows("users", {"email": "x@example.com"}, count=0)
+        await asyncio.sleep(0.03)
+        assert not task.done()  # a first empty poll proves nothing
+        api.tables["users"] = [{"id": "u9", "email": "x@example.com"}]
+        return await task
+
+    result = asyncio.run(scenario())
+    assert not result["passed"]
+    assert "u9" in result["value"]
+
+
+def test_absence_check_passes_when_settled_without_rows(api):
+    async def scenario():
+        verify = _verifier(api, timeout=30.0)
+        verify.expect_rows("users", {"email": "x@example.com"}, count=0)
+        await asyncio.sleep(0.03)
+        return await verify.verify()
+
+    results = asyncio.run(scenario())
+    assert results[0]["passed"]
+    assert results[0]["duration"] < 1.0  # stopped by verify(), not the 30 s timeout
+
+
+def test_verify_reports_every_failure(api):
+    async def scenario():
+        verify = _verifier(api, timeout=0.05)
+        verify.expect_rows("orders", {"user_id": "u1"})
+        verify.expect_rows("sub_orders", {"order_id": "o1"}, count=2)
+        await verify.verify()
+
+    with pytest.raises(AssertionError, match="orders .*\n.*sub_orders"):
+        asyncio.run(scenario())
+
+
+def test_expect_change_waits_for_the_delta(api):
+    api.tables["products"] = [{"id": "p1", "stock": 10}]
+
+    async def scenario():
+        verify = _verifier(api)
+        before = await verify.expect_change("products", {"id": "p1"}, "stock", -2)
+        api.tables["products"] = [{"id": "p1", "stock": 8}]
+        return before, await verify.verify()
+
+    before, results = asyncio.run(scenario())
+    assert before == 10
+    assert results[0]["passed"]
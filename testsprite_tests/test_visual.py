@@ -0,0 +1,337 @@
+"""
+Test Visual Module
+Contains the visual snapshot diffing engine for layout regression checks
+
+Baselines are PNG screenshots stored with a hash per tile. A new screenshot
+is hashed tile by tile and only tiles whose hash differs from the baseline
+are decoded and compared pixel-wise (NumPy when installed), with a
+tolerance for anti-aliasing noise. Comparisons run in a process pool so
+they overlap with the browser work of the test.
+"""
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_BASELINE_DIR = os.environ.get(
+    "SHOPHUB_VISUAL_BASELINES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "visual_baselines")
+)
+DEFAULT_DIFF_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "tmp", "visual_diffs"
+)
+
+
+def _image_module():
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise ImportError("Visual diffing needs Pillow: pip install Pillow") from exc
+    return Image
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _decode(image: bytes) -> Any:
+    with _image_module().open(io.BytesIO(image)) as img:
+        return img.convert("RGB")
+
+
+def _tile_boxes(size: Tuple[int, int], tile: int) -> List[Tuple[int, int, int, int]]:
+    width, height = size
+    return [(x, y, min(x + tile, width), min(y + tile, height))
+            for y in range(0, height, tile) for x in range(0, width, tile)]
+
+
+def tile_hashes(img: Any, tile: int = 64) -> List[str]:
+    """
+    Hash every tile of a decoded image
+
+    Args:
+        img: RGB Pillow image
+        tile: Tile edge in pixels
+
+    Returns: One hex digest per tile, row by row
+    """
+    np = _numpy()
+    if np is not None:
+        pixels = np.asarray(img)
+        return [hashlib.blake2b(np.ascontiguousarray(pixels[top:bottom, left:right]).tobytes(),
+                                digest_size=8).hexdigest()
+                for left, top, right, bottom in _tile_boxes(img.size, tile)]
+    return [hashlib.blake2b(img.crop(box).tobytes(), digest_size=8).hexdigest()
+            for box in _tile_boxes(img.size, tile)]
+
+
+def changed_pixel_ratio(baseline: Any, current: Any, box: Tuple[int, int, int, int],
+                        pixel_threshold: int = 16) -> float:
+    """
+    Fraction of pixels in a tile whose luminance moved more than a threshold
+
+    Small per-pixel differences (font anti-aliasing, JPEG noise) are ignored.
+
+    Args:
+        baseline: Baseline RGB image
+        current: Current RGB image of the same size
+        box: Tile box (left, top, right, bottom)
+        pixel_threshold: Luminance difference (0-255) that counts as changed
+
+    Returns: Ratio between 0.0 and 1.0
+    """
+    a = baseline.crop(box).convert("L")
+    b = current.crop(box).convert("L")
+    np = _numpy()
+    if np is not None:
+        diff = np.abs(np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16))
+        return float(np.count_nonzero(diff > pixel_threshold)) / diff.size
+    from PIL import ImageChops
+    histogram = ImageChops.difference(a, b).histogram()
+    return sum(histogram[pixel_threshold + 1:]) / max(1, sum(histogram))
+
+
+class VisualBaselineStore:
+    """Baseline screenshots with their tile hashes
+
+    Each baseline ``<name>.png`` has a ``<name>.tiles.json`` next to it, so
+    identical tiles are recognized without decoding the baseline image.
+    """
+
+    def __init__(self, directory: str = DEFAULT_BASELINE_DIR, tile: int = 64):
+        self.directory = directory
+        self.tile = tile
+
+    def path(self, name: str, suffix: str = ".png") -> str:
+        """
+        Build a baseline path
+
+        Args:
+            name: Snapshot name
+            suffix: File suffix including the dot
+
+        Returns: Absolute path
+        """
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        return os.path.join(self.directory, f"{safe}{suffix}")
+
+    def exists(self, name: str) -> bool:
+        """Check whether a baseline exists for ``name``"""
+        return os.path.exists(self.path(name))
+
+    def load(self, name: str) -> bytes:
+        """
+        Read a baseline image
+
+        Args:
+            name: Snapshot name
+
+        Returns: PNG bytes
+        """
+        with open(self.path(name), "rb") as f:
+            return f.read()
+
+    def index(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the tile hash index of a baseline
+
+        Args:
+            name: Snapshot name
+
+        Returns: Dictionary with size, tile and hashes, or None if missing
+            or built with another tile size
+        """
+        path = self.path(name, ".tiles.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            index = json.load(f)
+        return index if index.get("tile") == self.tile else None
+
+    def save(self, name: str, image: bytes, img: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Store an image as the baseline for ``name``
+
+        Args:
+            name: Snapshot name
+            image: Encoded screenshot bytes
+            img: Already decoded image, to avoid decoding twice
+
+        Returns: The tile hash index written next to the image
+        """
+        img = img if img is not None else _decode(image)
+        os.makedirs(self.directory, exist_ok=True)
+        out = io.BytesIO()
+        img.save(out, format="PNG", optimize=True)
+        with open(self.path(name), "wb") as f:
+            f.write(out.getvalue())
+        index = {"size": list(img.size), "tile": self.tile, "hashes": tile_hashes(img, self.tile)}
+        with open(self.path(name, ".tiles.json"), "w") as f:
+            json.dump(index, f)
+        return index
+
+
+def compare_snapshot(
+    store: VisualBaselineStore,
+    name: str,
+    image: bytes,
+    pixel_threshold: int = 16,
+    tile_tolerance: float = 0.005,
+    update: bool = False,
+    diff_dir: Optional[str] = DEFAULT_DIFF_DIR
+) -> Dict[str, Any]:
+    """
+    Compare a screenshot with its baseline
+
+    Tiles whose hash matches the baseline index are skipped; only the
+    others are compared pixel-wise. Without a baseline (or with ``update``)
+    the screenshot becomes the baseline.
+
+    Args:
+        store: Baseline store
+        name: Snapshot name
+        image: Encoded screenshot bytes
+        pixel_threshold: Luminance difference that counts as a changed pixel
+        tile_tolerance: Fraction of changed pixels above which a tile differs
+        update: Replace the baseline instead of comparing
+        diff_dir: Where to write a diff image (changed tiles outlined); None
+            disables it
+
+    Returns: Dictionary with status ("match", "mismatch", "new", "updated"),
+        tiles compared/skipped, changed tile boxes and the diff image path
+    """
+    current = _decode(image)
+    if update or not store.exists(name):
+        store.save(name, image, current)
+        return {"name": name, "status": "updated" if update else "new", "match": True}
+
+    index = store.index(name)
+    if index is None:
+        index = store.save(name, store.load(name))
+    if tuple(index["size"]) != current.size:
+        return {"name": name, "status": "mismatch", "match": False, "reason": "size",
+                "baseline_size": index["size"], "size": list(current.size)}
+
+    boxes = _tile_boxes(current.size, store.tile)
+    dirty = [box for box, expected, actual in zip(boxes, index["hashes"],
+                                                  tile_hashes(current, store.tile))
+             if expected != actual]
+    result = {"name": name, "status": "match", "match": True, "tiles": len(boxes),
+              "tiles_skipped": len(boxes) - len(dirty), "changed_tiles": []}
+    if not dirty:
+        return result
+
+    baseline = _decode(store.load(name))
+    changed = [box for box in dirty
+               if changed_pixel_ratio(baseline, current, box, pixel_threshold) > tile_tolerance]
+    result["changed_tiles"] = [list(box) for box in changed]
+    if changed:
+        result.update(status="mismatch", match=False)
+        if diff_dir:
+            result["diff_path"] = _write_diff(current, changed, diff_dir, store.path(name, ""))
+    return result
+
+
+def _write_diff(current: Any, boxes: List[Tuple[int, int, int, int]], diff_dir: str,
+                stem: str) -> str:
+    from PIL import ImageDraw
+
+    os.makedirs(diff_dir, exist_ok=True)
+    marked = current.copy()
+    draw = ImageDraw.Draw(marked)
+    for box in boxes:
+        draw.rectangle((box[0], box[1], box[2] - 1, box[3] - 1), outline=(255, 0, 0), width=2)
+    path = os.path.join(diff_dir, f"{os.path.basename(stem)}.diff.png")
+    marked.save(path, format="PNG")
+    return path
+
+
+def _compare_job(directory: str, tile: int, name: str, image: bytes,
+                 options: Dict[str, Any]) -> Dict[str, Any]:
+    return compare_snapshot(VisualBaselineStore(directory, tile), name, image, **options)
+
+
+class VisualDiffer:
+    """Runs snapshot comparisons in a process pool
+
+    ``submit`` returns at once with a Future, so decoding and diffing happen
+    while the test keeps driving the browser. Comparisons are grouped by
+    ``test`` (set per test by the ``visual_checks`` fixture); ``wait``
+    returns one test's results and ``close`` waits for every comparison and
+    returns all results.
+    """
+
+    def __init__(
+        self,
+        store: Optional[VisualBaselineStore] = None,
+        workers: Optional[int] = None,
+        update: bool = False,
+        pixel_threshold: int = 16,
+        tile_tolerance: float = 0.005,
+        diff_dir: Optional[str] = DEFAULT_DIFF_DIR
+    ):
+        self.store = store or VisualBaselineStore()
+        self.options = {"pixel_threshold": pixel_threshold, "tile_tolerance": tile_tolerance,
+                        "update": update, "diff_dir": diff_dir}
+        self.results: List[Dict[str, Any]] = []
+        self.test: Optional[str] = None
+        self._pending: Dict[Optional[str], List[Future]] = {}
+        from concurrent.futures import ProcessPoolExecutor  # pulls in multiprocessing
+        self._pool = ProcessPoolExecutor(max_workers=workers or max(1, (os.cpu_count() or 2) // 2))
+
+    def submit(self, name: str, image: bytes) -> Future:
+        """
+        Queue a comparison against the baseline for ``name``
+
+        Args:
+            name: Snapshot name
+            image: Encoded screenshot bytes
+
+        Returns: Future resolving to the ``compare_snapshot`` result
+        """
+        future = self._pool.submit(_compare_job, self.store.directory, self.store.tile,
+                                   name, image, self.options)
+        future.add_done_callback(self._collect)
+        self._pending.setdefault(self.test, []).append(future)
+        return future
+
+    @staticmethod
+    def _result(future: Future) -> Dict[str, Any]:
+        try:
+            return future.result()
+        except Exception as exc:
+            return {"status": "error", "match": False, "error": str(exc)}
+
+    def _collect(self, future: Future) -> None:
+        self.results.append(self._result(future))
+
+    def wait(self, test: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Wait for the comparisons submitted while ``test`` was current
+
+        Args:
+            test: Test node id
+
+        Returns: That test's comparison results, in submission order
+        """
+        return [self._result(future) for future in self._pending.pop(test, [])]
+
+    def mismatches(self) -> List[Dict[str, Any]]:
+        """Results of the comparisons finished so far that did not match"""
+        return [result for result in self.results if not result["match"]]
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Wait for every comparison and shut the pool down
+
+        Returns: All comparison results
+        """
+        self._pool.shutdown(wait=True)
+        return self.results
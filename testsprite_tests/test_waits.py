@@ -0,0 +1,283 @@
+"""
+Test Waits Module
+Contains the timing engine that learns per-selector wait budgets
+
+Every click, fill, selector wait and navigation done through the stubs is
+timed per key ("click:<selector>", "goto:<path>", ...) and kept in a
+history across runs, one shard file per xdist worker. Once a key has
+enough samples its timeout becomes p99 x factor (clamped between a floor
+and the hardcoded default), so a wait that normally takes 200 ms fails
+after ~600 ms as a regression instead of sitting out a 30 s default:
+
+    python test_waits.py --report
+    pytest testsprite_tests/ --smart-waits
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+
+
+DEFAULT_TIMINGS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "tmp", "wait_timings"
+)
+
+T = TypeVar("T")
+
+_LOCATOR_SELECTOR = re.compile(r"selector='(.*)'>$")
+
+
+class WaitBudgetExceeded(TimeoutError):
+    """A wait ran past its learned budget, well beyond its usual duration"""
+
+
+def wait_key(action: str, target: Any) -> str:
+    """
+    Build the timing key of an action
+
+    Args:
+        action: Action name ("click", "fill", "wait", "goto", ...)
+        target: Selector string, Locator, or URL
+
+    Returns: Key such as "click:button[type='submit']"
+    """
+    if not isinstance(target, str):
+        match = _LOCATOR_SELECTOR.search(repr(target))
+        target = match.group(1) if match else repr(target)
+    elif action.startswith("goto"):
+        target = re.sub(r"^[a-z]+://[^/]+", "", target).split("?", 1)[0] or "/"
+    return f"{action}:{target}"
+
+
+class WaitTimings:
+    """Per-key wait durations with adaptive timeouts
+
+    Only successful waits are recorded (a timed-out wait says nothing about
+    the real duration). Keys with fewer than ``min_samples`` samples keep
+    the caller's default timeout.
+
+    Samples are loaded from every shard in ``directory``, but each process
+    only writes its own shard (``<shard>.json``, one per xdist worker), so
+    workers saving at the same time do not overwrite each other's history.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = DEFAULT_TIMINGS_DIR,
+        shard: Optional[str] = None,
+        window: int = 200,
+        quantile: float = 0.99,
+        factor: float = 3.0,
+        min_samples: int = 10,
+        floor_ms: int = 250
+    ):
+        self.directory = directory
+        self.shard = shard or os.environ.get("PYTEST_XDIST_WORKER", "main")
+        self.window = window
+        self.quantile = quantile
+        self.factor = factor
+        self.min_samples = min_samples
+        self.floor_ms = floor_ms
+        self.samples: Dict[str, List[float]] = {}
+        self.regressions: List[Dict[str, Any]] = []
+        self._own: Dict[str, List[float]] = {}
+        self._new: Dict[str, List[float]] = {}
+        if directory and os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(".json"):
+                    continue
+                with open(os.path.join(directory, name)) as f:
+                    shard_samples = json.load(f)
+                if name == f"{self.shard}.json":
+                    self._own = shard_samples
+                for key, entries in shard_samples.items():
+                    merged = self.samples.setdefault(key, [])
+                    merged.extend(entries)
+                    del merged[:-self.window]
+
+    @property
+    def path(self) -> Optional[str]:
+        """Shard file this process writes"""
+        return os.path.join(self.directory, f"{self.shard}.json") if self.directory else None
+
+    def record(self, key: str, ms: float) -> None:
+        """
+        Record one successful wait
+
+        Args:
+            key: Timing key
+            ms: Duration in milliseconds
+        """
+        for samples in (self.samples, self._new):
+            entries = samples.setdefault(key, [])
+            entries.append(round(ms, 1))
+            del entries[:-self.window]
+
+    def percentile(self, key: str, quantile: Optional[float] = None) -> Optional[float]:
+        """
+        Duration percentile of a key
+
+        Args:
+            key: Timing key
+            quantile: Quantile between 0 and 1 (default: ``self.quantile``)
+
+        Returns: Milliseconds, or None without samples
+        """
+        entries = sorted(self.samples.get(key, ()))
+        if not entries:
+            return None
+        quantile = self.quantile if quantile is None else quantile
+        return entries[int(quantile * (len(entries) - 1))]
+
+    def budget(self, key: str, default_ms: int) -> int:
+        """
+        Timeout to use for a key
+
+        Args:
+            key: Timing key
+            default_ms: Hardcoded timeout of the caller
+
+        Returns: Milliseconds: p99 x factor within [floor, default], or
+            ``default_ms`` until enough samples exist
+        """
+        if len(self.samples.get(key, ())) < self.min_samples:
+            return default_ms
+        learned = self.percentile(key) * self.factor
+        return int(min(default_ms, max(self.floor_ms, learned)))
+
+    async def measure(
+        self,
+        key: str,
+        default_ms: int,
+        operation: Callable[[int], Awaitable[T]],
+        timeout: Optional[int] = None
+    ) -> T:
+        """
+        Run a wait with its budget and record how long it took
+
+        Args:
+            key: Timing key
+            default_ms: Hardcoded timeout of the caller
+            operation: Coroutine function taking the timeout in milliseconds
+            timeout: Explicit timeout; disables the learned budget
+
+        Returns: Result of ``operation``
+
+        Raises:
+            WaitBudgetExceeded: The learned budget (shorter than the default)
+                ran out
+        """
+        budget = timeout if timeout is not None else self.budget(key, default_ms)
+        start = time.perf_counter()
+        try:
+            result = await operation(budget)
+        except Exception as exc:
+            if timeout is None and budget < default_ms and type(exc).__name__ == "TimeoutError":
+                regression = {"key": key, "budget_ms": budget,
+                              "p99_ms": self.percentile(key), "default_ms": default_ms}
+                self.regressions.append(regression)
+                raise WaitBudgetExceeded(
+                    f"{key} took over {budget} ms; it usually takes "
+                    f"{regression['p99_ms']} ms (p99), default timeout {default_ms} ms"
+                ) from exc
+            raise
+        self.record(key, (time.perf_counter() - start) * 1000)
+        return result
+
+    def save(self) -> None:
+        """Write this shard: its previous samples plus the ones recorded since"""
+        if not self.path:
+            return
+        shard = {key: list(entries) for key, entries in self._own.items()}
+        for key, entries in self._new.items():
+            merged = shard.setdefault(key, [])
+            merged.extend(entries)
+            del merged[:-self.window]
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(shard, f)
+        os.replace(tmp_path, self.path)
+        self._own, self._new = shard, {}
+
+    def report(self, default_ms: int = 30000) -> List[Dict[str, Any]]:
+        """
+        Summarize every key
+
+        Args:
+            default_ms: Default used to show the budget of each key
+
+        Returns: List of dictionaries sorted by descending p99
+        """
+        rows = [{
+            "key": key,
+            "samples": len(entries),
+            "p50_ms": self.percentile(key, 0.5),
+            "p99_ms": self.percentile(key),
+            "budget_ms": self.budget(key, default_ms),
+        } for key, entries in self.samples.items()]
+        return sorted(rows, key=lambda row: row["p99_ms"] or 0, reverse=True)
+
+
+_active: Optional[WaitTimings] = None
+
+
+def activate(timings: Optional[WaitTimings]) -> None:
+    """
+    Make the stubs time their waits with ``timings`` (None turns it off)
+
+    Args:
+        timings: WaitTimings instance
+    """
+    global _active
+    _active = timings
+
+
+def active_timings() -> Optional[WaitTimings]:
+    """The WaitTimings used by the stubs, if any"""
+    return _active
+
+
+async def timed_wait(
+    action: str,
+    target: Any,
+    default_ms: int,
+    operation: Callable[[int], Awaitable[T]],
+    timeout: Optional[int] = None
+) -> T:
+    """
+    Run a stub wait through the active timings, or with its plain timeout
+
+    Args:
+        action: Action name for the key
+        target: Selector, Locator or URL for the key
+        default_ms: Hardcoded timeout of the stub
+        operation: Coroutine function taking the timeout in milliseconds
+        timeout: Explicit timeout from the caller
+
+    Returns: Result of ``operation``
+    """
+    if _active is None:
+        return await operation(default_ms if timeout is None else timeout)
+    return await _active.measure(wait_key(action, target), default_ms, operation, timeout)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Print learned wait budgets"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--report", action="store_true", help="Print every key (default)")
+    parser.add_argument("--dir", default=DEFAULT_TIMINGS_DIR, help="Directory of timing shards")
+    parser.add_argument("--default", type=int, default=30000,
+                        help="Default timeout used to compute the budgets shown")
+    args = parser.parse_args(argv)
+
+    for row in WaitTimings(args.dir).report(args.default):
+        print(json.dumps(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Unit tests for test_waits.py
+Learned budgets, regressions and shard files, without a browser
+"""
+import asyncio
+
+import pytest
+
+from test_waits import WaitBudgetExceeded, WaitTimings
+
+
+@pytest.fixture
+def timings(tmp_path):
+    return WaitTimings(str(tmp_path), shard="gw0", min_samples=5, floor_ms=250)
+
+
+def _fill(timings, key, ms, count=5):
+    for _ in range(count):
+        timings.record(key, ms)
+
+
+def test_default_until_enough_samples(timings):
+    _fill(timings, "click:a", 100, count=4)
+    assert timings.budget("click:a", 5000) == 5000
+    timings.record("click:a", 100)
+    assert timings.budget("click:a", 5000) == 300
+
+
+def test_budget_is_clamped_to_floor_and_default(timings):
+    _fill(timings, "click:fast", 10)
+    _fill(timings, "goto:/slow", 4000)
+    assert timings.budget("click:fast", 5000) == 250
+    assert timings.budget("goto:/slow", 5000) == 5000
+
+
+def test_measure_records_successful_waits(timings):
+    async def operation(ms):
+        return ms
+
+    assert asyncio.run(timings.measure("wait:x", 5000, operation)) == 5000
+    assert len(timings.samples["wait:x"]) == 1
+
+
+def test_measure_reports_a_regression_past_the_learned_budget(timings):
+    _fill(timings, "click:a", 100)
+    seen = []
+
+    async def operation(ms):
+        seen.append(ms)
+        raise TimeoutError(f"Timeout {ms}ms exceeded")
+
+    with pytest.raises(WaitBudgetExceeded, match="click:a took over 300 ms"):
+        asyncio.run(timings.measure("click:a", 5000, operation))
+    assert seen == [300]
+    assert timings.regressions == [{"key": "click:a", "budget_ms": 300,
+                                    "p99_ms": 100.0, "default_ms": 5000}]
+    assert len(timings.samples["click:a"]) == 5
+
+
+def test_explicit_timeout_keeps_the_plain_error(timings):
+    _fill(timings, "click:a", 100)
+
+    async def operation(ms):
+        raise TimeoutError(f"Timeout {ms}ms exceeded")
+
+    with pytest.raises(TimeoutError) as info:
+        asyncio.run(timings.measure("click:a", 5000, operation, timeout=1000))
+    assert not isinstance(info.value, WaitBudgetExceeded)
+    assert timings.regressions == []
+
+
+def test_shards_merge_on_load(tmp_path):
+    first = WaitTimings(str(tmp_path), shard="gw0")
+    second = WaitTimings(str(tmp_path), shard="gw1")
+    first.record("click:a", 100)
+    second.record("click:a", 200)
+    first.save()
+    second.save()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["gw0.json", "gw1.json"]
+    assert sorted(WaitTimings(str(tmp_path), shard="main").samples["click:a"]) == [100.0, 200.0]